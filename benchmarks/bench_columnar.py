@@ -0,0 +1,94 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_columnar.py
+
+Description:
+Exports the detections and labeled radar points of the dataset into columnar shards (npz, and parquet if pyarrow
+is installed) for several numbers of worker processes, and compares the time of a typical analytics query
+(instances per category, radar points per object, histogram of the point ranges) over the shards with the same
+query over the frames, which parses all the annotation jsons again.
+
+usage: python benchmarks/bench_columnar.py /path/to/infra_3drc_dataset --workers 1 2 4 8
+
+Requirements:
+- NumPy
+- pyarrow (optional)
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from infra_3drc import Infra3DRC, Infra3DRCDataset
+from infra_3drc.class_names import INFRA_ID_TO_CLASS
+from infra_3drc.columnar import read_table
+
+RANGE_BINS = np.arange(0.0, 121.0, 5.0)
+
+
+def query_frames(dataset: Infra3DRCDataset):
+    """the query over the frames of new scene objects, so the jsons are parsed again."""
+    category_counts = np.zeros(len(INFRA_ID_TO_CLASS), dtype=np.int64)
+    num_points, ranges = [], []
+    for scene_number in dataset.scene_numbers:
+        for frame in Infra3DRC(dataset.dataset_root, scene_number):
+            detections = frame.detections
+            category_counts += np.bincount(detections.category_id, minlength=len(category_counts))
+            num_points.append(detections.num_points)
+            ranges.append(detections.points["range"])
+    return category_counts, np.concatenate(num_points), np.histogram(np.concatenate(ranges), RANGE_BINS)[0]
+
+
+def query_shards(path: Path):
+    detections = read_table(path, "detections", columns=["category_id", "num_points"])
+    points = read_table(path, "radar_points", columns=["range"])
+    category_counts = np.bincount(detections.category_id, minlength=len(INFRA_ID_TO_CLASS))
+    return category_counts, detections.num_points, np.histogram(points["range"], RANGE_BINS)[0]
+
+
+def best_of(func, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    dataset = Infra3DRCDataset(args.dataset_root)
+    formats = ["npz"]
+    try:
+        import pyarrow
+
+        formats.append("parquet")
+    except ImportError:
+        print("pyarrow is not installed, parquet is skipped.")
+
+    frames_time, reference = best_of(lambda: query_frames(dataset), 1)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"{'export':<28}{'time [s]':>10}{'detections':>12}{'points':>10}")
+        for fmt in formats:
+            for workers in args.workers:
+                stats = dataset.export_columnar(Path(tmp_dir).joinpath(fmt), fmt, workers=workers)
+                print(f"{f'{fmt}, {workers} processes':<28}{stats.total:>10.2f}{stats.num_detections:>12}{stats.num_points:>10}")
+
+        print(f"\n{'query':<28}{'time [ms]':>10}{'speedup':>9}")
+        print(f"{'frames (json)':<28}{1000 * frames_time:>10.1f}{1.0:>9.1f}")
+        for fmt in formats:
+            shards_time, result = best_of(lambda: query_shards(Path(tmp_dir).joinpath(fmt)), args.repeat)
+            assert all(np.array_equal(a, b) for a, b in zip(result, reference)), f"{fmt} shards differ from the frames"
+            print(f"{f'{fmt} shards':<28}{1000 * shards_time:>10.1f}{frames_time / shards_time:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_detections.py
+
+Description:
+Compares the time of an aggregate query over a scene, the bounding boxes and radar point counts of all the
+objects of one category, between walking the Detection objects of every frame and filtering the columnar
+scene DetectionTable. The annotation jsons are parsed before the measurement.
+
+usage: python benchmarks/bench_detections.py /path/to/infra_3drc_dataset --scene 13 --category car
+
+Requirements:
+- NumPy
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from infra_3drc import Infra3DRC
+from infra_3drc.detections import category_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--scene", type=int, default=13)
+    parser.add_argument("--category", default="car")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    scene = Infra3DRC(args.dataset_root, args.scene)
+    frames = list(scene)
+    for frame in frames:
+        frame.objects
+    detections = scene.detections
+    category_id = category_ids(args.category)[0]
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        objects = [obj for frame in frames for obj in frame.objects if obj.category_id == category_id]
+        walk_bboxes = np.array([obj.bbox for obj in objects], dtype=np.float32).reshape(-1, 4)
+        walk_points = np.array([0 if obj.points is None else obj.points.shape[0] for obj in objects])
+    walk_time = (time.perf_counter() - start) / args.repeat
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        selected = detections.filter(category_id)
+        table_bboxes, table_points = selected.bbox, selected.num_points
+    table_time = (time.perf_counter() - start) / args.repeat
+
+    assert np.array_equal(walk_bboxes, table_bboxes) and np.array_equal(walk_points, table_points)
+    print(f"scene {args.scene}: {len(frames)} frames, {len(detections)} objects, {len(table_bboxes)} of category {args.category}")
+    print(f"{'query':<12}{'ms':>10}{'speedup':>10}")
+    for name, elapsed in (("walk", walk_time), ("table", table_time)):
+        print(f"{name:<12}{1000 * elapsed:>10.3f}{walk_time / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
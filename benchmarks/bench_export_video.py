@@ -0,0 +1,74 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_export_video.py
+
+Description:
+Exports the frames of a scene as video with annotations, radar and lidar drawn, once with a serial loop
+(decode, render and write one frame after the other) and with Infra3DRC.export_video for several numbers of
+worker processes, and reports the frames per second and the time of each stage.
+
+usage: python benchmarks/bench_export_video.py /path/to/infra_3drc_dataset --scene 1 --workers 1 2 4 8 --scale 0.5
+
+Requirements:
+- NumPy
+- opencv
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+
+from infra_3drc import Infra3DRC
+from infra_3drc.video import VIDEO_CODECS
+
+
+def serial_export(scene, path: Path, scale: float, fps: float) -> float:
+    start = time.perf_counter()
+    writer = None
+    for frame in scene:
+        image = frame.render()
+        if scale != 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        if writer is None:
+            fourcc = cv2.VideoWriter_fourcc(*VIDEO_CODECS[path.suffix])
+            writer = cv2.VideoWriter(str(path), fourcc, fps, (image.shape[1], image.shape[0]))
+        writer.write(image)
+    writer.release()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--scene", type=int, default=1)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--scale", type=float, default=0.5)
+    parser.add_argument("--fps", type=float, default=10.0)
+    parser.add_argument("--format", default=".mp4", choices=list(VIDEO_CODECS))
+    args = parser.parse_args()
+
+    scene = Infra3DRC(args.dataset_root, args.scene)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        serial_time = serial_export(scene, Path(tmp_dir).joinpath("serial" + args.format), args.scale, args.fps)
+        num_frames = len(scene)
+        print(f"scene {args.scene}: {num_frames} frames, scale {args.scale}")
+        print(
+            f"{'export':<20}{'fps':>8}{'speedup':>9}{'decode':>9}{'render':>9}{'encode':>9}{'wait':>9}  (ms/frame)"
+        )
+        print(f"{'serial loop':<20}{num_frames / serial_time:>8.1f}{1.0:>9.1f}")
+        for workers in args.workers:
+            stats = scene.export_video(
+                Path(tmp_dir).joinpath(f"workers_{workers}" + args.format), workers=workers, fps=args.fps, scale=args.scale
+            )
+            per_frame = [1000 * getattr(stats, stage) / stats.num_frames for stage in ("decode", "render", "encode", "wait")]
+            print(
+                f"{f'{workers} processes':<20}{stats.fps:>8.1f}{serial_time / stats.total:>9.1f}"
+                + "".join(f"{value:>9.1f}" for value in per_frame)
+            )
+
+
+if __name__ == "__main__":
+    main()
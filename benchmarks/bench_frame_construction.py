@@ -0,0 +1,47 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_frame_construction.py
+
+Description:
+Measures the time to create a Frame object for all the frames of a scene, with and without accessing the annotations.
+
+usage: python benchmarks/bench_frame_construction.py /path/to/infra_3drc_dataset --scene 1
+
+Requirements:
+- NumPy
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from infra_3drc import Infra3DRC
+
+
+def bench(scene: Infra3DRC, touch_annotations: bool) -> float:
+    start = time.perf_counter()
+    for frame in scene:
+        if touch_annotations:
+            frame.objects
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--scene", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="number of passes over the scene, the best one is reported.")
+    args = parser.parse_args()
+
+    scene = Infra3DRC(str(args.dataset_root), args.scene)
+    num_frames = len(scene.images_paths_list)
+
+    print(f"{'annotations':<14}{'frames':>8}{'total [ms]':>12}{'us/frame':>12}")
+    for touch_annotations in (False, True):
+        elapsed = min(bench(scene, touch_annotations) for _ in range(args.repeat))
+        label = "touched" if touch_annotations else "untouched"
+        print(f"{label:<14}{num_frames:>8}{1000 * elapsed:>12.2f}{1e6 * elapsed / num_frames:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
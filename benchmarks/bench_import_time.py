@@ -0,0 +1,58 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_import_time.py
+
+Description:
+Measures the startup cost of the SDK: the time of `import infra_3drc` in a fresh interpreter, compared with NumPy
+alone and with the modules the SDK imported before visualization was made optional (NumPy, OpenCV, and
+matplotlib.pyplot with the TkAgg backend). Also lists which of the heavy modules are loaded by the import.
+
+usage: python benchmarks/bench_import_time.py --repeat 5
+
+Requirements:
+- NumPy
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = {
+    "numpy": "import numpy",
+    "infra_3drc": "import infra_3drc",
+    "infra_3drc + cv2": "import infra_3drc, cv2",
+    "numpy + cv2 + pyplot": "import numpy, cv2, matplotlib; matplotlib.use('TkAgg'); import matplotlib.pyplot",
+}
+HEAVY_MODULES = ("cv2", "matplotlib", "asyncio", "mpl_toolkits")
+
+
+def import_time(statement: str) -> float:
+    """wall time of the statement in a new interpreter, in seconds. None if the import fails."""
+    code = f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'import':<24}{'median [ms]':>12}{'min [ms]':>10}")
+    for name, statement in STATEMENTS.items():
+        times = [import_time(statement) for _ in range(args.repeat)]
+        if None in times:
+            print(f"{name:<24}{'failed':>12}")
+            continue
+        print(f"{name:<24}{1000 * statistics.median(times):>12.1f}{1000 * min(times):>10.1f}")
+
+    code = f"import sys, infra_3drc; print(' '.join(m for m in {HEAVY_MODULES} if m in sys.modules))"
+    loaded = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout.split()
+    print(f"heavy modules loaded by import infra_3drc: {', '.join(loaded) if loaded else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
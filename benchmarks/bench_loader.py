@@ -0,0 +1,69 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_loader.py
+
+Description:
+Throughput of the FrameLoader in frames per second: one epoch of shuffled batches with camera images, radar and lidar
+clouds and detections, collated by a serial loop in the training process, and by the FrameLoader with several numbers
+of thread and process workers, for the flat and the padded cloud layout.
+
+usage: python benchmarks/bench_loader.py /path/to/infra_3drc_dataset --batch-size 8 --workers 1 2 4 8 --frames 256
+
+Requirements:
+- NumPy
+- opencv
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from infra_3drc import Infra3DRCDataset
+from infra_3drc.loader import BatchSampler, FrameLoader, collate
+
+
+def serial_epoch(dataset, indices, batch_size: int, layout: str) -> int:
+    num_frames = 0
+    sampler = BatchSampler(indices, batch_size, shuffle=True)
+    for batch_indices in sampler:
+        batch = collate([dataset[int(idx)] for idx in batch_indices], batch_indices, layout=layout)
+        num_frames += len(batch)
+    return num_frames
+
+
+def loader_epoch(loader: FrameLoader) -> int:
+    return sum(len(batch) for batch in loader)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--frames", type=int, default=256, help="number of frames of the epoch, the first frames of the dataset.")
+    args = parser.parse_args()
+
+    dataset = Infra3DRCDataset(args.dataset_root)
+    indices = np.arange(min(args.frames, len(dataset)))
+    print(f"{len(indices)} frames, batch size {args.batch_size}")
+    print(f"{'loader':<24}{'layout':<8}{'frames/s':>10}{'speedup':>9}")
+    for layout in ("flat", "padded"):
+        start = time.perf_counter()
+        num_frames = serial_epoch(dataset, indices, args.batch_size, layout)
+        serial_fps = num_frames / (time.perf_counter() - start)
+        print(f"{'serial collate':<24}{layout:<8}{serial_fps:>10.1f}{1.0:>9.1f}")
+        for backend in ("thread", "process"):
+            for workers in args.workers:
+                loader = FrameLoader(
+                    dataset, args.batch_size, shuffle=True, indices=indices, layout=layout, workers=workers, backend=backend
+                )
+                start = time.perf_counter()
+                num_frames = loader_epoch(loader)
+                fps = num_frames / (time.perf_counter() - start)
+                print(f"{f'{backend}, {workers} workers':<24}{layout:<8}{fps:>10.1f}{fps / serial_fps:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
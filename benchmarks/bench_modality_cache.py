@@ -0,0 +1,65 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_modality_cache.py
+
+Description:
+Simulates a viewer scrubbing back and forth over a scene: random accesses to frames in a sliding window,
+each reading the camera image and the lidar point cloud. Compares the time without modality cache (every access
+creates a new Frame which decodes again) with a ModalityCache of the given budget, and reports the cache counters.
+
+usage: python benchmarks/bench_modality_cache.py /path/to/infra_3drc_dataset --scene 1 --accesses 200 --budget-mib 512
+
+Requirements:
+- NumPy
+- opencv
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+from infra_3drc import Infra3DRC, ModalityCache
+
+
+def scrub(scene, accesses) -> float:
+    start = time.perf_counter()
+    for idx in accesses:
+        frame = scene[idx]
+        frame.camera_image, frame.lidar_point_cloud
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--scene", type=int, default=1)
+    parser.add_argument("--accesses", type=int, default=200)
+    parser.add_argument("--window", type=int, default=10, help="frames around the current position which are accessed.")
+    parser.add_argument("--budget-mib", type=int, default=512, help="budget of each modality in MiB.")
+    args = parser.parse_args()
+
+    scene = Infra3DRC(args.dataset_root, args.scene)
+    num_frames = scene._num_frames()
+    rng = random.Random(0)
+    accesses, position = [], 0
+    for _ in range(args.accesses):
+        position = min(max(position + rng.randint(-2, 3), 0), num_frames - 1)
+        accesses.append(min(max(position + rng.randint(-args.window // 2, args.window // 2), 0), num_frames - 1))
+
+    no_cache_time = scrub(scene, accesses)
+    cache = ModalityCache(args.budget_mib * 2**20)
+    cached_scene = Infra3DRC(args.dataset_root, args.scene, modality_cache=cache)
+    cache_time = scrub(cached_scene, accesses)
+
+    print(f"scene {args.scene}: {args.accesses} accesses over {len(set(accesses))} distinct frames")
+    print(f"{'modality cache':<16}{'total [s]':>10}{'ms/access':>11}{'speedup':>9}")
+    for name, elapsed in (("none", no_cache_time), (f"{args.budget_mib} MiB", cache_time)):
+        print(f"{name:<16}{elapsed:>10.2f}{1000 * elapsed / args.accesses:>11.2f}{no_cache_time / elapsed:>9.1f}")
+    print(f"{'modality':<20}{'hits':>8}{'misses':>8}{'evictions':>11}{'MiB':>9}")
+    for modality, stats in cache.stats().items():
+        print(f"{modality:<20}{stats.hits:>8}{stats.misses:>8}{stats.evictions:>11}{stats.nbytes / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_object_matching.py
+
+Description:
+Compares the time to match camera and radar objects of a frame (Frame._get_objects) between the previous
+per camera object radar scan and the det_id index with batched point conversion.
+By default, the scene with most annotated objects per frame is used.
+
+usage: python benchmarks/bench_object_matching.py /path/to/infra_3drc_dataset [--scene 13]
+
+Requirements:
+- NumPy
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from infra_3drc import Infra3DRC
+from infra_3drc.utils import Detection
+
+
+def legacy_get_objects(frame):
+    """the object matching used before the det_id index."""
+    camera_objects = frame.camera_annot_dict["annotations"]
+    radar_objects = frame.radar_annot_dict["objects"]
+
+    objects = []
+    for c_obj in camera_objects:
+        det_id = c_obj["det_id"]
+        track_id = c_obj.get("track_id")
+        try:
+            r_object = [r_obj for r_obj in radar_objects if r_obj["det_id"] == det_id][0]
+            instance_id = r_object["instance_id"]
+            obj_points = frame._points_list_to_recarray(r_object["points"])
+        except IndexError:
+            instance_id = None
+            obj_points = None
+        objects.append(
+            Detection(
+                image_id=frame.image_id,
+                det_id=det_id,
+                category_id=c_obj["category_id"],
+                track_id=track_id,
+                instance_id=instance_id,
+                bbox=c_obj["bbox"],
+                points=obj_points,
+            )
+        )
+    return objects
+
+
+def densest_scene(dataset_root: Path) -> int:
+    """scene number with most camera objects per frame."""
+    density = {}
+    for scene_path in sorted(dataset_root.glob("INFRA-3DRC_scene-*")):
+        annot_paths = list(scene_path.joinpath("camera_01", "camera_01__annotation").iterdir())
+        num_objects = 0
+        for annot_path in annot_paths:
+            with open(str(annot_path), "r") as f:
+                num_objects += len(json.load(f)["annotations"])
+        density[int(scene_path.name.split("-")[-1])] = num_objects / max(len(annot_paths), 1)
+    return max(density, key=density.get)
+
+
+def bench(frames, get_objects) -> float:
+    start = time.perf_counter()
+    for frame in frames:
+        get_objects(frame)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--scene", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3, help="number of passes over the scene, the best one is reported.")
+    args = parser.parse_args()
+
+    scene_number = args.scene if args.scene is not None else densest_scene(args.dataset_root)
+    scene = Infra3DRC(str(args.dataset_root), scene_number)
+    frames = list(scene)
+    # json parsing is not part of the measurement.
+    for frame in frames:
+        frame.camera_annot_dict, frame.radar_annot_dict, frame.image_id
+    num_objects = sum(len(frame.camera_annot_dict["annotations"]) for frame in frames)
+    num_points = sum(len(obj["points"]) for frame in frames for obj in frame.radar_annot_dict["objects"])
+
+    print(f"scene {scene_number}: {len(frames)} frames, {num_objects} camera objects, {num_points} labeled radar points")
+    print(f"{'matching':<12}{'total [ms]':>12}{'us/frame':>12}{'speedup':>10}")
+    legacy_time = min(bench(frames, legacy_get_objects) for _ in range(args.repeat))
+    new_time = min(bench(frames, lambda frame: frame._get_objects()) for _ in range(args.repeat))
+    for name, elapsed in (("legacy", legacy_time), ("det_id index", new_time)):
+        print(f"{name:<12}{1000 * elapsed:>12.2f}{1e6 * elapsed / len(frames):>12.1f}{legacy_time / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_pcd_decode.py
+
+Description:
+Compares the decoding time of radar and lidar pcd files between the previous per point struct.unpack decoder
+and the vectorized decoder in infra_3drc.pcd.
+
+usage: python benchmarks/bench_pcd_decode.py /path/to/infra_3drc_dataset --scene 1 --frames 20
+
+Requirements:
+- NumPy
+"""
+
+import argparse
+import struct
+import time
+from pathlib import Path
+
+import numpy as np
+
+from infra_3drc.pcd import read_pcd, read_pcd_header, add_index_field
+
+RADAR_TYP_STR = "<ffffffff"
+LIDAR_TYP_STR = "<fff4xfIHB1xH2xI4x4x4x"
+
+
+def legacy_read_pcd(pcd_path, type_str):
+    """the per point decoder used before the vectorized implementation."""
+    with open(str(pcd_path), "rb") as pcd_file:
+        metadata = read_pcd_header(pcd_file)
+        binary_data = pcd_file.read()
+
+    np_dtypes = [
+        (field, np.dtype(typ))
+        for field, typ in zip(metadata["FIELDS"], type_str[1:].replace("x", ""))
+        if not field == "PAD"
+    ]
+    point_size = sum(s * c for s, c in zip(metadata["SIZE"], metadata["COUNT"]))
+    cloud = []
+    start = 0
+    for _ in range(metadata["POINTS"]):
+        end = start + point_size
+        cloud.append(struct.unpack(type_str, binary_data[start:end]))
+        start = end
+    return np.rec.array(cloud, dtype=np_dtypes)
+
+
+def vectorized_read_pcd(pcd_path, type_str):
+    return add_index_field(read_pcd(pcd_path, type_str))
+
+
+def bench(paths, decoder, type_str):
+    start = time.perf_counter()
+    num_points = 0
+    for path in paths:
+        num_points += decoder(path, type_str).shape[0]
+    return time.perf_counter() - start, num_points
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--scene", type=int, default=1)
+    parser.add_argument("--frames", type=int, default=20, help="number of frames to decode per sensor.")
+    args = parser.parse_args()
+
+    scene_path = args.dataset_root.joinpath(f"INFRA-3DRC_scene-{str(args.scene).zfill(2)}")
+    sensors = {
+        "radar": (scene_path.joinpath("radar_01", "radar_01__data"), RADAR_TYP_STR),
+        "lidar": (scene_path.joinpath("lidar_01", "lidar_01__data"), LIDAR_TYP_STR),
+    }
+
+    print(f"{'sensor':<8}{'decoder':<12}{'frames':>8}{'points':>12}{'total [s]':>12}{'ms/frame':>12}{'speedup':>10}")
+    for sensor, (data_dir, type_str) in sensors.items():
+        paths = sorted(data_dir.iterdir())[: args.frames]
+        legacy_time, num_points = bench(paths, legacy_read_pcd, type_str)
+        new_time, _ = bench(paths, vectorized_read_pcd, type_str)
+        for name, elapsed in (("legacy", legacy_time), ("vectorized", new_time)):
+            print(
+                f"{sensor:<8}{name:<12}{len(paths):>8}{num_points:>12}{elapsed:>12.3f}"
+                f"{1000 * elapsed / len(paths):>12.2f}{legacy_time / elapsed:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
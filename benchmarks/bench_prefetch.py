@@ -0,0 +1,57 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_prefetch.py
+
+Description:
+Compares the throughput (frames/s) of one pass over a scene between the sequential iteration and
+Infra3DRC.iter_prefetch with the thread and process backends. Each frame decodes the camera image, the radar
+and lidar point clouds and the objects. The consumer work per frame (e.g. a training step) is simulated with sleep.
+
+usage: python benchmarks/bench_prefetch.py /path/to/infra_3drc_dataset --scene 1 --workers 4 --consumer-ms 20
+
+Requirements:
+- NumPy
+- opencv
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from infra_3drc import Infra3DRC
+from infra_3drc.prefetch import DEFAULT_FIELDS
+
+
+def consume(frames, consumer_s: float) -> float:
+    start = time.perf_counter()
+    num_frames = 0
+    for frame in frames:
+        for field in DEFAULT_FIELDS:
+            getattr(frame, field)
+        time.sleep(consumer_s)
+        num_frames += 1
+    return num_frames / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--scene", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--consumer-ms", type=float, default=20.0, help="simulated work per frame in the consumer.")
+    args = parser.parse_args()
+
+    scene = Infra3DRC(args.dataset_root, args.scene)
+    consumer_s = args.consumer_ms / 1000
+    results = {"sequential": consume(scene, consumer_s)}
+    for backend in ("thread", "process"):
+        results[backend] = consume(scene.iter_prefetch(workers=args.workers, backend=backend), consumer_s)
+
+    print(f"scene {args.scene}: {len(scene)} frames, {args.workers} workers, {args.consumer_ms} ms consumer work per frame")
+    print(f"{'loader':<12}{'frames/s':>10}{'speedup':>10}")
+    for name, frames_per_s in results.items():
+        print(f"{name:<12}{frames_per_s:>10.1f}{frames_per_s / results['sequential']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_projection.py
+
+Description:
+Compares the time to project radar and lidar point clouds on the camera image between the previous
+implementation of Frame.project_cloud_to_camera and the vectorized one, in float64 and float32.
+
+usage: python benchmarks/bench_projection.py /path/to/infra_3drc_dataset --scene 1 --frames 3
+
+Requirements:
+- NumPy
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import numpy.lib.recfunctions as rfn
+
+from infra_3drc import Infra3DRC
+
+
+def legacy_project_cloud_to_camera(frame, mode, cloud):
+    """the projection used before vectorization."""
+    camera_instrinsics = frame.calibration.camera_intrinsics
+    if mode == "lidar":
+        extrinsics = frame.calibration.lidar_to_camera
+    else:
+        extrinsics = frame.calibration.radar_to_camera
+
+    cloud_xyz = cloud[["x", "y", "z", "index"]].copy()
+    cloud_xyz["index"] = 1
+    index = cloud["index"]
+    p = np.matmul(camera_instrinsics, extrinsics)
+    projected_points = np.matmul(p, rfn.structured_to_unstructured(cloud_xyz).transpose())
+    projected_points = np.array(
+        [
+            projected_points[0, :] / projected_points[2, :],
+            projected_points[1, :] / projected_points[2, :],
+        ]
+    )
+    projected_points = np.column_stack((index, np.transpose(projected_points)))
+    dtype = np.dtype({"names": ["index", "u", "v"], "formats": [np.uint32, np.float32, np.float32]})
+    projected_points = rfn.unstructured_to_structured(projected_points, dtype=dtype)
+
+    indices = [idx for idx, _ in enumerate(cloud["index"]) if _ in projected_points["index"]]
+    return rfn.merge_arrays((cloud[indices], projected_points[["u", "v"]]), flatten=True, asrecarray=True)
+
+
+def bench(frames, mode, project) -> float:
+    start = time.perf_counter()
+    for frame in frames:
+        cloud = frame.radar_point_cloud if mode == "radar" else frame.lidar_point_cloud
+        project(frame, mode, cloud)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--scene", type=int, default=1)
+    parser.add_argument("--frames", type=int, default=3, help="number of frames to project. The previous implementation is quadratic in the number of points.")
+    args = parser.parse_args()
+
+    scene = Infra3DRC(str(args.dataset_root), args.scene)
+    frames = [scene[idx] for idx in range(args.frames)]
+    # decoding is not part of the measurement.
+    for frame in frames:
+        frame.radar_point_cloud, frame.lidar_point_cloud
+
+    implementations = {
+        "legacy": legacy_project_cloud_to_camera,
+        "float64": lambda frame, mode, cloud: frame.project_cloud_to_camera(mode, cloud),
+        "float32": lambda frame, mode, cloud: frame.project_cloud_to_camera(mode, cloud, dtype=np.float32),
+        "uv only": lambda frame, mode, cloud: frame.project_points_to_camera(mode, cloud, dtype=np.float32),
+    }
+
+    print(f"{'sensor':<8}{'projection':<12}{'points/frame':>14}{'ms/frame':>12}{'speedup':>10}")
+    for mode in ("radar", "lidar"):
+        num_points = sum(
+            (frame.radar_point_cloud if mode == "radar" else frame.lidar_point_cloud).shape[0] for frame in frames
+        ) // len(frames)
+        timings = {name: bench(frames, mode, project) for name, project in implementations.items()}
+        for name, elapsed in timings.items():
+            print(
+                f"{mode:<8}{name:<12}{num_points:>14}{1000 * elapsed / len(frames):>12.2f}"
+                f"{timings['legacy'] / elapsed:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
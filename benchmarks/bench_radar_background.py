@@ -0,0 +1,76 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_radar_background.py
+
+Description:
+Compares the time to compute Frame.radar_background_cloud between the previous implementation
+(projecting background and raw cloud, np.isin, np.append and record-level np.unique) and the
+index mask partition of the raw radar cloud, for all the scenes found in the dataset root.
+
+usage: python benchmarks/bench_radar_background.py /path/to/infra_3drc_dataset
+
+Requirements:
+- NumPy
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from infra_3drc import Infra3DRC
+
+
+def legacy_radar_background_cloud(frame):
+    """the background extraction used before the index mask partition."""
+    background_cloud = frame._points_list_to_recarray(frame.radar_annot_dict["background"])
+    background_cloud = background_cloud[background_cloud["x"] <= 120]
+    background_cloud = frame.project_cloud_to_camera("radar", background_cloud)
+    raw_cloud = frame.project_cloud_to_camera("radar", frame.radar_point_cloud)
+    clipped_cloud = frame._clip_point_cloud_to_camera_fov(raw_cloud)
+    points_outside_image = raw_cloud[np.isin(raw_cloud["index"], clipped_cloud["index"], invert=True)]
+    if points_outside_image.shape[0] > 0:
+        background_cloud = np.append(background_cloud, points_outside_image)
+    return np.unique(background_cloud)
+
+
+def new_radar_background_cloud(frame):
+    frame._radar_background_cloud = None
+    return frame.radar_background_cloud
+
+
+def bench(frames, background_cloud) -> float:
+    start = time.perf_counter()
+    for frame in frames:
+        background_cloud(frame)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    args = parser.parse_args()
+
+    scene_numbers = sorted(
+        int(scene_path.name.split("-")[-1]) for scene_path in args.dataset_root.glob("INFRA-3DRC_scene-*")
+    )
+
+    print(f"{'scene':<8}{'frames':>8}{'legacy [ms]':>14}{'new [ms]':>12}{'speedup':>10}")
+    total_legacy, total_new, total_frames = 0.0, 0.0, 0
+    for scene_number in scene_numbers:
+        frames = list(Infra3DRC(str(args.dataset_root), scene_number))
+        # reading the pcd and json files is not part of the measurement.
+        for frame in frames:
+            frame.radar_point_cloud, frame.radar_annot_dict, frame.image_shape
+
+        legacy_time = bench(frames, legacy_radar_background_cloud)
+        new_time = bench(frames, new_radar_background_cloud)
+        total_legacy, total_new, total_frames = total_legacy + legacy_time, total_new + new_time, total_frames + len(frames)
+        print(f"{scene_number:<8}{len(frames):>8}{1000 * legacy_time:>14.2f}{1000 * new_time:>12.2f}{legacy_time / new_time:>10.1f}")
+
+    print(f"{'all':<8}{total_frames:>8}{1000 * total_legacy:>14.2f}{1000 * total_new:>12.2f}{total_legacy / total_new:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_rasterize.py
+
+Description:
+Throughput of the BEVRasterizer and the Voxelizer on the radar and lidar clouds of the first frames of a scene,
+one call per frame and one call for the whole batch, compared with binning the radar points in a python loop.
+The clouds are decoded before timing, so only the rasterization is measured.
+
+usage: python benchmarks/bench_rasterize.py /path/to/infra_3drc_dataset --scene 1 --frames 16 --ground
+
+Requirements:
+- NumPy
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from infra_3drc import Infra3DRC
+from infra_3drc.rasterize import BEVRasterizer, Voxelizer, POINT_RANGE
+
+
+def python_loop_bev(cloud: np.ndarray, resolution: float) -> np.ndarray:
+    """count, max z, mean rcs and mean range rate per cell, one point at a time."""
+    (x_min, x_max), (y_min, y_max), (z_min, z_max) = POINT_RANGE
+    rows, cols = int(round((y_max - y_min) / resolution)), int(round((x_max - x_min) / resolution))
+    cells = {}
+    for x, y, z, rcs, range_rate in zip(cloud["x"], cloud["y"], cloud["z"], cloud["rcs"], cloud["range_rate"]):
+        if x_min <= x < x_max and y_min <= y < y_max and z_min <= z < z_max:
+            cells.setdefault((int((y - y_min) // resolution), int((x - x_min) // resolution)), []).append((z, rcs, range_rate))
+    grid = np.zeros((4, rows, cols), dtype=np.float32)
+    for (row, col), points in cells.items():
+        z, rcs, range_rate = zip(*points)
+        grid[:, row, col] = len(points), max(z), np.mean(rcs), np.mean(range_rate)
+    return grid
+
+
+def best_of(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--scene", type=int, default=1)
+    parser.add_argument("--frames", type=int, default=16)
+    parser.add_argument("--resolution", type=float, default=0.5)
+    parser.add_argument("--ground", action="store_true", help="rasterize in the ground frame.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    scene = Infra3DRC(args.dataset_root, args.scene)
+    frames = scene[: args.frames]
+    clouds = {"radar": [frame.radar_point_cloud for frame in frames], "lidar": [frame.lidar_point_cloud for frame in frames]}
+    bev = BEVRasterizer(resolution=args.resolution, ground=args.ground)
+    voxelizer = Voxelizer(voxel_size=args.resolution, ground=args.ground)
+
+    print(f"scene {args.scene}, {len(frames)} frames, {bev}")
+    print(f"{'sensor':<8}{'stage':<26}{'points':>10}{'ms/frame':>10}{'frames/s':>10}{'Mpoints/s':>11}")
+    for sensor, sensor_clouds in clouds.items():
+        num_points = sum(cloud.shape[0] for cloud in sensor_clouds)
+        stages = [
+            ("bev, one call per frame", lambda: [bev(cloud, sensor, scene.calibration) for cloud in sensor_clouds]),
+            ("bev, one batch call", lambda: bev(sensor_clouds, sensor, scene.calibration)),
+            ("voxels, one call per frame", lambda: [voxelizer(cloud, sensor, scene.calibration) for cloud in sensor_clouds]),
+            ("voxels, one batch call", lambda: voxelizer(sensor_clouds, sensor, scene.calibration)),
+        ]
+        if sensor == "radar" and not args.ground:
+            stages.insert(0, ("bev, python loop", lambda: [python_loop_bev(cloud, args.resolution) for cloud in sensor_clouds]))
+        for name, func in stages:
+            elapsed = best_of(func, args.repeat)
+            print(
+                f"{sensor:<8}{name:<26}{num_points:>10}{1000 * elapsed / len(frames):>10.2f}"
+                f"{len(frames) / elapsed:>10.1f}{num_points / elapsed / 1e6:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
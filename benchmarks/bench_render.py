@@ -0,0 +1,97 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_render.py
+
+Description:
+Compares the time to draw the radar points of the annotated objects on the camera images, the way
+Frame._draw_objects did it over time: one cv2.circle call per point, one draw_points call per object,
+and one draw_points call per image for the points of all the objects.
+Reading and projecting the points is not part of the measurement.
+
+usage: python benchmarks/bench_render.py /path/to/infra_3drc_dataset [--scene 13]
+
+Requirements:
+- NumPy
+- opencv
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from infra_3drc import Infra3DRC
+from infra_3drc.frame import TRACK_COLORS
+from infra_3drc.render import draw_points
+
+RADIUS = 7
+
+
+def object_points(frame):
+    """(u, v, color) of the projected radar points of each object with points."""
+    points = []
+    for obj in frame.objects:
+        if obj.points is None:
+            continue
+        u, v, _ = frame.project_points_to_camera(mode="radar", cloud=obj.points)
+        color = TRACK_COLORS[(obj.track_id if obj.track_id is not None else obj.det_id) % len(TRACK_COLORS)]
+        points.append((u, v, color))
+    return points
+
+
+def draw_cv2_circles(image, points):
+    for u, v, color in points:
+        for i in range(u.shape[0]):
+            cv2.circle(image, (int(u[i]), int(v[i])), RADIUS, color, -1)
+
+
+def draw_per_object(image, points):
+    for u, v, color in points:
+        draw_points(image, u, v, color, RADIUS)
+
+
+def draw_per_image(image, points):
+    if not points:
+        return
+    u = np.concatenate([u for u, _, _ in points])
+    v = np.concatenate([v for _, v, _ in points])
+    colors = np.concatenate(
+        [np.broadcast_to(np.asarray(color, dtype=np.uint8), (u.shape[0], 3)) for u, _, color in points]
+    )
+    draw_points(image, u, v, colors, RADIUS)
+
+
+def bench(images, frame_points, draw) -> float:
+    start = time.perf_counter()
+    for image, points in zip(images, frame_points):
+        draw(image, points)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--scene", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="number of passes over the scene, the best one is reported.")
+    args = parser.parse_args()
+
+    frames = list(Infra3DRC(str(args.dataset_root), args.scene))
+    frame_points = [object_points(frame) for frame in frames]
+    images = [frame.camera_image for frame in frames]
+    num_objects = sum(len(points) for points in frame_points)
+    num_points = sum(u.shape[0] for points in frame_points for u, _, _ in points)
+
+    print(f"scene {args.scene}: {len(frames)} frames, {num_objects} objects with radar points, {num_points} points")
+    print(f"{'drawing':<14}{'total [ms]':>12}{'us/frame':>12}{'speedup':>10}")
+    timings = {}
+    for name, draw in (("cv2.circle", draw_cv2_circles), ("per object", draw_per_object), ("per image", draw_per_image)):
+        # each pass draws on fresh copies, so every pass does the same work.
+        timings[name] = min(bench([image.copy() for image in images], frame_points, draw) for _ in range(args.repeat))
+    for name, elapsed in timings.items():
+        print(f"{name:<14}{1000 * elapsed:>12.2f}{1e6 * elapsed / len(frames):>12.1f}{timings['cv2.circle'] / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_scene_cache.py
+
+Description:
+Compares the time of one pass over a scene, reading the radar and lidar point clouds, objects and radar
+background points of every frame, between the scene files (pcds and jsons) and the packed binary scene cache.
+The cache is built into a temporary directory first.
+
+usage: python benchmarks/bench_scene_cache.py /path/to/infra_3drc_dataset --scene 1
+
+Requirements:
+- NumPy
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from infra_3drc import Infra3DRC
+
+
+def bench(scene) -> float:
+    start = time.perf_counter()
+    for frame in scene:
+        frame.radar_point_cloud, frame.lidar_point_cloud, frame.objects, frame._radar_background_index()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--scene", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_path:
+        start = time.perf_counter()
+        scene = Infra3DRC(args.dataset_root, args.scene)
+        files_init = time.perf_counter() - start
+        files_time = bench(scene)
+
+        start = time.perf_counter()
+        scene.build_cache(cache_path)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cached_scene = Infra3DRC.from_cache(cache_path)
+        cache_init = time.perf_counter() - start
+        cache_time = bench(cached_scene)
+
+    print(f"scene {args.scene}: {len(scene)} frames, cache built in {build_time:.2f} s")
+    print(f"{'source':<8}{'init [ms]':>12}{'pass [ms]':>12}{'ms/frame':>12}{'speedup':>10}")
+    for name, init, elapsed in (("files", files_init, files_time), ("cache", cache_init, cache_time)):
+        print(f"{name:<8}{1000 * init:>12.2f}{1000 * elapsed:>12.2f}{1000 * elapsed / len(scene):>12.3f}{files_time / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
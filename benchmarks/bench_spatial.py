@@ -0,0 +1,85 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_spatial.py
+
+Description:
+Gathers the lidar points around each radar point of a frame, with radius and kNN queries, by brute force distances
+(in chunks of radar points) and with the voxel index of Frame.spatial_index. Reports the time to build the index and
+the query times, and checks that both give the same neighbors.
+
+usage: python benchmarks/bench_spatial.py /path/to/infra_3drc_dataset --scene 1 --frame 0 --radius 1.0 --k 8
+
+Requirements:
+- NumPy
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from infra_3drc import Infra3DRC
+from infra_3drc.spatial import VoxelIndex, DEFAULT_VOXEL_SIZES, cloud_xyz
+
+
+def brute_force_distances(points: np.ndarray, queries: np.ndarray, chunk_size: int = 64):
+    """distances of chunks of queries to all the points."""
+    for start in range(0, queries.shape[0], chunk_size):
+        chunk = queries[start : start + chunk_size]
+        yield np.sqrt(((chunk[:, None, :] - points[None, :, :]) ** 2).sum(axis=2))
+
+
+def brute_force_radius(points: np.ndarray, queries: np.ndarray, radius: float) -> int:
+    return sum(int((distances <= radius).sum()) for distances in brute_force_distances(points, queries))
+
+
+def brute_force_knn(points: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    return np.concatenate(
+        [np.sort(np.partition(distances, k - 1, axis=1)[:, :k], axis=1) for distances in brute_force_distances(points, queries)]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--scene", type=int, default=1)
+    parser.add_argument("--frame", type=int, default=0)
+    parser.add_argument("--radius", type=float, default=1.0)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--voxel-size", type=float, default=None, help="defaults to the lidar default of spatial.py.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frame = Infra3DRC(args.dataset_root, args.scene)[args.frame]
+    points = cloud_xyz(frame.lidar_point_cloud)
+    queries = cloud_xyz(frame.radar_point_cloud)
+
+    def best_of(func):
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = func()
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    voxel_size = DEFAULT_VOXEL_SIZES["lidar"] if args.voxel_size is None else args.voxel_size
+    build_time, _ = best_of(lambda: VoxelIndex(points, voxel_size))
+    index = frame.spatial_index("lidar", voxel_size)
+    radius_time, (_, _, offsets) = best_of(lambda: index.query_radius(queries, args.radius))
+    knn_time, (_, knn_distances) = best_of(lambda: index.query_knn(queries, args.k))
+    brute_radius_time, brute_count = best_of(lambda: brute_force_radius(points, queries, args.radius))
+    brute_knn_time, brute_knn_distances = best_of(lambda: brute_force_knn(points, queries, args.k))
+
+    assert offsets[-1] == brute_count, "radius query results differ from brute force."
+    assert np.allclose(knn_distances, brute_knn_distances), "kNN results differ from brute force."
+
+    print(f"{len(queries)} radar points, {len(points)} lidar points, {index}")
+    print(f"{'query':<24}{'brute force [ms]':>18}{'voxel index [ms]':>18}{'speedup':>9}")
+    print(f"{f'radius {args.radius} m':<24}{1000 * brute_radius_time:>18.2f}{1000 * radius_time:>18.2f}{brute_radius_time / radius_time:>9.1f}")
+    print(f"{f'{args.k} nearest':<24}{1000 * brute_knn_time:>18.2f}{1000 * knn_time:>18.2f}{brute_knn_time / knn_time:>9.1f}")
+    print(f"index build: {1000 * build_time:.2f} ms, {offsets[-1]} neighbors within {args.radius} m")
+
+
+if __name__ == "__main__":
+    main()
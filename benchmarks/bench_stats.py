@@ -0,0 +1,78 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_stats.py
+
+Description:
+Computes the dataset statistics (frames, camera and radar instances, labeled points per category, histograms) with
+a python loop over the objects of all the frames, and with Infra3DRCDataset.stats: from scratch for several numbers
+of worker processes, from the stored statistics, and with one scene out of date (removed from the stored file,
+as after a modification of its files).
+
+usage: python benchmarks/bench_stats.py /path/to/infra_3drc_dataset --workers 1 2 4 8
+
+Requirements:
+- NumPy
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from infra_3drc import Infra3DRC, Infra3DRCDataset
+
+
+def python_loop(dataset: Infra3DRCDataset):
+    """frames, camera instances, radar instances and labeled points, one object at a time."""
+    num_frames = num_objects = num_radar_objects = num_points = 0
+    for scene_number in dataset.scene_numbers:
+        for frame in Infra3DRC(dataset.dataset_root, scene_number):
+            num_frames += 1
+            for obj in frame.objects:
+                num_objects += 1
+                if obj.points is not None:
+                    num_radar_objects += 1
+                    num_points += obj.points.shape[0]
+    return num_frames, num_objects, num_radar_objects, num_points
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    dataset = Infra3DRCDataset(args.dataset_root)
+    loop_time, reference = timed(lambda: python_loop(dataset))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stats_path = Path(tmp_dir).joinpath("stats.json")
+        print(f"{'statistics':<32}{'time [ms]':>10}{'scenes computed':>17}")
+        print(f"{'python loop over the objects':<32}{1000 * loop_time:>10.1f}{len(dataset.scene_numbers):>17}")
+        for workers in args.workers:
+            elapsed, stats = timed(lambda: dataset.stats(stats_path, rebuild=True, workers=workers))
+            print(f"{f'from scratch, {workers} processes':<32}{1000 * elapsed:>10.1f}{stats.num_computed:>17}")
+        total = stats.total
+        assert (total.num_frames, total.num_objects, total.num_radar_objects, total.num_points) == reference
+
+        elapsed, stats = timed(lambda: dataset.stats(stats_path))
+        print(f"{'stored':<32}{1000 * elapsed:>10.1f}{stats.num_computed:>17}")
+
+        with open(str(stats_path), "r") as f:
+            stored = json.load(f)
+        del stored["scenes"][str(dataset.scene_numbers[0])]
+        with open(str(stats_path), "w") as f:
+            json.dump(stored, f)
+        elapsed, stats = timed(lambda: dataset.stats(stats_path))
+        print(f"{'one scene out of date':<32}{1000 * elapsed:>10.1f}{stats.num_computed:>17}")
+        print(total)
+
+
+if __name__ == "__main__":
+    main()
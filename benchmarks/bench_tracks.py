@@ -0,0 +1,85 @@
+#! /usr/bin/env python3
+"""
+Script Name: bench_tracks.py
+
+Description:
+Compares collecting the trajectories of all the tracks of a scene by scanning the objects of every frame
+with the TrackIndex of Infra3DRC.tracks: time to build the index, to load it from the .npz file,
+and to look up all the tracks and frame windows of them.
+
+usage: python benchmarks/bench_tracks.py /path/to/infra_3drc_dataset --scene 1 --window 10
+
+Requirements:
+- NumPy
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from infra_3drc import Infra3DRC
+
+
+def scan_tracks(scene) -> dict:
+    """trajectory of each track, by iterating over the objects of all the frames."""
+    trajectories = {}
+    for idx in range(len(scene)):
+        for detection in scene[idx]:
+            if detection.track_id is None:
+                continue
+            centroid = None
+            if detection.points is not None:
+                centroid = (detection.points.x.mean(), detection.points.y.mean(), detection.points.z.mean())
+            trajectories.setdefault(detection.track_id, []).append((idx, detection.det_id, detection.bbox, centroid))
+    return trajectories
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset_root", type=Path)
+    parser.add_argument("--scene", type=int, default=1)
+    parser.add_argument("--window", type=int, default=10, help="number of frames of the window queries.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    trajectories = scan_tracks(Infra3DRC(args.dataset_root, args.scene))
+    scan_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index_path = Path(tmp_dir).joinpath("tracks.npz")
+        start = time.perf_counter()
+        tracks = Infra3DRC(args.dataset_root, args.scene).tracks(index_path, rebuild=True)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tracks = Infra3DRC(args.dataset_root, args.scene).tracks(index_path)
+        load_time = time.perf_counter() - start
+
+    assert sorted(trajectories) == tracks.track_ids.tolist()
+    start = time.perf_counter()
+    for track_id in tracks:
+        tracks[track_id].centroid
+    lookup_time = time.perf_counter() - start
+
+    num_frames = int(tracks.entries.frame.max()) + 1 if len(tracks.entries) else 0
+    start = time.perf_counter()
+    num_queries = 0
+    for track_id in tracks:
+        for start_frame in range(0, num_frames, args.window):
+            tracks.window(track_id, start_frame, start_frame + args.window)
+            num_queries += 1
+    window_time = time.perf_counter() - start
+
+    print(f"scene {args.scene}: {len(tracks)} tracks, {len(tracks.entries)} detections")
+    print(f"{'operation':<30}{'total [ms]':>12}{'us/query':>10}")
+    print(f"{'scan all frames':<30}{1000 * scan_time:>12.1f}{'':>10}")
+    print(f"{'build index (incl. save)':<30}{1000 * build_time:>12.1f}{'':>10}")
+    print(f"{'load saved index':<30}{1000 * load_time:>12.1f}{'':>10}")
+    print(f"{'lookup all tracks':<30}{1000 * lookup_time:>12.3f}{1e6 * lookup_time / max(len(tracks), 1):>10.2f}")
+    print(f"{f'windows of {args.window} frames':<30}{1000 * window_time:>12.3f}{1e6 * window_time / max(num_queries, 1):>10.2f}")
+    print(f"speedup of loaded index over scan: {scan_time / (load_time + lookup_time):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,38 +13,85 @@ Requirements:
 """
 
 from pathlib import Path
-from typing import Union, List
+from typing import AsyncIterator, Iterator, List, Sequence, Tuple, Union
 import json
+import warnings
 import numpy as np
-from .utils import SceneInfo, Calibration
-from .frame import Frame
+from .utils import SceneInfo, Calibration, read_png_shape, files_signature
+from .frame import Frame, OVERLAYS, parse_radar_annot_dtype
+from .cache import SceneCache, CachedFrame, build_scene_cache
+from .prefetch import prefetch_frames, DEFAULT_FIELDS
+from .modality_cache import ModalityCache
+from .batch import FrameBatch, batch_indices
+from .detections import DetectionTable
+from .tracks import TrackIndex, TRACKS_VERSION
+from .video import ExportStats, export_frames
+
+# number of scenes in the dataset.
+NUM_SCENES = 25
+
+# sub directories of a scene which contain one file per frame, in the order of the paths lists of Infra3DRC.
+FRAME_FILE_DIRS = (
+    ("camera_01", "camera_01__data"),
+    ("radar_01", "radar_01__data"),
+    ("camera_01", "camera_01__annotation"),
+    ("radar_01", "radar_01__annotation"),
+    ("lidar_01", "lidar_01__data"),
+)
+
+
+# calibration matrices, in the order of the Calibration fields.
+CALIBRATION_FIELDS = (
+    "lidar_to_camera",
+    "radar_to_camera",
+    "lidar_to_ground",
+    "radar_to_lidar",
+    "camera_intrinsics",
+    "camera_distcoeffs",
+)
+
+
+def scene_dir_name(scene_number: int) -> str:
+    """name of the scene directory in the dataset root, e.g. INFRA-3DRC_scene-01."""
+    return f"INFRA-3DRC_scene-{str(scene_number).zfill(2)}"
 
 
 class Infra3DRC:
-    def __init__(self, dataset_root: Union[Path, str], scene_number: int = None) -> None:
+    def __init__(
+        self,
+        dataset_root: Union[Path, str],
+        scene_number: int = None,
+        mmap: bool = False,
+        modality_cache: ModalityCache = None,
+    ) -> None:
         """convinient class for handling INFRA-3DRC-dataset.
 
         Args:
             dataset_root (Union[Path, str]): root path where dataset is stored.
             scene_number (int): scene number to read. defaults to None. If None, `dataset_root` must point to single scene directory instead of the whole dataset.
+            mmap (bool): If True, the radar and lidar pcds of the frames are memory mapped instead of read into memory. defaults to False.
+                    Useful when several processes read the same pcds, as they share the page cache.
+            modality_cache (ModalityCache): bounded cache for the decoded camera images, point clouds and objects of the frames.
+                    defaults to None, in which case each Frame object keeps its own decoded data.
         """
 
         assert Path(dataset_root).is_dir(), f"Directory does not exists: {dataset_root}."
+        self.mmap = mmap
+        self.modality_cache = modality_cache
 
         if scene_number is None:
-            if "scene" in dataset_root.split("_")[-1]:
+            if "scene" in Path(dataset_root).name.split("_")[-1]:
                 # path to single scene is provided.
                 self.scene_path = Path(dataset_root)
+                self.scene_number = int(self.scene_path.name.split("-")[-1])
             else:
                 raise ValueError("When `scene_number` is set to None, `dataset_root` must point to single scene directory.")
         else:
             self.dataset_root = Path(dataset_root)
 
-            assert scene_number <= 25, f"scene number must be in range 1-25, not {scene_number}"
+            assert 1 <= scene_number <= NUM_SCENES, f"scene number must be in range 1-{NUM_SCENES}, not {scene_number}"
             self.scene_number = scene_number
-            self.scene_path = self.dataset_root.joinpath(
-                f"INFRA-3DRC_scene-{str(scene_number).zfill(2)}"
-            )
+            self.scene_path = self.dataset_root.joinpath(scene_dir_name(scene_number))
 
         assert self.scene_path.is_dir(), f"Directory not found : {self.scene_path}"
         # read scene json
@@ -53,25 +100,263 @@ class Infra3DRC:
         self.calibration = self._parse_calibration_json()
 
         # list of pathlib.Path objects
-        self.images_paths_list = sorted(
-            self.scene_path.joinpath("camera_01", "camera_01__data").iterdir()
-        )
+        (
+            self.images_paths_list,
+            self.radar_pcds_paths_list,
+            self.camera_annot_paths_list,
+            self.radar_annot_paths_list,
+            self.lidar_pcds_paths_list,
+        ) = [sorted(self.scene_path.joinpath(*sub_dirs).iterdir()) for sub_dirs in FRAME_FILE_DIRS]
+
+        # dtype of the radar points in the annotation jsons. it is same for all the frames of the scene.
+        self._radar_annot_dtype = None
+        # (rows, cols) of the camera images. it is same for all the frames of the scene.
+        self._image_shape = None
+        # packed binary cache of the scene, see `from_cache`.
+        self._cache = None
+        # objects of all the frames.
+        self._detections = None
+        # index of the object tracks, and the file it was loaded from or saved to, see `tracks`.
+        self._tracks = None
+        self._tracks_path = None
+
+    @classmethod
+    def _from_parsed(
+        cls,
+        scene_path: Path,
+        scene_number: int,
+        scene_info: SceneInfo,
+        calibration: Calibration,
+        paths_lists: List[List[Path]],
+        mmap: bool = False,
+        radar_annot_dtype: np.dtype = None,
+        image_shape: Tuple[int, int] = None,
+        modality_cache: ModalityCache = None,
+    ) -> "Infra3DRC":
+        """creates the scene from already parsed scene information, without reading the scene directory.
 
-        self.radar_pcds_paths_list = sorted(
-            self.scene_path.joinpath("radar_01", "radar_01__data").iterdir()
-        )
+        Args:
+            scene_path (Path): path to the scene directory.
+            scene_number (int): scene number.
+            scene_info (SceneInfo): information from scene.json.
+            calibration (Calibration): calibrations from calibration.json.
+            paths_lists (List[List[Path]]): sorted file paths of each directory in FRAME_FILE_DIRS.
+            mmap (bool): If True, the pcds of the frames are memory mapped. defaults to False.
+            radar_annot_dtype (np.dtype): dtype of the points in the radar annotation jsons. defaults to None (read on first use).
+            image_shape (Tuple[int, int]): (rows, cols) of the camera images. defaults to None (read on first use).
+            modality_cache (ModalityCache): bounded cache for the decoded data of the frames. defaults to None.
+
+        Returns:
+            Infra3DRC: the scene.
+        """
+        scene = cls.__new__(cls)
+        scene.mmap = mmap
+        scene.modality_cache = modality_cache
+        scene.dataset_root = Path(scene_path).parent
+        scene.scene_number = scene_number
+        scene.scene_path = Path(scene_path)
+        scene.scene_info = scene_info
+        scene.calibration = calibration
+        (
+            scene.images_paths_list,
+            scene.radar_pcds_paths_list,
+            scene.camera_annot_paths_list,
+            scene.radar_annot_paths_list,
+            scene.lidar_pcds_paths_list,
+        ) = paths_lists
+        scene._radar_annot_dtype = radar_annot_dtype
+        scene._image_shape = image_shape
+        scene._cache = None
+        scene._detections = None
+        scene._tracks = None
+        scene._tracks_path = None
+        return scene
+
+    def build_cache(self, cache_path: Union[Path, str]) -> None:
+        """reads all the frames of the scene once and packs the point clouds and annotations into a few binary files.
+
+        Args:
+            cache_path (Union[Path, str]): directory to write the cache to. see cache.py for the layout.
+        """
+        build_scene_cache(self, cache_path)
+
+    @classmethod
+    def from_cache(
+        cls, cache_path: Union[Path, str], mmap: bool = False, modality_cache: ModalityCache = None
+    ) -> "Infra3DRC":
+        """creates the scene from a cache written by `build_cache`. No scene directory walk or json parsing is needed.
+
+        The point clouds, objects and background points of the frames are views into the memory mapped cache arrays,
+        so they are read-only. The camera images are still read from the scene directory.
 
-        self.camera_annot_paths_list = sorted(
-            self.scene_path.joinpath("camera_01", "camera_01__annotation").iterdir()
+        Args:
+            cache_path (Union[Path, str]): cache directory.
+            mmap (bool): see Infra3DRC. The cache arrays are memory mapped either way. defaults to False.
+            modality_cache (ModalityCache): bounded cache for the decoded camera images, point clouds and objects of the
+                frames, see Infra3DRC. defaults to None.
+
+        Returns:
+            Infra3DRC: the scene.
+        """
+        cache = SceneCache(cache_path)
+        scene = cls._from_metadata(
+            cache.meta["scene_path"], cache.meta["scene_number"], cache.meta, mmap=mmap, modality_cache=modality_cache
         )
+        scene._cache = cache
+        return scene
+
+    def _to_metadata(self) -> dict:
+        """json serializable scene information, calibration, radar annotation dtype, image shape and frame file names.
 
-        self.radar_annot_paths_list = sorted(
-            self.scene_path.joinpath("radar_01", "radar_01__annotation").iterdir()
+        The scene can be created again with `_from_metadata`, without reading the scene directory.
+        """
+        radar_annot_dtype = self.radar_annot_dtype
+        num_frames = self._num_frames()
+        return {
+            "scene_dir": self.scene_path.name,
+            "scene_info": {
+                "location": self.scene_info.location,
+                "weather": self.scene_info.weather,
+                "daylight": self.scene_info.daylight,
+                "description": self.scene_info.description,
+                "total_frames": self.scene_info.total_frames,
+            },
+            "calibration": {
+                name: np.asarray(getattr(self.calibration, name)).tolist() for name in CALIBRATION_FIELDS
+            },
+            "image_shape": list(self.image_shape),
+            "radar_annot_dtype": {
+                "names": list(radar_annot_dtype.names),
+                "formats": [radar_annot_dtype.fields[name][0].str for name in radar_annot_dtype.names],
+            },
+            "files": [[path.name for path in paths[:num_frames]] for paths in self._paths_lists()],
+        }
+
+    @classmethod
+    def _from_metadata(
+        cls, scene_path: Path, scene_number: int, metadata: dict, mmap: bool = False, modality_cache: ModalityCache = None
+    ) -> "Infra3DRC":
+        """creates the scene from the metadata of `_to_metadata`.
+
+        Args:
+            scene_path (Path): path to the scene directory.
+            scene_number (int): scene number.
+            metadata (dict): metadata of the scene.
+            mmap (bool): If True, the pcds of the frames are memory mapped. defaults to False.
+            modality_cache (ModalityCache): bounded cache for the decoded data of the frames. defaults to None.
+
+        Returns:
+            Infra3DRC: the scene.
+        """
+        scene_path = Path(scene_path)
+        return cls._from_parsed(
+            scene_path=scene_path,
+            scene_number=scene_number,
+            scene_info=SceneInfo(**metadata["scene_info"]),
+            calibration=Calibration(**{name: np.array(metadata["calibration"][name]) for name in CALIBRATION_FIELDS}),
+            paths_lists=[
+                [scene_path.joinpath(*sub_dirs, name) for name in names]
+                for sub_dirs, names in zip(FRAME_FILE_DIRS, metadata["files"])
+            ],
+            mmap=mmap,
+            radar_annot_dtype=np.dtype(metadata["radar_annot_dtype"]),
+            image_shape=tuple(metadata["image_shape"]),
+            modality_cache=modality_cache,
         )
 
-        self.lidar_pcds_paths_list = sorted(
-            self.scene_path.joinpath("lidar_01", "lidar_01__data").iterdir()
+    def _paths_lists(self) -> List[List[Path]]:
+        """file paths lists, in the order of FRAME_FILE_DIRS."""
+        return [
+            self.images_paths_list,
+            self.radar_pcds_paths_list,
+            self.camera_annot_paths_list,
+            self.radar_annot_paths_list,
+            self.lidar_pcds_paths_list,
+        ]
+
+    def _num_frames(self) -> int:
+        """number of frames for which all the sensor files are available."""
+        return min(len(paths) for paths in self._paths_lists())
+
+    @property
+    def image_shape(self) -> Tuple[int, int]:
+        """(rows, cols) of the camera images, read once for the scene from the png header."""
+        if self._image_shape is not None:
+            return self._image_shape
+        self._image_shape = read_png_shape(self.images_paths_list[0])
+        return self._image_shape
+
+    @property
+    def detections(self) -> DetectionTable:
+        """columnar table of the objects of all the frames, with the frame index of each object in the `frame` column.
+
+        From a scene cache, the table is read directly from the cached arrays. Otherwise, the annotation jsons of all the
+        frames are read once.
+        """
+        if self._detections is not None:
+            return self._detections
+        if self._cache is not None:
+            self._detections = self._cache.detections()
+        else:
+            num_frames = self._num_frames()
+            self._detections = DetectionTable.concatenate(
+                [self._get_frame(idx).detections for idx in range(num_frames)], frames=range(num_frames)
+            )
+        return self._detections
+
+    def _tracks_signature(self) -> dict:
+        """modification signature of the annotations the track index is built from, see utils.files_signature."""
+        if self._cache is not None:
+            return files_signature([self._cache.cache_path.joinpath("meta.json")], self._cache.cache_path)
+        return files_signature([self.scene_path.joinpath(*sub_dirs) for sub_dirs in FRAME_FILE_DIRS[2:4]], self.scene_path)
+
+    def tracks(self, cache_path: Union[Path, str] = None, rebuild: bool = False) -> TrackIndex:
+        """index of the object tracks of the scene: the detections of each track_id, sorted by frame.
+
+        The index is built once from `detections` and saved as .npz file. It is built again when the annotations
+        (or the scene cache) were modified after it was saved, including annotation jsons rewritten in place.
+
+        Args:
+            cache_path (Union[Path, str], optional): .npz file of the index. Defaults to None, in which case it is
+                        tracks.npz in the scene cache directory, or in the scene directory.
+            rebuild (bool, optional): If True, the index is built again even if the saved one is up to date. Defaults to False.
+
+        Returns:
+            TrackIndex: e.g. tracks[track_id].centroid, or tracks.window(track_id, start_frame, stop_frame).
+        """
+        if cache_path is None:
+            cache_dir = self._cache.cache_path if self._cache is not None else self.scene_path
+            cache_path = cache_dir.joinpath("tracks.npz")
+        cache_path = Path(cache_path)
+        # the index in memory is only returned for the file it was loaded from or saved to.
+        if self._tracks is not None and not rebuild and self._tracks_path == cache_path:
+            return self._tracks
+        signature = self._tracks_signature()
+
+        if not rebuild and cache_path.is_file():
+            tracks = TrackIndex.load(cache_path)
+            if tracks.version == TRACKS_VERSION and tracks.signature == signature:
+                self._tracks, self._tracks_path = tracks, cache_path
+                return tracks
+
+        self._tracks, self._tracks_path = TrackIndex.from_detections(self.detections, signature), cache_path
+        try:
+            self._tracks.save(cache_path)
+        except OSError as e:
+            warnings.warn(f"could not write the track index to {cache_path}: {e}")
+        return self._tracks
+
+    @property
+    def radar_annot_dtype(self) -> np.dtype:
+        """dtype of the points in the radar annotation jsons, parsed once for the scene."""
+        if self._radar_annot_dtype is not None:
+            return self._radar_annot_dtype
+        with open(str(self.radar_annot_paths_list[0]), "r") as f:
+            radar_annot_dict = json.load(f)
+        self._radar_annot_dtype = parse_radar_annot_dtype(
+            radar_annot_dict["radar_pcd_metadata"]
         )
+        return self._radar_annot_dtype
 
     def _parse_scene_json(self) -> SceneInfo:
         """reads scene.json file and return information about this scene."""
@@ -126,60 +411,108 @@ class Infra3DRC:
         )
         return calibration
 
+    def _get_frame(self, idx: int) -> Frame:
+        """creates the Frame object for the given index."""
+        frame_kwargs = dict(
+            image_path=self.images_paths_list[idx],
+            radar_pcd_path=self.radar_pcds_paths_list[idx],
+            image_json_path=self.camera_annot_paths_list[idx],
+            radar_json_path=self.radar_annot_paths_list[idx],
+            lidar_pcd_path=self.lidar_pcds_paths_list[idx],
+            calibration=self.calibration,
+            mmap=self.mmap,
+            radar_annot_dtype=self.radar_annot_dtype,
+            image_shape=self.image_shape,
+            modality_cache=self.modality_cache,
+        )
+        if self._cache is not None:
+            return CachedFrame(self._cache, idx, **frame_kwargs)
+        return Frame(**frame_kwargs)
+
     def __iter__(self):
-        for img_path, r_pcd_path, c_json_path, r_json_path, l_pcd_path in zip(
-            self.images_paths_list,
-            self.radar_pcds_paths_list,
-            self.camera_annot_paths_list,
-            self.radar_annot_paths_list,
-            self.lidar_pcds_paths_list,
-        ):
-            yield Frame(
-                img_path,
-                r_pcd_path,
-                c_json_path,
-                r_json_path,
-                l_pcd_path,
-                self.calibration,
-            )
+        # only frames for which all the sensor files are available.
+        for idx in range(self._num_frames()):
+            yield self._get_frame(idx)
+
+    def iter_prefetch(
+        self,
+        workers: int = 4,
+        backend: str = "thread",
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        depth: int = None,
+    ) -> Iterator[Frame]:
+        """iterates over the frames like `__iter__`, while a pool of workers decodes the fields of the next frames.
+
+        Args:
+            workers (int, optional): number of threads or processes. Defaults to 4.
+            backend (str, optional): "thread" or "process". Defaults to "thread".
+            fields (Sequence[str], optional): Frame properties to decode ahead, see prefetch.PREFETCH_FIELDS.
+                        Defaults to camera_image, radar_point_cloud, lidar_point_cloud and objects.
+            depth (int, optional): maximum number of frames loaded ahead. Defaults to None, which is 2 * workers.
+
+        Yields:
+            Frame: frames in order, with the fields already decoded.
+        """
+        return prefetch_frames(self._get_frame, range(self._num_frames()), workers, backend, fields, depth)
+
+    def export_video(
+        self,
+        path: Union[Path, str],
+        overlay: Sequence[str] = OVERLAYS,
+        workers: int = 4,
+        backend: str = "process",
+        fps: float = 10.0,
+        scale: float = 1.0,
+        depth: int = None,
+    ) -> ExportStats:
+        """renders all the frames of the scene with the overlays drawn, and writes them to a video or png sequence.
+        The frames are rendered by a pool of workers and written in order.
+
+        Args:
+            path (Union[Path, str]): .mp4, .avi or .mkv video file, or a directory (path without suffix) for png images.
+            overlay (Sequence[str], optional): any of "annotations", "radar" and "lidar". Defaults to all of them.
+            workers (int, optional): number of worker processes (or threads). Defaults to 4.
+            backend (str, optional): "process" or "thread". Defaults to "process".
+            fps (float, optional): frame rate of the video. Defaults to 10.0.
+            scale (float, optional): scale factor of the images. Defaults to 1.0.
+            depth (int, optional): maximum number of frames rendered ahead of the writer. Defaults to None, which is 2 * workers.
+
+        Returns:
+            ExportStats: time spent in each stage (decode, render, encode, wait).
+        """
+        return export_frames(
+            self._get_frame, range(self._num_frames()), path, overlay, workers, backend, fps, scale, depth
+        )
+
+    def aiter(
+        self,
+        workers: int = 4,
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        depth: int = None,
+    ) -> AsyncIterator[Frame]:
+        """asynchronous iteration over the frames: `async for frame in scene.aiter()`.
+        The fields of the next frames are decoded in a thread pool, so the event loop is not blocked.
+
+        Args:
+            workers (int, optional): number of threads, the maximum number of frames decoded at the same time. Defaults to 4.
+            fields (Sequence[str], optional): Frame properties to decode ahead, see prefetch.PREFETCH_FIELDS.
+                        Defaults to camera_image, radar_point_cloud, lidar_point_cloud and objects.
+            depth (int, optional): maximum number of frames loaded ahead of the consumer. Defaults to None, which is 2 * workers.
+
+        Returns:
+            AsyncIterator[Frame]: frames in order, with the fields already decoded.
+        """
+        # asyncio is only imported when it is used.
+        from .aio import aiter_frames
+
+        return aiter_frames(self._get_frame, range(self._num_frames()), workers, fields, depth)
 
     def __getitem__(self, indices):
-        if isinstance(indices, int):
-            image_path = self.images_paths_list[indices]
-            radar_pcd_path = self.radar_pcds_paths_list[indices]
-            camera_json_path = self.camera_annot_paths_list[indices]
-            radar_json_path = self.radar_annot_paths_list[indices]
-            lidar_pcd_path = self.lidar_pcds_paths_list[indices]
-
-            return Frame(
-                image_path=image_path,
-                radar_pcd_path=radar_pcd_path,
-                image_json_path=camera_json_path,
-                radar_json_path=radar_json_path,
-                lidar_pcd_path=lidar_pcd_path,
-                calibration=self.calibration,
-            )
-            # return single frame, or slice of it
-        if isinstance(indices, tuple):
-            # multi index is stored as tuple. return list of frames.
-            list_of_frames: List[Frame] = []
-            for idx in indices:
-                image_path = self.images_paths_list[idx]
-                radar_pcd_path = self.radar_pcds_paths_list[idx]
-                camera_json_path = self.camera_annot_paths_list[idx]
-                radar_json_path = self.radar_annot_paths_list[idx]
-                lidar_pcd_path = self.lidar_pcds_paths_list[idx]
-
-                i_frame = Frame(
-                    image_path=image_path,
-                    radar_pcd_path=radar_pcd_path,
-                    image_json_path=camera_json_path,
-                    radar_json_path=radar_json_path,
-                    lidar_pcd_path=lidar_pcd_path,
-                    calibration=self.calibration,
-                )
-                list_of_frames.append(i_frame)
-            return list_of_frames
+        if isinstance(indices, (int, np.integer)):
+            # return single frame
+            return self._get_frame(int(indices))
+        # multi index (tuple, list, slice, boolean mask or index array). return batch (list) of frames.
+        return FrameBatch([self._get_frame(idx) for idx in batch_indices(indices, self._num_frames())])
 
     def __len__(self):
         return self.scene_info.total_frames
@@ -1,3 +1,5 @@
 from .Infra3DRC import Infra3DRC
+from .dataset import Infra3DRCDataset
+from .modality_cache import ModalityCache
 
-__all__ = ['Infra3DRC']
\ No newline at end of file
+__all__ = ['Infra3DRC', 'Infra3DRCDataset', 'ModalityCache']
\ No newline at end of file
@@ -0,0 +1,77 @@
+#! /usr/bin/env python3
+"""
+Script Name: aio.py
+
+Description:
+This script provides asyncio access to the frames, for use from an event loop (e.g. in a web service).
+The blocking file reads and decoding of the frames run in a thread pool, so the event loop is not stalled.
+Single properties of a frame can be awaited with Frame.acamera_image, aradar_point_cloud, alidar_point_cloud and aobjects.
+The frames are yielded in order, at most `depth` frames are loaded ahead, and no new frame is loaded while
+the consumer does not pull (backpressure).
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterator, Callable, Iterable, Sequence
+from .prefetch import PREFETCH_FIELDS, DEFAULT_FIELDS, _load_frame
+
+
+def _get_and_load_frame(get_frame: Callable, idx: int, fields: Sequence[str]):
+    """creates the frame of an index and decodes its fields. Creating a frame can read files (e.g. the scene
+    index), so it runs in the thread pool as well."""
+    return _load_frame(get_frame(idx), fields)
+
+
+async def aiter_frames(
+    get_frame: Callable,
+    indices: Iterable[int],
+    workers: int = 4,
+    fields: Sequence[str] = DEFAULT_FIELDS,
+    depth: int = None,
+) -> AsyncIterator:
+    """yields the frames of `indices` in order, with their fields decoded ahead by a pool of threads.
+
+    Leaving the loop early (break, exception, cancellation) cancels the frames which are not being loaded yet.
+    The running ones finish in the background, the event loop does not wait for them.
+
+    Args:
+        get_frame (Callable[[int], Frame]): creates the frame of an index, e.g. Infra3DRC._get_frame.
+        indices (Iterable[int]): indices of the frames, in the order they are yielded.
+        workers (int, optional): number of threads, which is the maximum number of frames decoded at the same time. Defaults to 4.
+        fields (Sequence[str], optional): Frame properties to decode, see prefetch.PREFETCH_FIELDS. Defaults to prefetch.DEFAULT_FIELDS.
+        depth (int, optional): maximum number of frames loaded ahead of the consumer. Defaults to None, which is 2 * workers.
+
+    Yields:
+        Frame: frames with the fields already decoded.
+    """
+    assert workers >= 1, f"workers must be at least 1, not {workers}"
+    for field in fields:
+        assert field in PREFETCH_FIELDS, f"{field} can not be prefetched, must be one of {PREFETCH_FIELDS}"
+    depth = 2 * workers if depth is None else depth
+    assert depth >= 1, f"depth must be at least 1, not {depth}"
+    fields = tuple(fields)
+
+    loop = asyncio.get_running_loop()
+    indices = iter(indices)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for idx in islice(indices, depth):
+            pending.append(loop.run_in_executor(executor, _get_and_load_frame, get_frame, idx, fields))
+        while pending:
+            frame = await pending.popleft()
+            # keep the queue full, one new frame for each yielded frame.
+            for idx in islice(indices, 1):
+                pending.append(loop.run_in_executor(executor, _get_and_load_frame, get_frame, idx, fields))
+            yield frame
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
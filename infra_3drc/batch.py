@@ -0,0 +1,157 @@
+#! /usr/bin/env python3
+"""
+Script Name: batch.py
+
+Description:
+This script provides a batch of frames, returned when indexing Infra3DRC or Infra3DRCDataset with a slice,
+list, tuple, boolean mask or index array. The members are decoded together by a pool of threads, and their point
+clouds are concatenated into one structured array with a "frame" column, and their camera images are stacked.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence, Union
+import numpy as np
+from .frame import Frame
+from .prefetch import PREFETCH_FIELDS, _load_frame
+
+
+def batch_indices(indices, num_frames: int) -> List[int]:
+    """frame indices of a slice, boolean mask, or sequence / array of indices.
+
+    Args:
+        indices: slice, boolean mask of length `num_frames`, or sequence / array of int.
+        num_frames (int): number of frames which can be indexed.
+
+    Returns:
+        List[int]: frame indices.
+    """
+    if isinstance(indices, slice):
+        return list(range(*indices.indices(num_frames)))
+    indices = np.asarray(indices)
+    if indices.dtype == bool:
+        assert indices.shape == (num_frames,), f"boolean mask must have shape ({num_frames},), not {indices.shape}"
+        return np.flatnonzero(indices).tolist()
+    assert indices.ndim == 1 and (indices.size == 0 or np.issubdtype(indices.dtype, np.integer)), f"invalid frame indices: {indices}"
+    return indices.tolist()
+
+
+class FrameBatch(list):
+    def __init__(self, frames: Sequence[Frame], workers: int = 4) -> None:
+        """list of frames with batched access to their data.
+
+        Args:
+            frames (Sequence[Frame]): frames of the batch.
+            workers (int, optional): number of threads which decode the members together. Defaults to 4.
+        """
+        super().__init__(frames)
+        self.workers = workers
+        self._radar_point_cloud = None
+        self._lidar_point_cloud = None
+        self._radar_offsets = None
+        self._lidar_offsets = None
+        self._camera_image = None
+
+    def load(self, fields: Sequence[str] = ("camera_image", "radar_point_cloud", "lidar_point_cloud", "objects")) -> "FrameBatch":
+        """decodes the fields of all the frames together.
+
+        Args:
+            fields (Sequence[str], optional): Frame properties to decode, see prefetch.PREFETCH_FIELDS.
+
+        Returns:
+            FrameBatch: the batch itself.
+        """
+        for field in fields:
+            assert field in PREFETCH_FIELDS, f"{field} can not be loaded, must be one of {PREFETCH_FIELDS}"
+        if self.workers > 1 and len(self) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(self))) as executor:
+                list(executor.map(_load_frame, self, [tuple(fields)] * len(self)))
+        else:
+            for frame in self:
+                _load_frame(frame, fields)
+        return self
+
+    def _concat_clouds(self, field: str):
+        """point clouds of all the frames in one structured array with "frame" (position in the batch) as first field,
+        and the (frames + 1,) offsets of the frames in it."""
+        self.load([field])
+        clouds = [getattr(frame, field) for frame in self]
+        num_points = [cloud.shape[0] for cloud in clouds]
+        offsets = np.concatenate(([0], np.cumsum(num_points))).astype(np.int64)
+        if not clouds:
+            return np.empty(0, dtype=[("frame", np.uint32)]).view(np.recarray), offsets
+
+        dtype = clouds[0].dtype
+        batch_cloud = np.empty(
+            offsets[-1], dtype=[("frame", np.uint32)] + [(name, dtype.fields[name][0]) for name in dtype.names]
+        )
+        batch_cloud["frame"] = np.repeat(np.arange(len(clouds), dtype=np.uint32), num_points)
+        for cloud, start, stop in zip(clouds, offsets[:-1], offsets[1:]):
+            for name in dtype.names:
+                batch_cloud[name][start:stop] = cloud[name]
+        return batch_cloud.view(np.recarray), offsets
+
+    @property
+    def radar_point_cloud(self) -> np.recarray:
+        """radar point clouds of all the frames, with "frame" field. see `radar_offsets`."""
+        if self._radar_point_cloud is not None:
+            return self._radar_point_cloud
+        self._radar_point_cloud, self._radar_offsets = self._concat_clouds("radar_point_cloud")
+        return self._radar_point_cloud
+
+    @property
+    def radar_offsets(self) -> np.ndarray:
+        """(frames + 1,) points of frame i are radar_point_cloud[radar_offsets[i]:radar_offsets[i + 1]]."""
+        if self._radar_offsets is None:
+            self.radar_point_cloud
+        return self._radar_offsets
+
+    @property
+    def lidar_point_cloud(self) -> np.recarray:
+        """lidar point clouds of all the frames, with "frame" field. see `lidar_offsets`."""
+        if self._lidar_point_cloud is not None:
+            return self._lidar_point_cloud
+        self._lidar_point_cloud, self._lidar_offsets = self._concat_clouds("lidar_point_cloud")
+        return self._lidar_point_cloud
+
+    @property
+    def lidar_offsets(self) -> np.ndarray:
+        """(frames + 1,) points of frame i are lidar_point_cloud[lidar_offsets[i]:lidar_offsets[i + 1]]."""
+        if self._lidar_offsets is None:
+            self.lidar_point_cloud
+        return self._lidar_offsets
+
+    @property
+    def camera_image(self) -> Union[np.ndarray, List[np.ndarray]]:
+        """(frames, rows, cols, 3) stacked camera images, or a list of images if their shapes differ.
+        Like the point clouds, they are stacked once and kept with the batch."""
+        if self._camera_image is not None:
+            return self._camera_image
+        self.load(["camera_image"])
+        images = [frame.camera_image for frame in self]
+        if images and all(image.shape == images[0].shape for image in images):
+            images = np.stack(images)
+        self._camera_image = images
+        return self._camera_image
+
+    @property
+    def objects(self) -> list:
+        """objects of each frame."""
+        self.load(["objects"])
+        return [frame.objects for frame in self]
+
+    @property
+    def image_ids(self) -> np.ndarray:
+        return np.array([frame.image_id for frame in self], dtype=np.int64)
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"num_frames={len(self)}, "
+        s += f"image_ids={self.image_ids.tolist()})"
+        return s
+
+    __repr__ = __str__
@@ -0,0 +1,240 @@
+#! /usr/bin/env python3
+"""
+Script Name: cache.py
+
+Description:
+This script provides a packed binary cache of one scene of INFRA-3DRC dataset.
+The radar and lidar point clouds of all the frames are concatenated into one array each, with a table of
+per frame offsets. The annotations are stored as one record per object, the radar points of the objects are
+concatenated, and the background radar points are stored as ranges of point indices.
+The arrays are saved as .npy files, which are memory mapped when the cache is loaded.
+
+cache directory layout:
+- meta.json : scene metadata (see Infra3DRC._to_metadata) and image ids of the frames.
+- offsets.npy : (frames + 1, 4) start of each frame in radar.npy, lidar.npy, objects.npy, background.npy.
+- radar.npy : radar points of all the frames, as in Frame.radar_point_cloud.
+- lidar.npy : lidar points of all the frames, as in Frame.lidar_point_cloud.
+- objects.npy : one record per object, see OBJECT_DTYPE.
+- object_points.npy : radar points of all the objects.
+- background.npy : (ranges, 2) [start, stop) radar point index ranges labeled as background.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+from pathlib import Path
+from typing import Union
+import json
+import numpy as np
+from .frame import Frame
+from .pcd import read_pcd_header
+from .detections import DetectionTable
+
+# increased whenever the cache layout changes.
+CACHE_VERSION = 2
+# columns of offsets.npy.
+OFFSET_COLUMNS = ("radar", "lidar", "objects", "background")
+# record of one object, see DetectionTable. The point ranges index object_points.npy.
+OBJECT_DTYPE = np.dtype(
+    [
+        ("det_id", np.int64),
+        ("category_id", np.int64),
+        ("track_id", np.int64),
+        ("instance_id", np.int64),
+        ("bbox", np.float32, (4,)),
+        ("points_start", np.int64),
+        ("points_stop", np.int64),
+    ]
+)
+
+
+def _index_to_ranges(index: np.ndarray) -> np.ndarray:
+    """sorted unique indices to (n, 2) [start, stop) ranges of consecutive indices."""
+    if index.shape[0] == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    breaks = np.flatnonzero(np.diff(index) != 1) + 1
+    starts = index[np.concatenate(([0], breaks))]
+    stops = index[np.concatenate((breaks - 1, [index.shape[0] - 1]))] + 1
+    return np.stack((starts, stops), axis=1).astype(np.int64)
+
+
+def _ranges_to_index(ranges: np.ndarray) -> np.ndarray:
+    """(n, 2) [start, stop) ranges to the sorted indices."""
+    lengths = ranges[:, 1] - ranges[:, 0]
+    # each index is the start of its range plus its position within the range.
+    range_offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.repeat(ranges[:, 0] - range_offsets, lengths) + np.arange(lengths.sum(), dtype=np.int64)
+
+
+def build_scene_cache(scene, cache_path: Union[Path, str]) -> None:
+    """reads all the frames of the scene once and writes the cache.
+
+    Args:
+        scene (Infra3DRC): scene to cache.
+        cache_path (Union[Path, str]): cache directory. It is created if it does not exist.
+    """
+    cache_path = Path(cache_path)
+    cache_path.mkdir(parents=True, exist_ok=True)
+    # an existing cache is marked incomplete until it is written again.
+    meta_path = cache_path.joinpath("meta.json")
+    if meta_path.is_file():
+        meta_path.unlink()
+    num_frames = scene._num_frames()
+    assert num_frames > 0, f"no frames found in {scene.scene_path}"
+
+    # lidar clouds are large, so they are written into the memory mapped file frame by frame.
+    # the number of lidar points is known from the pcd headers.
+    lidar_counts = []
+    for lidar_pcd_path in scene.lidar_pcds_paths_list[:num_frames]:
+        with open(str(lidar_pcd_path), "rb") as f:
+            lidar_counts.append(read_pcd_header(f)["POINTS"])
+    lidar_offsets = np.concatenate(([0], np.cumsum(lidar_counts))).astype(np.int64)
+    lidar = None
+
+    radar_clouds, objects, object_points, background_ranges, image_ids = [], [], [], [], []
+    offsets = np.zeros((num_frames + 1, len(OFFSET_COLUMNS)), dtype=np.int64)
+    num_object_points = 0
+    for idx in range(num_frames):
+        frame = scene._get_frame(idx)
+
+        lidar_cloud = frame.lidar_point_cloud
+        if lidar is None:
+            lidar = np.lib.format.open_memmap(
+                str(cache_path.joinpath("lidar.npy")), mode="w+", dtype=lidar_cloud.dtype, shape=(int(lidar_offsets[-1]),)
+            )
+        assert lidar_cloud.shape[0] == lidar_counts[idx], f"unexpected number of points in {frame.lidar_pcd_path}"
+        lidar[lidar_offsets[idx] : lidar_offsets[idx + 1]] = lidar_cloud
+
+        radar_clouds.append(frame.radar_point_cloud)
+        background_ranges.append(_index_to_ranges(frame._radar_background_index()))
+        image_ids.append(frame.image_id)
+
+        detections = frame.detections
+        frame_objects = np.empty(len(detections), dtype=OBJECT_DTYPE)
+        for name in OBJECT_DTYPE.names:
+            frame_objects[name] = getattr(detections, name)
+        # point ranges of the frame are shifted by the object points of the frames before.
+        frame_objects["points_start"] += num_object_points
+        frame_objects["points_stop"] += num_object_points
+        num_object_points += detections.points.shape[0]
+        objects.append(frame_objects)
+        object_points.append(detections.points)
+
+        offsets[idx + 1] = offsets[idx] + [
+            radar_clouds[-1].shape[0],
+            lidar_cloud.shape[0],
+            frame_objects.shape[0],
+            background_ranges[-1].shape[0],
+        ]
+
+    lidar.flush()
+    del lidar
+    np.save(str(cache_path.joinpath("offsets.npy")), offsets)
+    np.save(str(cache_path.joinpath("radar.npy")), np.concatenate(radar_clouds).view(np.ndarray))
+    np.save(str(cache_path.joinpath("objects.npy")), np.concatenate(objects))
+    np.save(
+        str(cache_path.joinpath("object_points.npy")),
+        np.concatenate(object_points).view(np.ndarray),
+    )
+    np.save(str(cache_path.joinpath("background.npy")), np.concatenate(background_ranges))
+
+    # meta.json is written last, a cache without it is incomplete.
+    meta = scene._to_metadata()
+    meta.update(version=CACHE_VERSION, scene_number=scene.scene_number, scene_path=str(scene.scene_path.resolve()), image_ids=image_ids)
+    with open(str(meta_path), "w") as f:
+        json.dump(meta, f)
+
+
+class SceneCache:
+    def __init__(self, cache_path: Union[Path, str]) -> None:
+        """memory mapped arrays of a scene cache written by `build_scene_cache`.
+
+        Args:
+            cache_path (Union[Path, str]): cache directory.
+        """
+        self.cache_path = Path(cache_path)
+        meta_path = self.cache_path.joinpath("meta.json")
+        assert meta_path.is_file(), f"no complete scene cache found at {self.cache_path}"
+        with open(str(meta_path), "r") as f:
+            self.meta = json.load(f)
+        assert self.meta["version"] == CACHE_VERSION, f"cache version {self.meta['version']} is not supported, build the cache again."
+
+        self.offsets = self._load("offsets")
+        self.radar = self._load("radar")
+        self.lidar = self._load("lidar")
+        self.objects = self._load("objects")
+        self.object_points = self._load("object_points")
+        self.background = self._load("background")
+
+    def __getstate__(self) -> dict:
+        # the arrays are memory mapped again after unpickling (e.g. in worker processes), instead of being copied.
+        return {"cache_path": self.cache_path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["cache_path"])
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(str(self.cache_path.joinpath(f"{name}.npy")), mmap_mode="r")
+
+    def detections(self, objects: slice = slice(None)) -> DetectionTable:
+        """columnar table of the cached objects, of the whole scene by default.
+
+        Args:
+            objects (slice, optional): range of the objects, e.g. `frame_slice("objects", idx)` for one frame.
+
+        Returns:
+            DetectionTable: the columns are copied out of the cache, the points are a view of it.
+        """
+        records = self.objects[objects]
+        # frame of each object, from the object offsets of the frames.
+        object_idx = np.arange(self.offsets[-1, OFFSET_COLUMNS.index("objects")])[objects]
+        frame = np.searchsorted(self.offsets[1:, OFFSET_COLUMNS.index("objects")], object_idx, side="right")
+        return DetectionTable(
+            image_id=np.array(self.meta["image_ids"], dtype=np.int64)[frame],
+            points=self.object_points.view(np.recarray),
+            frame=frame.astype(np.int64),
+            **{name: np.ascontiguousarray(records[name]) for name in OBJECT_DTYPE.names},
+        )
+
+    def frame_slice(self, column: str, idx: int) -> slice:
+        """range of the frame `idx` in the array of `column`, see OFFSET_COLUMNS."""
+        col = OFFSET_COLUMNS.index(column)
+        return slice(int(self.offsets[idx, col]), int(self.offsets[idx + 1, col]))
+
+    def __len__(self):
+        return self.offsets.shape[0] - 1
+
+
+class CachedFrame(Frame):
+    def __init__(self, cache: SceneCache, idx: int, **frame_kwargs) -> None:
+        """Frame whose point clouds, objects and background are views into the memory mapped arrays of a scene cache.
+
+        The camera image is still read from the png file, and the annotation jsons are only read if
+        `camera_annot_dict` or `radar_annot_dict` are accessed.
+
+        Args:
+            cache (SceneCache): cache of the scene.
+            idx (int): index of the frame in the scene.
+            frame_kwargs: arguments of Frame.
+        """
+        super().__init__(**frame_kwargs)
+        self._cache = cache
+        self._idx = idx
+        self._image_id = cache.meta["image_ids"][idx]
+
+    def _read_radar_pcd(self) -> np.recarray:
+        return self._cache.radar[self._cache.frame_slice("radar", self._idx)].view(np.recarray)
+
+    def _read_lidar_pcd(self) -> np.recarray:
+        return self._cache.lidar[self._cache.frame_slice("lidar", self._idx)].view(np.recarray)
+
+    def _radar_background_index(self) -> np.ndarray:
+        return _ranges_to_index(self._cache.background[self._cache.frame_slice("background", self._idx)])
+
+    def _get_detections(self) -> DetectionTable:
+        detections = self._cache.detections(self._cache.frame_slice("objects", self._idx))
+        # like the table of a Frame, the table of a single frame has no frame column.
+        detections.frame = None
+        return detections
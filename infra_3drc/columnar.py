@@ -0,0 +1,253 @@
+#! /usr/bin/env python3
+"""
+Script Name: columnar.py
+
+Description:
+This script exports the annotations of the dataset into sharded columnar files for analytics, e.g. instances per
+category, points per object or range distributions, without parsing the annotation jsons again.
+Two tables are written, with one shard per scene:
+- detections: one row per ground truth object (scene, frame, det_id, category_id, track_id, bbox, ...).
+- radar_points: one row per labeled radar point, joined to the columns of its detection.
+The shards are .npz files of NumPy structured arrays, or .parquet files if pyarrow is installed. They are written by
+a pool of workers, at most `depth` scenes ahead, so only a few scenes are in memory at any time.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+- pyarrow (optional, for parquet shards. pip install infra-3drc[columnar])
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Sequence, Tuple, Union
+import numpy as np
+from .spatial import _expand_ranges
+from .prefetch import map_ordered
+
+# names of the exported tables, one directory of shards each.
+TABLES = ("detections", "radar_points")
+# file formats of the shards, by file suffix.
+COLUMNAR_FORMATS = ("npz", "parquet")
+# one row of the detections table. track_id and instance_id are -1 if not available.
+DETECTION_DTYPE = np.dtype(
+    [
+        ("scene", np.int64),
+        ("frame", np.int64),
+        ("image_id", np.int64),
+        ("det_id", np.int64),
+        ("category_id", np.int64),
+        ("track_id", np.int64),
+        ("instance_id", np.int64),
+        ("bbox", np.float32, (4,)),
+        ("num_points", np.int64),
+    ]
+)
+# columns of the detection of each radar point, followed by the fields of the points in the radar annotation jsons.
+POINT_KEY_COLUMNS = ("scene", "frame", "det_id", "category_id", "track_id")
+
+
+@dataclass
+class ColumnarStats:
+    """number of shards and rows written, and the wall time of the export in seconds."""
+
+    num_shards: int = 0
+    num_detections: int = 0
+    num_points: int = 0
+    total: float = 0.0
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"num_shards={self.num_shards}, "
+        s += f"num_detections={self.num_detections}, "
+        s += f"num_points={self.num_points}, "
+        s += f"total={self.total:.2f} s)"
+        return s
+
+    __repr__ = __str__
+
+
+def scene_tables(scene) -> Tuple[np.ndarray, np.ndarray]:
+    """detections and radar_points table of a scene, from its DetectionTable (read from the scene cache if it has one).
+
+    Args:
+        scene (Infra3DRC): the scene.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: DETECTION_DTYPE records, and the radar point records with POINT_KEY_COLUMNS.
+    """
+    table = scene.detections
+    detections = np.empty(len(table), dtype=DETECTION_DTYPE)
+    detections["scene"] = scene.scene_number
+    detections["frame"] = table.frame
+    for name in ("image_id", "det_id", "category_id", "track_id", "instance_id", "bbox", "num_points"):
+        detections[name] = getattr(table, name)
+
+    # the points of each object are a range of table.points, owner is the row of the detection of each point.
+    point_index, owner = _expand_ranges(table.points_start, table.num_points)
+    point_fields = table.points.dtype.names
+    points = np.empty(
+        point_index.shape[0],
+        dtype=[(name, DETECTION_DTYPE[name]) for name in POINT_KEY_COLUMNS]
+        + [(name, table.points.dtype[name]) for name in point_fields],
+    )
+    for name in POINT_KEY_COLUMNS:
+        points[name] = detections[name][owner]
+    for name in point_fields:
+        points[name] = table.points[name][point_index]
+    return detections, points
+
+
+def _shard_path(path: Path, table: str, scene_number: int, fmt: str) -> Path:
+    return path.joinpath(table, f"scene-{str(scene_number).zfill(2)}.{fmt}")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow is needed for parquet shards, install it with: pip install infra-3drc[columnar]")
+    return pyarrow
+
+
+def _write_shard(records: np.ndarray, shard_path: Path, fmt: str) -> None:
+    """writes the records atomically, so readers never see a partly written shard."""
+    tmp_path = shard_path.with_name(shard_path.name + ".tmp")
+    if fmt == "npz":
+        with open(str(tmp_path), "wb") as f:
+            np.savez(f, records=records)
+    else:
+        pa = _import_pyarrow()
+        columns = {}
+        for name in records.dtype.names:
+            column = records[name]
+            if column.ndim > 1:
+                # e.g. bbox, as fixed size list of the values of each row.
+                columns[name] = pa.FixedSizeListArray.from_arrays(pa.array(column.reshape(-1)), column.shape[1])
+            else:
+                columns[name] = pa.array(column)
+        pa.parquet.write_table(pa.table(columns), str(tmp_path))
+    os.replace(str(tmp_path), str(shard_path))
+
+
+def _read_shard(shard_path: Path, columns: Sequence[str] = None) -> np.ndarray:
+    """records of a shard, with all the columns or only the given ones."""
+    if shard_path.suffix == ".npz":
+        with np.load(str(shard_path)) as shard:
+            records = shard["records"]
+        if columns is None:
+            return records
+        selected = np.empty(records.shape[0], dtype=[(name, records.dtype[name]) for name in columns])
+        for name in columns:
+            selected[name] = records[name]
+        return selected
+
+    pa = _import_pyarrow()
+    table = pa.parquet.read_table(str(shard_path), columns=None if columns is None else list(columns))
+    arrays = {}
+    for name in table.column_names:
+        column = table.column(name).combine_chunks()
+        if pa.types.is_fixed_size_list(column.type):
+            arrays[name] = column.flatten().to_numpy().reshape(-1, column.type.list_size)
+        else:
+            arrays[name] = column.to_numpy()
+    records = np.empty(table.num_rows, dtype=[(name, array.dtype, array.shape[1:]) for name, array in arrays.items()])
+    for name, array in arrays.items():
+        records[name] = array
+    return records
+
+
+def _export_scene(scene, path: Path, fmt: str) -> Tuple[int, int]:
+    """writes the shards of a scene in a worker. Only the number of rows is sent back.
+
+    Returns:
+        Tuple[int, int]: number of detections and radar points of the scene.
+    """
+    detections, points = scene_tables(scene)
+    for table in TABLES:
+        # a shard of the scene in another format would be read instead of the new one.
+        for other_fmt in COLUMNAR_FORMATS:
+            if other_fmt != fmt:
+                _shard_path(path, table, scene.scene_number, other_fmt).unlink(missing_ok=True)
+    _write_shard(detections, _shard_path(path, "detections", scene.scene_number, fmt), fmt)
+    _write_shard(points, _shard_path(path, "radar_points", scene.scene_number, fmt), fmt)
+    return detections.shape[0], points.shape[0]
+
+
+def export_columnar(
+    scenes: Iterable,
+    path: Union[Path, str],
+    fmt: str = "npz",
+    workers: int = 4,
+    backend: str = "process",
+    depth: int = None,
+) -> ColumnarStats:
+    """writes the detections and radar_points shards of the scenes, one shard per scene and table.
+
+    Existing shards of the same scenes are replaced, shards of other scenes are kept.
+
+    Args:
+        scenes (Iterable[Infra3DRC]): the scenes, e.g. the scenes of an Infra3DRCDataset.
+        path (Union[Path, str]): output directory, with one sub directory per table, e.g. path/detections/scene-01.npz.
+        fmt (str, optional): "npz" or "parquet". Defaults to "npz".
+        workers (int, optional): number of worker processes (or threads). Defaults to 4.
+        backend (str, optional): "process" or "thread". Defaults to "process".
+        depth (int, optional): maximum number of scenes exported at once. Defaults to None, which is workers.
+
+    Returns:
+        ColumnarStats: number of shards and rows written.
+    """
+    assert fmt in COLUMNAR_FORMATS, f"unknown format {fmt}, must be one of {COLUMNAR_FORMATS}"
+    if fmt == "parquet":
+        # fail before any worker is started.
+        _import_pyarrow()
+    path = Path(path)
+    for table in TABLES:
+        path.joinpath(table).mkdir(parents=True, exist_ok=True)
+
+    stats = ColumnarStats()
+    start = time.perf_counter()
+    # each scene is held by one worker while its shards are written, so depth = workers keeps all of them busy.
+    depth = workers if depth is None else depth
+    for num_detections, num_points in map_ordered(_export_scene, ((scene, path, fmt) for scene in scenes), workers, backend, depth):
+        stats.num_shards += len(TABLES)
+        stats.num_detections += num_detections
+        stats.num_points += num_points
+    stats.total = time.perf_counter() - start
+    return stats
+
+
+def read_table(
+    path: Union[Path, str],
+    table: str = "detections",
+    scene_numbers: Iterable[int] = None,
+    columns: Sequence[str] = None,
+) -> np.recarray:
+    """reads the shards of an exported table into one structured array.
+
+    Args:
+        path (Union[Path, str]): directory written by `export_columnar`.
+        table (str, optional): "detections" or "radar_points". Defaults to "detections".
+        scene_numbers (Iterable[int], optional): scenes to read. Defaults to None, which is all the exported scenes.
+        columns (Sequence[str], optional): columns to read, e.g. ["category_id", "num_points"]. Defaults to None, which is all.
+
+    Returns:
+        np.recarray: rows of the shards, ordered by scene and frame.
+    """
+    assert table in TABLES, f"unknown table {table}, must be one of {TABLES}"
+    table_path = Path(path).joinpath(table)
+    shard_paths: Dict[int, Path] = {
+        int(shard_path.stem.split("-")[-1]): shard_path
+        for fmt in COLUMNAR_FORMATS
+        for shard_path in table_path.glob(f"scene-*.{fmt}")
+    }
+    assert shard_paths, f"no shards found in {table_path}"
+    if scene_numbers is not None:
+        missing = set(scene_numbers) - set(shard_paths)
+        assert not missing, f"scenes {sorted(missing)} not found in {table_path}"
+        shard_paths = {scene_number: shard_paths[scene_number] for scene_number in scene_numbers}
+    records = [_read_shard(shard_path, columns) for _, shard_path in sorted(shard_paths.items())]
+    return np.concatenate(records).view(np.recarray)
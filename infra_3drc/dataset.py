@@ -0,0 +1,337 @@
+#! /usr/bin/env python3
+"""
+Script Name: dataset.py
+
+Description:
+This script provides an interface to work with all the scenes of INFRA-3DRC dataset at once.
+The files, image ids, object counts, categories, scene information and calibrations of all the scenes
+are collected once into a json manifest, so later constructions neither walk the scene directories nor parse
+the scene and annotation jsons.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+import json
+import os
+import warnings
+import numpy as np
+from .utils import SceneInfo, files_signature
+from .frame import Frame
+from .class_names import INFRA_ID_TO_CLASS
+from .prefetch import prefetch_frames, DEFAULT_FIELDS
+from .modality_cache import ModalityCache
+from .batch import FrameBatch, batch_indices
+from .detections import category_ids
+from .Infra3DRC import Infra3DRC, FRAME_FILE_DIRS, NUM_SCENES
+
+# file name of the manifest, stored in the dataset root by default.
+MANIFEST_NAME = "infra_3drc_manifest.json"
+# increased whenever the manifest content changes.
+MANIFEST_VERSION = 3
+# files of a scene, besides the directories in FRAME_FILE_DIRS, whose modification invalidates the manifest entry.
+SCENE_FILES = ("scene.json", "calibration.json")
+
+
+def _scene_signature(scene_path: Path) -> Dict[str, int]:
+    """modification signature of the frame directories and jsons of a scene, see utils.files_signature.
+
+    Adding, removing or replacing (e.g. by rename) a file of a frame directory, or modifying scene.json or
+    calibration.json, changes the signature. It takes one stat per directory, the frame files are not stat'ed, so
+    a frame file rewritten in place does not change it. Such edits are picked up with rebuild=True.
+    """
+    paths = [scene_path.joinpath(*sub_dirs) for sub_dirs in FRAME_FILE_DIRS] + [scene_path.joinpath(name) for name in SCENE_FILES]
+    return files_signature(paths, scene_path, stat_files=False)
+
+
+class Infra3DRCDataset:
+    def __init__(
+        self,
+        dataset_root: Union[Path, str],
+        manifest_path: Union[Path, str] = None,
+        rebuild: bool = False,
+        mmap: bool = False,
+        modality_cache: ModalityCache = None,
+    ) -> None:
+        """all the scenes of INFRA-3DRC-dataset, with frames indexed globally.
+
+        The manifest is read from `manifest_path` if it exists. Scenes which are new, or whose frame directories (the
+        FRAME_FILE_DIRS, where files were added, removed or replaced), scene.json or calibration.json were modified
+        since the manifest was written, are indexed again and the manifest is updated. Only the directories are
+        stat'ed, so frame files rewritten in place are only picked up with rebuild=True.
+
+        Args:
+            dataset_root (Union[Path, str]): root path where dataset is stored.
+            manifest_path (Union[Path, str]): path of the json manifest. defaults to None, which is MANIFEST_NAME in the dataset root.
+            rebuild (bool): If True, all the scenes are indexed again, ignoring the existing manifest, e.g. after frame files were rewritten in place. defaults to False.
+            mmap (bool): If True, the radar and lidar pcds of the frames are memory mapped. see Infra3DRC. defaults to False.
+            modality_cache (ModalityCache): bounded cache for the decoded data of the frames, shared by all the scenes. defaults to None.
+        """
+        assert Path(dataset_root).is_dir(), f"Directory does not exists: {dataset_root}."
+        self.dataset_root = Path(dataset_root)
+        self.manifest_path = Path(manifest_path) if manifest_path is not None else self.dataset_root.joinpath(MANIFEST_NAME)
+        self.mmap = mmap
+        self.modality_cache = modality_cache
+
+        self._manifest = self._load_manifest(rebuild)
+        self.scene_numbers: List[int] = sorted(int(scene_number) for scene_number in self._manifest["scenes"])
+        # Infra3DRC objects, created on first access of each scene.
+        self._scenes: Dict[int, Infra3DRC] = {}
+
+        # per frame arrays, in global frame order.
+        scene_entries = [self._manifest["scenes"][str(scene_number)] for scene_number in self.scene_numbers]
+        num_frames = [len(entry["image_ids"]) for entry in scene_entries]
+        # global index of the first frame of each scene, and total number of frames at the end.
+        self.frame_offsets = np.concatenate(([0], np.cumsum(num_frames))).astype(np.int64)
+        self.frame_scene_numbers = np.repeat(np.array(self.scene_numbers, dtype=np.int64), num_frames)
+        self.image_ids = np.array([image_id for entry in scene_entries for image_id in entry["image_ids"]], dtype=np.int64)
+        self.num_objects = np.array([count for entry in scene_entries for count in entry["num_objects"]], dtype=np.int64)
+        # (frames, categories) True where the frame contains at least one object of the category.
+        self.category_mask = np.zeros((len(self.image_ids), len(INFRA_ID_TO_CLASS)), dtype=bool)
+        frame_categories = [categories for entry in scene_entries for categories in entry["categories"]]
+        frame_idx = np.repeat(np.arange(len(frame_categories)), [len(categories) for categories in frame_categories])
+        self.category_mask[frame_idx, np.array([c for categories in frame_categories for c in categories], dtype=np.int64)] = True
+
+    def _load_manifest(self, rebuild: bool) -> dict:
+        """reads the manifest and indexes the scenes which are missing from it or out of date."""
+        manifest = {"version": MANIFEST_VERSION, "scenes": {}}
+        if not rebuild and self.manifest_path.is_file():
+            with open(str(self.manifest_path), "r") as f:
+                stored_manifest = json.load(f)
+            if stored_manifest.get("version") == MANIFEST_VERSION:
+                manifest = stored_manifest
+
+        scene_paths = {
+            int(scene_path.name.split("-")[-1]): scene_path
+            for scene_path in self.dataset_root.glob("INFRA-3DRC_scene-*")
+            if scene_path.is_dir()
+        }
+        assert scene_paths, f"no scene directories found in {self.dataset_root}"
+        assert all(1 <= scene_number <= NUM_SCENES for scene_number in scene_paths), f"scene numbers must be in range 1-{NUM_SCENES}"
+
+        modified = set(manifest["scenes"]) != set(str(scene_number) for scene_number in scene_paths)
+        scenes = {}
+        for scene_number, scene_path in sorted(scene_paths.items()):
+            entry = manifest["scenes"].get(str(scene_number))
+            if entry is None or entry["signature"] != _scene_signature(scene_path):
+                entry = self._index_scene(scene_number)
+                modified = True
+            scenes[str(scene_number)] = entry
+        manifest["scenes"] = scenes
+
+        if modified:
+            self._write_manifest(manifest)
+        return manifest
+
+    def _index_scene(self, scene_number: int) -> dict:
+        """manifest entry of a scene: files, per frame annotation summary, scene information and calibration."""
+        scene = Infra3DRC(self.dataset_root, scene_number)
+        # the signature is taken before reading the files, so modifications during indexing invalidate the entry.
+        signature = _scene_signature(scene.scene_path)
+        num_frames = scene._num_frames()
+
+        image_ids, num_objects, categories = [], [], []
+        for camera_annot_path in scene.camera_annot_paths_list[:num_frames]:
+            with open(str(camera_annot_path), "r") as f:
+                camera_annot_dict = json.load(f)
+            image_ids.append(camera_annot_dict["image"]["id"])
+            num_objects.append(len(camera_annot_dict["annotations"]))
+            categories.append(sorted({int(c_obj["category_id"]) for c_obj in camera_annot_dict["annotations"]}))
+
+        entry = scene._to_metadata()
+        entry.update(signature=signature, image_ids=image_ids, num_objects=num_objects, categories=categories)
+        return entry
+
+    def _write_manifest(self, manifest: dict) -> None:
+        """writes the manifest atomically. A read-only dataset root only produces a warning."""
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        try:
+            with open(str(tmp_path), "w") as f:
+                json.dump(manifest, f, separators=(",", ":"))
+            os.replace(str(tmp_path), str(self.manifest_path))
+        except OSError as e:
+            warnings.warn(f"could not write the manifest to {self.manifest_path}: {e}")
+
+    def scene(self, scene_number: int) -> Infra3DRC:
+        """Infra3DRC object of a scene, created from the manifest without reading the scene directory."""
+        if scene_number in self._scenes:
+            return self._scenes[scene_number]
+        assert scene_number in self.scene_numbers, f"scene {scene_number} not found in {self.dataset_root}"
+        entry = self._manifest["scenes"][str(scene_number)]
+        self._scenes[scene_number] = Infra3DRC._from_metadata(
+            self.dataset_root.joinpath(entry["scene_dir"]),
+            scene_number,
+            entry,
+            mmap=self.mmap,
+            modality_cache=self.modality_cache,
+        )
+        return self._scenes[scene_number]
+
+    def scene_info(self, scene_number: int) -> SceneInfo:
+        """information from scene.json of a scene."""
+        return SceneInfo(**self._manifest["scenes"][str(scene_number)]["scene_info"])
+
+    def locate(self, idx: int) -> Tuple[int, int]:
+        """(scene number, frame index within the scene) of a global frame index."""
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"frame index {idx} out of range for {len(self)} frames.")
+        scene_idx = int(np.searchsorted(self.frame_offsets, idx, side="right")) - 1
+        return self.scene_numbers[scene_idx], idx - int(self.frame_offsets[scene_idx])
+
+    def filter(
+        self,
+        weather: Union[str, Iterable[str]] = None,
+        daylight: Union[str, Iterable[str]] = None,
+        category: Union[int, str, Iterable] = None,
+        scene_numbers: Iterable[int] = None,
+    ) -> np.ndarray:
+        """global indices of the frames which satisfy all the given conditions. None means no condition.
+
+        Args:
+            weather (Union[str, Iterable[str]]): weather of the scene, or any of several. case insensitive.
+            daylight (Union[str, Iterable[str]]): daylight of the scene, or any of several. case insensitive.
+            category (Union[int, str, Iterable]): frames with at least one object of the category, or of any of several.
+                    categories are given as category id or class name, e.g. 6 or "car".
+            scene_numbers (Iterable[int]): frames of these scenes.
+
+        Returns:
+            np.ndarray: sorted global frame indices.
+        """
+
+        def matches(value: str, accepted) -> bool:
+            accepted = [accepted] if isinstance(accepted, str) else accepted
+            return value.lower() in {a.lower() for a in accepted}
+
+        selected_scenes = [
+            scene_number
+            for scene_number in self.scene_numbers
+            if (weather is None or matches(self.scene_info(scene_number).weather, weather))
+            and (daylight is None or matches(self.scene_info(scene_number).daylight, daylight))
+            and (scene_numbers is None or scene_number in scene_numbers)
+        ]
+        mask = np.isin(self.frame_scene_numbers, selected_scenes)
+        if category is not None:
+            mask &= self.category_mask[:, category_ids(category)].any(axis=1)
+        return np.flatnonzero(mask)
+
+    def iter_prefetch(
+        self,
+        indices: Iterable[int] = None,
+        workers: int = 4,
+        backend: str = "thread",
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        depth: int = None,
+    ) -> Iterator[Frame]:
+        """iterates over the frames, while a pool of workers decodes the fields of the next frames. see Infra3DRC.iter_prefetch.
+
+        Args:
+            indices (Iterable[int], optional): global frame indices, e.g. from `filter`. Defaults to None, which is all the frames.
+            workers (int, optional): number of threads or processes. Defaults to 4.
+            backend (str, optional): "thread" or "process". Defaults to "thread".
+            fields (Sequence[str], optional): Frame properties to decode ahead. see prefetch.PREFETCH_FIELDS.
+            depth (int, optional): maximum number of frames loaded ahead. Defaults to None, which is 2 * workers.
+
+        Yields:
+            Frame: frames in the order of `indices`, with the fields already decoded.
+        """
+        indices = range(len(self)) if indices is None else indices
+        return prefetch_frames(self.__getitem__, indices, workers, backend, fields, depth)
+
+    def aiter(
+        self,
+        indices: Iterable[int] = None,
+        workers: int = 4,
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        depth: int = None,
+    ) -> AsyncIterator[Frame]:
+        """asynchronous iteration over the frames, see Infra3DRC.aiter.
+
+        Args:
+            indices (Iterable[int], optional): global frame indices, e.g. from `filter`. Defaults to None, which is all the frames.
+            workers (int, optional): number of threads. Defaults to 4.
+            fields (Sequence[str], optional): Frame properties to decode ahead. see prefetch.PREFETCH_FIELDS.
+            depth (int, optional): maximum number of frames loaded ahead. Defaults to None, which is 2 * workers.
+
+        Returns:
+            AsyncIterator[Frame]: frames in the order of `indices`, with the fields already decoded.
+        """
+        indices = range(len(self)) if indices is None else indices
+        from .aio import aiter_frames
+
+        return aiter_frames(self.__getitem__, indices, workers, fields, depth)
+
+    def export_columnar(
+        self,
+        path: Union[Path, str],
+        fmt: str = "npz",
+        scene_numbers: Iterable[int] = None,
+        workers: int = 4,
+        backend: str = "process",
+        depth: int = None,
+    ):
+        """exports the detections and labeled radar points of the scenes into sharded columnar files, see columnar.py.
+
+        The shards are read back with columnar.read_table, e.g. read_table(path, "radar_points", columns=["rcs"]).
+
+        Args:
+            path (Union[Path, str]): output directory, with one sub directory of shards per table.
+            fmt (str, optional): "npz" or "parquet" (needs pyarrow). Defaults to "npz".
+            scene_numbers (Iterable[int], optional): scenes to export. Defaults to None, which is all the scenes.
+            workers (int, optional): number of worker processes (or threads), one scene each. Defaults to 4.
+            backend (str, optional): "process" or "thread". Defaults to "process".
+            depth (int, optional): maximum number of scenes exported at once. Defaults to None, which is workers.
+
+        Returns:
+            ColumnarStats: number of shards and rows written.
+        """
+        scene_numbers = self.scene_numbers if scene_numbers is None else scene_numbers
+        from .columnar import export_columnar
+
+        return export_columnar((self.scene(scene_number) for scene_number in scene_numbers), path, fmt, workers, backend, depth)
+
+    def stats(self, stats_path: Union[Path, str] = None, rebuild: bool = False, workers: int = 4, backend: str = "process"):
+        """statistics of the annotations of each scene and of the whole dataset, see stats.py.
+
+        The statistics are stored in a json file, and only the scenes which are new or were modified since are computed again.
+
+        Args:
+            stats_path (Union[Path, str], optional): path of the json file. Defaults to None, which is stats.STATS_NAME in the dataset root.
+            rebuild (bool, optional): If True, the statistics of all the scenes are computed again. Defaults to False.
+            workers (int, optional): number of worker processes (or threads), one scene each. Defaults to 4.
+            backend (str, optional): "process" or "thread". Defaults to "process".
+
+        Returns:
+            DatasetStats: statistics of each scene, and of the whole dataset as `total`.
+        """
+        from .stats import DatasetStats
+
+        return DatasetStats(self, stats_path, rebuild, workers, backend)
+
+    def __iter__(self):
+        for scene_number in self.scene_numbers:
+            yield from self.scene(scene_number)
+
+    def __getitem__(self, indices):
+        if isinstance(indices, (int, np.integer)):
+            # return single frame
+            scene_number, idx = self.locate(int(indices))
+            return self.scene(scene_number)._get_frame(idx)
+        # multi index (tuple, list, slice, boolean mask or index array). return batch (list) of frames.
+        return FrameBatch([self[idx] for idx in batch_indices(indices, len(self))])
+
+    def __len__(self):
+        return int(self.frame_offsets[-1])
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"num_scenes={len(self.scene_numbers)}, "
+        s += f"total_frames={len(self)})"
+        return s
+
+    __repr__ = __str__
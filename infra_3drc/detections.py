@@ -0,0 +1,151 @@
+#! /usr/bin/env python3
+"""
+Script Name: detections.py
+
+Description:
+This script provides a columnar table of ground truth objects (detections) of a frame or a whole scene.
+Each attribute is one numpy array over all the objects, and the radar points of the objects are ranges of one
+shared point array, so queries over many objects (e.g. all car bounding boxes of a scene) are vectorized.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, List, Sequence, Union
+import numpy as np
+from .utils import Detection
+from .class_names import INFRA_ID_TO_CLASS
+
+
+def category_ids(categories: Union[int, str, Iterable]) -> List[int]:
+    """category ids from category ids or class names, e.g. 6, "6" or "car"."""
+    if isinstance(categories, (int, str, np.integer)):
+        categories = [categories]
+    name_to_id = {info["name"]: int(category_id) for category_id, info in INFRA_ID_TO_CLASS.items() if info["name"]}
+    ids = []
+    for category in categories:
+        if isinstance(category, str) and not category.isdigit():
+            assert category in name_to_id, f"unknown category: {category}"
+            ids.append(name_to_id[category])
+        else:
+            assert str(int(category)) in INFRA_ID_TO_CLASS, f"unknown category: {category}"
+            ids.append(int(category))
+    return ids
+
+
+@dataclass(eq=False)
+class DetectionTable:
+    """ground truth objects as struct of arrays, one entry per object.
+
+    track_id and instance_id are -1 if not available. The radar points of object i are
+    points[points_start[i]:points_stop[i]], an empty range if the object has no radar points.
+    frame is the index of the frame of each object in the scene, or None for the table of a single frame.
+    """
+
+    image_id: np.ndarray
+    det_id: np.ndarray
+    category_id: np.ndarray
+    track_id: np.ndarray
+    instance_id: np.ndarray
+    bbox: np.ndarray  # (n, 4) float32 [x, y, width, height]
+    points_start: np.ndarray
+    points_stop: np.ndarray
+    points: np.recarray
+    frame: np.ndarray = None
+
+    COLUMNS = ("image_id", "det_id", "category_id", "track_id", "instance_id", "bbox", "points_start", "points_stop")
+
+    @classmethod
+    def concatenate(cls, tables: Sequence["DetectionTable"], frames: Sequence[int] = None) -> "DetectionTable":
+        """one table of several tables (e.g. of the frames of a scene). The points are concatenated as well.
+
+        Args:
+            tables (Sequence[DetectionTable]): tables to concatenate. They must have the same point dtype.
+            frames (Sequence[int], optional): frame index of each table, stored in the frame column. Defaults to None,
+                        in which case the frame columns of the tables are kept.
+
+        Returns:
+            DetectionTable
+        """
+        assert tables, "no tables to concatenate."
+        points = np.concatenate([table.points for table in tables]).view(np.recarray)
+        # the point ranges of each table are shifted by the points of the tables before it.
+        point_offsets = np.cumsum([0] + [table.points.shape[0] for table in tables[:-1]])
+        columns = {name: np.concatenate([getattr(table, name) for table in tables]) for name in cls.COLUMNS}
+        for name in ("points_start", "points_stop"):
+            columns[name] = columns[name] + np.repeat(point_offsets, [len(table) for table in tables])
+        if frames is not None:
+            frame = np.repeat(np.asarray(frames, dtype=np.int64), [len(table) for table in tables])
+        elif all(table.frame is not None for table in tables):
+            frame = np.concatenate([table.frame for table in tables])
+        else:
+            frame = None
+        return cls(points=points, frame=frame, **columns)
+
+    @property
+    def category_names(self) -> np.ndarray:
+        """class name of each object, see INFRA_ID_TO_CLASS."""
+        names = np.array([INFRA_ID_TO_CLASS[str(idx)]["name"] for idx in range(len(INFRA_ID_TO_CLASS))])
+        return names[self.category_id]
+
+    @property
+    def num_points(self) -> np.ndarray:
+        """number of radar points of each object."""
+        return self.points_stop - self.points_start
+
+    def filter(self, category: Union[int, str, Iterable]) -> "DetectionTable":
+        """objects of the category, or of any of several. e.g. table.filter("car") or table.filter([6, 7]).
+
+        Args:
+            category (Union[int, str, Iterable]): category ids or class names.
+
+        Returns:
+            DetectionTable: the objects of the categories. The points are shared with this table.
+        """
+        return self[np.isin(self.category_id, category_ids(category))]
+
+    def _detection(self, idx: int) -> Detection:
+        """Detection view of one object."""
+        track_id, instance_id = int(self.track_id[idx]), int(self.instance_id[idx])
+        start, stop = int(self.points_start[idx]), int(self.points_stop[idx])
+        return Detection(
+            image_id=int(self.image_id[idx]),
+            det_id=int(self.det_id[idx]),
+            category_id=int(self.category_id[idx]),
+            track_id=None if track_id == -1 else track_id,
+            instance_id=None if instance_id == -1 else instance_id,
+            bbox=self.bbox[idx],
+            points=self.points[start:stop] if stop > start else None,
+        )
+
+    def to_detections(self) -> List[Detection]:
+        """list of Detection views, one per object. The bbox and points are views of this table."""
+        return [self._detection(idx) for idx in range(len(self))]
+
+    def __getitem__(self, indices) -> Union[Detection, "DetectionTable"]:
+        if isinstance(indices, (int, np.integer)):
+            # single object, as Detection.
+            return self._detection(range(len(self))[indices])
+        # slice, boolean mask or index array. return table of the selected objects, the points are shared.
+        columns = {name: getattr(self, name)[indices] for name in self.COLUMNS}
+        return DetectionTable(
+            points=self.points, frame=None if self.frame is None else self.frame[indices], **columns
+        )
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self._detection(idx)
+
+    def __len__(self):
+        return self.det_id.shape[0]
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"num_objs={len(self)}, "
+        s += f"num_points={self.points.shape[0]})"
+        return s
+
+    __repr__ = __str__
@@ -13,23 +13,55 @@ Requirements:
 """
 
 from pathlib import Path
-from typing import Union, List
+from typing import Union, List, Sequence, Tuple
+from concurrent.futures import Executor
 import json
 import numpy as np
-import cv2, ast, math
-import re, random
-from collections import OrderedDict
-import struct
+import ast, math
+import random
 import numpy.lib.recfunctions as rfn
-from .utils import Calibration, Detection
+from .utils import Calibration, Detection, read_png_shape
+from .pcd import read_pcd, add_index_field
 from .class_names import INFRA_ID_TO_CLASS
+from .render import draw_points
+from .modality_cache import ModalityCache
+from .detections import DetectionTable
+from .spatial import VoxelIndex, DEFAULT_VOXEL_SIZES, cloud_xyz
 
-import matplotlib.pyplot as plt
-import matplotlib
-from mpl_toolkits.mplot3d import Axes3D
+# radar points are annotated till 120 meters in x, the radar clouds are clipped to it.
+RADAR_MAX_X = 120.0
+# layers which can be drawn by Frame.render.
+OVERLAYS = ("annotations", "radar", "lidar")
 
-# this is a workaround for the qt "xcb" plugin error.
-matplotlib.use("TkAgg")
+
+def _object_colors(rng) -> List[Tuple[int, int, int]]:
+    """100 random (blue, green, red) colors for the objects, by track id."""
+    blue = rng.sample(range(100, 255), 100)
+    green = rng.sample(range(70, 200), 100)
+    red = rng.sample(range(50, 255), 100)
+    # expecting less than 100 object in the frame.
+    return [(blue[i], green[i], red[i]) for i in range(100)]
+
+
+# fixed colors of the track ids for Frame.render, so that a track keeps its color over the frames.
+TRACK_COLORS = _object_colors(random.Random(0))
+
+
+def parse_radar_annot_dtype(radar_pcd_metadata: dict) -> np.dtype:
+    """numpy dtype of the radar points from the "radar_pcd_metadata" of the radar annotation json.
+
+    Args:
+        radar_pcd_metadata (dict): radar pcd metadata with "fields" and "dtypes" as string representation of lists.
+
+    Returns:
+        np.dtype
+    """
+    return np.dtype(
+        {
+            "names": ast.literal_eval(radar_pcd_metadata["fields"]),
+            "formats": ast.literal_eval(radar_pcd_metadata["dtypes"]),
+        }
+    )
 
 
 class Frame:
@@ -41,6 +73,10 @@ class Frame:
         radar_json_path: Union[Path, str],
         lidar_pcd_path: Union[Path, str],
         calibration: Calibration,
+        mmap: bool = False,
+        radar_annot_dtype: np.dtype = None,
+        image_shape: Tuple[int, int] = None,
+        modality_cache: ModalityCache = None,
     ) -> None:
         """represents one single frame of synchronized camera, radar and lidar data.
 
@@ -51,6 +87,15 @@ class Frame:
             radar_json_path (Union[Path, str]): path to radar annotation json
             lidar_pcd_path (Union[Path, str]): path to lidar pcd
             calibration (Calibration): Calibration object.
+            mmap (bool, optional): If True, point clouds are memory mapped read-only views of the pcd files. Defaults to False.
+                        The lidar cloud then has no "index" field, see `lidar_point_index`.
+            radar_annot_dtype (np.dtype, optional): dtype of the points in radar annotation json. Defaults to None.
+                        If None, it is parsed from the radar annotation json of this frame.
+            image_shape (Tuple[int, int], optional): (rows, cols) of the camera image. Defaults to None.
+                        If None, it is read from the png header of the camera image.
+            modality_cache (ModalityCache, optional): cache for the decoded camera image, point clouds and objects. Defaults to None.
+                        If given, the frame is a lightweight handle: the decoded data is kept in the (bounded) cache instead
+                        of the frame. If None, the data is decoded once and kept in the frame.
         """
         # synchronized frame paths
         self.image_path = image_path
@@ -61,12 +106,25 @@ class Frame:
 
         # calibration info
         self.calibration = calibration
+        self.mmap = mmap
 
         # properties
         self._radar_point_cloud = None
         self._lidar_point_cloud = None
+        self._lidar_point_index = None
         self._camera_image = None
         self._radar_background_cloud  = None
+        # annotations are parsed on first access.
+        self._camera_annot_dict = None
+        self._radar_annot_dict = None
+        self._image_id = None
+        self._objects = None
+        self._detections = None
+        # voxel indices of the point clouds, by (sensor, voxel size). see `spatial_index`.
+        self._spatial_indices = {}
+        self._radar_annot_dtype = radar_annot_dtype
+        self._image_shape = image_shape
+        self.modality_cache = modality_cache
 
         # hardcoded type strings for PCD binary data decoding
         self.radar_typ_str = "<ffffffff"  # specific for point cloud from ARS548 radar
@@ -74,68 +132,197 @@ class Frame:
             "<fff4xfIHB1xH2xI4x4x4x"  # specific for point cloud from Ouster lidar
         )
 
-        # annotation dicts
-        self.camera_annot_dict = self._parse_annotation_json(self.image_json_path)
-        self.radar_annot_dict = self._parse_annotation_json(self.radar_json_path)
+    def _load_modality(self, modality: str, loader, key: str = None, attribute: str = None):
+        """decodes the modality. With a modality cache, it is kept in the cache, otherwise in the frame (e.g. `_camera_image`).
+
+        Args:
+            modality (str): one of modality_cache.MODALITIES.
+            loader: decodes the value.
+            key (str, optional): key in the cache. Defaults to None, which is the camera image path.
+            attribute (str, optional): attribute which keeps the value without cache. Defaults to None, which is `_<modality>`.
+        """
+        if self._caches(modality):
+            # the image path is unique over the whole dataset.
+            return self.modality_cache.get_or_load(modality, str(self.image_path) if key is None else key, loader)
+        value = loader()
+        setattr(self, f"_{modality}" if attribute is None else attribute, value)
+        return value
 
+    def _caches(self, modality: str) -> bool:
+        """True if the modality is kept in the modality cache instead of the frame."""
+        return self.modality_cache is not None and self.modality_cache.handles(modality)
+
+    @property
+    def camera_annot_dict(self) -> dict:
+        if self._camera_annot_dict is not None:
+            return self._camera_annot_dict
+        self._camera_annot_dict = self._parse_annotation_json(self.image_json_path)
+        return self._camera_annot_dict
+
+    @property
+    def radar_annot_dict(self) -> dict:
+        if self._radar_annot_dict is not None:
+            return self._radar_annot_dict
+        self._radar_annot_dict = self._parse_annotation_json(self.radar_json_path)
+        return self._radar_annot_dict
+
+    @property
+    def radar_annot_dtype(self) -> np.dtype:
+        """dtype of the radar points in the annotation json."""
+        if self._radar_annot_dtype is not None:
+            return self._radar_annot_dtype
+        self._radar_annot_dtype = parse_radar_annot_dtype(
+            self.radar_annot_dict["radar_pcd_metadata"]
+        )
+        return self._radar_annot_dtype
+
+    @property
+    def image_id(self) -> int:
+        if self._image_id is not None:
+            return self._image_id
         # sanity check.
         assert (
             self.camera_annot_dict["image"]["id"]
             == self.radar_annot_dict["image"]["id"]
         )
-        self.image_id = self.camera_annot_dict["image"]["id"]
-
-        # list of detections. each detection contain bbox, points, image_id, det_id, category_id, track_id, instance_id.
-        self.objects: List[Detection] = self._get_objects()
+        self._image_id = self.camera_annot_dict["image"]["id"]
+        return self._image_id
 
+    @property
+    def objects(self) -> List[Detection]:
+        """list of detections. each detection contain bbox, points, image_id, det_id, category_id, track_id, instance_id."""
+        if self._objects is not None:
+            return self._objects
+        return self._load_modality("objects", self._get_objects)
 
+    @property
+    def detections(self) -> DetectionTable:
+        """columnar table of the objects. see DetectionTable."""
+        if self._detections is not None:
+            return self._detections
+        # the table has the same budget as the Detection list, under another key.
+        return self._load_modality("objects", self._get_detections, str(self.image_json_path), "_detections")
 
     @property
     def camera_image(self):
         if self._camera_image is not None:
             return self._camera_image
-        self._camera_image = cv2.imread(str(self.image_path))
-        return self._camera_image
+        return self._load_modality("camera_image", self._read_camera_image)
+
+    @property
+    def image_shape(self) -> Tuple[int, int]:
+        """(rows, cols) of the camera image. The image is not decoded for this."""
+        if self._image_shape is not None:
+            return self._image_shape
+        if self._camera_image is not None:
+            self._image_shape = self._camera_image.shape[:2]
+        else:
+            self._image_shape = read_png_shape(self.image_path)
+        return self._image_shape
 
     @property
     def radar_point_cloud(self):
         if self._radar_point_cloud is not None:
             return self._radar_point_cloud
-        self._radar_point_cloud = self._read_radar_pcd()
-        return self._radar_point_cloud
+        return self._load_modality("radar_point_cloud", self._read_radar_pcd)
 
     @property
     def radar_background_cloud(self):
         if self._radar_background_cloud is not None:
             return self._radar_background_cloud
-                
-        self._radar_background_cloud = self._points_list_to_recarray(
-            self.radar_annot_dict["background"]
-        )
-        # radar annotation json contains background points up to 300 meters. clip it to 120.
-        self._radar_background_cloud = self._radar_background_cloud[self._radar_background_cloud["x"] <= 120]
-        # add u,v fields in background cloud.
-        self._radar_background_cloud  = self.project_cloud_to_camera("radar", self._radar_background_cloud)
-        # also the points not falling in image fov are not considered in background class. add them saperately here.
+
+        # add u,v fields in raw cloud. the raw cloud is already clipped to 120 meters.
         raw_cloud = self.project_cloud_to_camera("radar", self.radar_point_cloud)
-        clipped_cloud = self._clip_point_cloud_to_camera_fov(raw_cloud)
-        points_outside_image = raw_cloud[np.isin(raw_cloud["index"], clipped_cloud["index"], invert=True)]
+        raw_index = self._point_index(self.radar_point_cloud)
 
-        if points_outside_image.shape[0] > 0:
-            self._radar_background_cloud = np.append(self._radar_background_cloud, points_outside_image)
-        
-        # removing duplicated if any.
-        self._radar_background_cloud = np.unique(self._radar_background_cloud)
+        # points labeled as background in the radar annotation json.
+        background_index = self._radar_background_index()
+        is_background = np.zeros(
+            max(raw_index.max(initial=0), background_index.max(initial=0)) + 1, dtype=bool
+        )
+        is_background[background_index] = True
+
+        # also the points not falling in image fov are not considered in background class. add them here.
+        # each point is selected once, so there are no duplicates.
+        background_mask = is_background[raw_index] | ~self._camera_fov_mask(raw_cloud)
+        self._radar_background_cloud = raw_cloud[background_mask]
 
         return self._radar_background_cloud
 
+    def _radar_background_index(self) -> np.ndarray:
+        """sorted and unique index of the radar points labeled as background in the radar annotation json."""
+        background = self.radar_annot_dict["background"]
+        index_col = self.radar_annot_dtype.names.index("index")
+        return np.unique(
+            np.array([point[index_col] for point in background], dtype=np.int64)
+        )
 
     @property
     def lidar_point_cloud(self):
         if self._lidar_point_cloud is not None:
             return self._lidar_point_cloud
-        self._lidar_point_cloud = self._read_lidar_pcd()
-        return self._lidar_point_cloud
+        return self._load_modality("lidar_point_cloud", self._read_lidar_pcd)
+
+    @property
+    def lidar_point_index(self) -> np.ndarray:
+        """index of each point of the lidar point cloud. In `mmap` mode, it is kept as side array instead of a field of the cloud."""
+        if self._lidar_point_index is not None:
+            return self._lidar_point_index
+        self._lidar_point_index = self._point_index(self.lidar_point_cloud)
+        return self._lidar_point_index
+
+    def spatial_index(self, mode: str = "lidar", voxel_size: float = None) -> VoxelIndex:
+        """voxel index over the x, y, z of the radar or lidar point cloud, for radius and kNN queries.
+        It is built on first use and kept with the frame.
+
+        e.g. lidar points within 1 m of each radar point:
+            indices, distances, offsets = frame.spatial_index("lidar").query_radius(cloud_xyz(frame.radar_point_cloud), 1.0)
+
+        Args:
+            mode (str, optional): radar or lidar. Defaults to "lidar".
+            voxel_size (float, optional): edge length of the voxels in meters. Defaults to None, in which case
+                        DEFAULT_VOXEL_SIZES of the sensor is used.
+
+        Returns:
+            VoxelIndex: the query results index the rows of `radar_point_cloud` or `lidar_point_cloud`.
+        """
+        assert mode.lower() in ["radar", "lidar"]
+        mode = mode.lower()
+        voxel_size = DEFAULT_VOXEL_SIZES[mode] if voxel_size is None else float(voxel_size)
+        if (mode, voxel_size) not in self._spatial_indices:
+            cloud = self.radar_point_cloud if mode == "radar" else self.lidar_point_cloud
+            self._spatial_indices[(mode, voxel_size)] = VoxelIndex(cloud_xyz(cloud), voxel_size)
+        return self._spatial_indices[(mode, voxel_size)]
+
+    @staticmethod
+    def _point_index(cloud: np.ndarray) -> np.ndarray:
+        """index field of the cloud. clouds without index field are numbered from 0."""
+        if "index" in cloud.dtype.names:
+            return cloud["index"]
+        return np.arange(cloud.shape[0], dtype=np.uint32)
+
+    async def _load_async(self, field: str, executor: Executor = None):
+        """reads the property in the executor, so the event loop is not blocked by file reads and decoding."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, getattr, self, field)
+
+    async def acamera_image(self, executor: Executor = None) -> np.ndarray:
+        """awaitable `camera_image`. executor defaults to the default executor of the event loop."""
+        return await self._load_async("camera_image", executor)
+
+    async def aradar_point_cloud(self, executor: Executor = None) -> np.recarray:
+        """awaitable `radar_point_cloud`. executor defaults to the default executor of the event loop."""
+        return await self._load_async("radar_point_cloud", executor)
+
+    async def alidar_point_cloud(self, executor: Executor = None) -> np.recarray:
+        """awaitable `lidar_point_cloud`. executor defaults to the default executor of the event loop."""
+        return await self._load_async("lidar_point_cloud", executor)
+
+    async def aobjects(self, executor: Executor = None) -> List[Detection]:
+        """awaitable `objects`. executor defaults to the default executor of the event loop."""
+        return await self._load_async("objects", executor)
 
     def _parse_annotation_json(self, json_path: Union[Path, str]) -> dict:
         """reads the json file and returns the dict.
@@ -155,6 +342,10 @@ class Frame:
 
     def _get_objects(self) -> List[Detection]:
         """read camera and radar objects and merge them into one object."""
+        return self.detections.to_detections()
+
+    def _get_detections(self) -> DetectionTable:
+        """read camera and radar objects and merge them into one columnar table."""
 
         camera_objects = self.camera_annot_dict["annotations"]
         radar_objects = self.radar_annot_dict["objects"]
@@ -162,39 +353,54 @@ class Frame:
         # In all cases, the number of camera objects must be >= number of radar objecte
         assert len(camera_objects) >= len(radar_objects)
 
-        objects = []
-        for c_obj in camera_objects:
-            det_id = c_obj["det_id"]
-            track_id = None
-            if c_obj.__contains__("track_id"):
-                track_id = c_obj["track_id"]
-            # sanity check , image id of each object and the entire json must be same.
-            assert c_obj["image_id"] == self.image_id
-            bbox = c_obj["bbox"]
-            category_id = c_obj["category_id"]
-            try:
-                r_object = [
-                    r_obj for r_obj in radar_objects if r_obj["det_id"] == det_id
-                ][0]
-                instance_id = r_object["instance_id"]
-                points = r_object["points"]
-                obj_points = self._points_list_to_recarray(points)
-            except IndexError:
-                instance_id = None
-                obj_points = None
-
-            det = Detection(
-                image_id=self.image_id,
-                det_id=det_id,
-                category_id=category_id,
-                track_id=track_id,
-                instance_id=instance_id,
-                bbox=bbox,
-                points=obj_points,
-            )
-            objects.append(det)
+        # radar objects indexed by det_id. the first radar object is used if a det_id is repeated.
+        radar_objects_by_det_id = {}
+        for r_obj in radar_objects:
+            radar_objects_by_det_id.setdefault(r_obj["det_id"], r_obj)
+        # radar objects without any points are treated as not matched.
+        matched_radar_objects = [
+            radar_objects_by_det_id.get(c_obj["det_id"]) for c_obj in camera_objects
+        ]
+        matched_radar_objects = [
+            r_object if r_object is not None and r_object["points"] else None
+            for r_object in matched_radar_objects
+        ]
 
-        return objects
+        # sanity check , image id of each object and the entire json must be same.
+        assert all(c_obj["image_id"] == self.image_id for c_obj in camera_objects)
+
+        # points of all radar objects are converted at once. points of each object are a range of it.
+        points = self._points_list_to_recarray(
+            [
+                point
+                for r_object in matched_radar_objects
+                if r_object is not None
+                for point in r_object["points"]
+            ]
+        )
+        num_points = np.array(
+            [0 if r_object is None else len(r_object["points"]) for r_object in matched_radar_objects], dtype=np.int64
+        )
+        points_stop = np.cumsum(num_points)
+
+        if self._caches("objects"):
+            # the parsed jsons are only needed for the table. With a modality cache, the frame keeps no annotations
+            # outside of the cache budget.
+            self._camera_annot_dict = self._radar_annot_dict = None
+
+        return DetectionTable(
+            image_id=np.full(len(camera_objects), self.image_id, dtype=np.int64),
+            det_id=np.array([c_obj["det_id"] for c_obj in camera_objects], dtype=np.int64),
+            category_id=np.array([c_obj["category_id"] for c_obj in camera_objects], dtype=np.int64),
+            track_id=np.array([c_obj.get("track_id", -1) for c_obj in camera_objects], dtype=np.int64),
+            instance_id=np.array(
+                [-1 if r_object is None else r_object["instance_id"] for r_object in matched_radar_objects], dtype=np.int64
+            ),
+            bbox=np.array([c_obj["bbox"] for c_obj in camera_objects], dtype=np.float32).reshape(-1, 4),
+            points_start=points_stop - num_points,
+            points_stop=points_stop,
+            points=points,
+        )
 
     def _points_list_to_recarray(self, point_list: list) -> np.recarray:
         """convert list of points list to numpy recarray
@@ -206,38 +412,16 @@ class Frame:
             np.recarray
         """
 
-        fields = self.radar_annot_dict["radar_pcd_metadata"]["fields"]
-        dtypes = self.radar_annot_dict["radar_pcd_metadata"]["dtypes"]
-
-        np_dtype = np.dtype(
-            {
-                "names": ast.literal_eval(fields),
-                "formats": ast.literal_eval(dtypes),
-            }
-        )
-
-        points_cloud = np.rec.array(list(map(tuple, point_list)), np_dtype)
-        return points_cloud
-
-    def _pcd_metadata_template(self) -> OrderedDict:
-        """pcd header template for reading the pcd"""
-
-        metadata = OrderedDict(
-            (
-                ("VERSION", 0.7),
-                ("FIELDS", []),
-                ("SIZE", []),
-                ("TYPE", []),
-                ("COUNT", []),
-                ("WIDTH", 0),
-                ("HEIGHT", 0),
-                ("VIEWPOINT", [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0]),
-                ("POINTS", 0),
-                ("DATA", "binary"),
-            )
-        )
+        np_dtype = self.radar_annot_dtype
+        points_cloud = np.empty(len(point_list), dtype=np_dtype)
+        if not point_list:
+            return points_cloud.view(np.recarray)
 
-        return metadata
+        # all the fields are numbers, so the list of points is converted at once into a 2D array, and then column wise into the records.
+        values = np.array(point_list, dtype=np.float64).reshape(len(point_list), -1)
+        for col, name in enumerate(np_dtype.names):
+            points_cloud[name] = values[:, col]
+        return points_cloud.view(np.recarray)
 
     def _read_pcd(self, pcd_path: Union[Path, str], sensor: str) -> np.recarray:
         """reads the pcd file for sensor.
@@ -251,129 +435,54 @@ class Frame:
         """
 
         assert pcd_path.is_file(), f"No pcd found at {str(pcd_path)}."
-        # ordered dict for reading metadata information from pcd file.
-        metadata = self._pcd_metadata_template()
-
-        with open(str(pcd_path), "rb") as pcd_file:
-            for line in pcd_file:
-                ln = line.strip().decode("utf-8")
-                # first line, or any line with  unimortant content.
-                if ln.startswith("#") or len(ln) < 2:
-                    continue
-                # Regular expression matching with the data of the pcd header.
-                match = re.match("(\w+)\s+([\w\s\.]+)", ln)
-                # no match detected, meaning the header is faulty
-                if not match:
-                    print(f"warning: can't understand line: {ln}")
-                    continue
-                # header key, and values - all are strings
-                key, value = match.group(1), match.group(2)
-
-                if key == "VERSION":
-                    pass
-
-                # viewpoint format -  translation (tx ty tz) + quaternion (qw qx qy qz)
-                if key == "VIEWPOINT":
-                    metadata[key] = list(map(float, value.split()))
-                # these fields should be converted into int data type - only one entry
-                if key in ["POINTS", "HEIGHT", "WIDTH"]:
-                    metadata[key] = int(value)
-                # these fields belong to int, but list of entries
-                if key in ["SIZE", "COUNT"]:
-                    metadata[key] = list(map(int, value.split()))
-                # convert single string to list of strings
-                if key in ["TYPE", "FIELDS", "DATA"]:
-                    metadata[key] = value.split() if len(value.split()) > 1 else value
-
-                # here begins the actual binary data
-                if ln.startswith("DATA"):
-                    break
-
-            # starting byte index.
-            start = 0
-            # list of points.
-            cloud = []
-            # actual binary data
-            binary_data = pcd_file.read()
-
-            # list of byte sizes for each of the pointfields. - used for decoding the binary data.
-            field_sizes = [
-                metadata["SIZE"][i] * metadata["COUNT"][i]
-                for i in range(len(metadata["SIZE"]))
-            ]
 
-            if sensor.lower() == "radar":
-                # type string to get the dtype information for binary decoding of radar pcd.
-                type_str = self.radar_typ_str
-                # list of numpy data types for each fields for converting list of points to numpy record array.
-                np_dtypes = [
-                    (field, np.dtype(typ_str))
-                    for field, typ_str in zip(metadata["FIELDS"], type_str[1:])
-                ]
-            if sensor.lower() == "lidar":
-                # type string to get the dtype information for binary decoding of lidar pcd.
-                type_str = self.lidar_typ_str
-                # lidar pcds contain extra pading bytes from the sensor. generating numpy dtypes considering that fact.
-                np_dtypes = [
-                    (field, np.dtype(typ))
-                    for field, typ in zip(
-                        metadata["FIELDS"], type_str[1:].replace("x", "")
-                    )
-                    if not field == "PAD"
-                ]
-
-            # binary decoding in the chunks of sum(field_sizes).
-            for pts in range(metadata["POINTS"]):
-                # index slice for decoding current point.
-                end = start + sum(field_sizes)
-                pt = struct.unpack(type_str, binary_data[start:end])
-                cloud.append(pt)
-                start = end
-            # list of lists to numpy record array.
-            cloud_np = np.rec.array(cloud, dtype=np_dtypes)
-
-            # adding extra "index" field to keep track of point index.
-            if "index" not in cloud_np.dtype.names:
-                d_type = np.dtype({"names": ["index"], "formats": [np.uint32]})
-                seq = np.linspace(
-                    0,
-                    cloud_np.shape[0],
-                    cloud_np.shape[0],
-                    endpoint=False,
-                    dtype=d_type,
-                )
-                cloud_np = rfn.merge_arrays(
-                    (seq, cloud_np), flatten=True, asrecarray=True
-                )
+        if sensor.lower() == "radar":
+            # type string to get the dtype information for binary decoding of radar pcd.
+            type_str = self.radar_typ_str
+        if sensor.lower() == "lidar":
+            # type string to get the dtype information for binary decoding of lidar pcd.
+            # lidar pcds contain extra pading bytes from the sensor, these are skipped by the decoder.
+            type_str = self.lidar_typ_str
+
+        # decodes all the points at once into a structured array.
+        cloud_np = read_pcd(pcd_path, type_str, mmap=self.mmap)
+        index = None
 
         # we only have radar points annotations till 120 meters. 
         # so, we clip the raw radar cloud to 120 meters in x.
         if sensor == "radar":
-            cloud_np = cloud_np[cloud_np["x"] <= 120]
+            in_range = cloud_np["x"] <= RADAR_MAX_X
+            cloud_np = cloud_np[in_range]
+            index = np.flatnonzero(in_range)
+        elif self.mmap:
+            # the index of the lidar points is computed lazily in `lidar_point_index`.
+            return cloud_np.view(np.recarray)
+
+        # adding extra "index" field to keep track of point index.
+        if "index" not in cloud_np.dtype.names:
+            cloud_np = add_index_field(cloud_np, index)
+        else:
+            cloud_np = rfn.repack_fields(cloud_np).view(np.recarray)
 
         return cloud_np
 
-    def draw_annotations(self, display=False) -> np.array:
-        """draws image annotaions on camera image.
+    def _draw_objects(self, cv_image: np.ndarray, colors: List[Tuple[int, int, int]]) -> np.ndarray:
+        """draws the 2D bbox, class, radar points and track id of the objects on the image.
+
+        The boxes are drawn first, then the radar points of all the objects in one `draw_points` call, and the
+        labels last, so they stay readable.
 
         Args:
-            display (bool, optional): Whether to display the annotated image. If True, displays the image along side of returning it.
-                        Defaults to False.
+            cv_image (np.ndarray): image to draw on, it is modified in place.
+            colors (List[Tuple[int, int, int]]): color of each track id.
 
         Returns:
-            np.array: camera image with annotaions drawn. (2D bbox, class, 3D radar points, and track id info.)
+            np.ndarray: the image.
         """
-        assert self.objects
-
-        # random colors for drawing the bounding boxes and the 3D radar points.
-        blue = random.sample(range(100, 255), 100)
-        green = random.sample(range(70, 200), 100)
-        red = random.sample(range(50, 255), 100)
-        # expecting less than 100 object in the frame.
-        colors = [(blue[i], green[i], red[i]) for i in range(100)]
-
-        cv_image = self.camera_image.copy()
+        import cv2
 
+        labels = []
+        object_points, point_colors = [], []
         for obj in self.objects:
             cat_id = obj.category_id
             track_id = obj.track_id
@@ -382,22 +491,27 @@ class Frame:
             points = (
                 obj.points
             )  # it will be none for those objects which does not have any radar points.
-            color = colors[track_id]
+            # objects without track id are colored by their det_id.
+            color = colors[(track_id if track_id is not None else obj.det_id) % len(colors)]
             class_name = INFRA_ID_TO_CLASS[str(cat_id)]["name"]
             cv2.rectangle(cv_image, (int(x0), int(y0)), (x1, y1), color, 3)
             fontScale = 0.8 
             if points is not None:
-                points = self.project_cloud_to_camera(mode="radar", cloud=points)
-                for obj_pt in points:
-                    u, v = int(obj_pt["u"]), int(obj_pt["v"])
-                    cv_image = cv2.circle(cv_image, (int(u), int(v)), 7, color, -1)
+                object_points.append(points)
+                point_colors.append(np.broadcast_to(np.asarray(color, dtype=np.uint8), (points.shape[0], 3)))
 
                 # update the fontscale for bounding box text label based on the distance of the object.+
                 if points["range"].mean() > 50:
                     fontScale = 1.0
 
-            text_label = f"{str(track_id).zfill(2)}: {class_name}"
+            labels.append((f"{str(track_id).zfill(2)}: {class_name}", x0, y0, fontScale))
 
+        # the points of all the objects are projected and drawn at once, in the order of the objects.
+        if object_points:
+            u, v, _ = self.project_points_to_camera(mode="radar", cloud=np.concatenate(object_points))
+            draw_points(cv_image, u, v, np.concatenate(point_colors), 7)
+
+        for text_label, x0, y0, fontScale in labels:
             thickness = 1 
             (w1, h1), _ = cv2.getTextSize(
                 text_label, cv2.FONT_HERSHEY_TRIPLEX, fontScale, thickness
@@ -422,20 +536,110 @@ class Frame:
                 thickness,  # thickness
                 cv2.LINE_AA,
             )
-        cv_image = cv2.addWeighted(cv_image, 0.8, self.camera_image.copy(), 0.2, 0)
+        return cv_image
+
+    def _draw_radar_points(self, cv_image: np.ndarray) -> np.ndarray:
+        """draws the radar points within the camera field of view on the image, in place."""
+        projected_cloud = self.project_cloud_to_camera(mode="radar", cloud=self.radar_point_cloud)
+        if projected_cloud is None:
+            return cv_image
+        projected_cloud = projected_cloud[self._camera_fov_mask(projected_cloud)]
+
+        # moving away: blue, moving towards: red, static: green (BGR).
+        range_rate = projected_cloud["range_rate"]
+        moving_away, moving_towards = range_rate >= 0.1, range_rate <= -0.1
+        colors = np.select(
+            [moving_away[:, None], moving_towards[:, None]],
+            [np.array([255, 0, 0]), np.array([0, 0, 255])],
+            np.array([0, 255, 0]),
+        )
+        radius = np.where(moving_away | moving_towards, 5, 4)
+        draw_points(cv_image, projected_cloud["u"], projected_cloud["v"], colors, radius)
+        return cv_image
+
+    def _draw_lidar_points(self, cv_image: np.ndarray) -> np.ndarray:
+        """draws the lidar points within the camera field of view on the image, in place."""
+        projected_cloud = self.project_cloud_to_camera(mode="lidar", cloud=self.lidar_point_cloud)
+        if projected_cloud is None:
+            return cv_image
+        projected_cloud = projected_cloud[self._camera_fov_mask(projected_cloud)]
+
+        # normalised reflectivity [0, 1] as blue channel.
+        reflectivity = projected_cloud["reflectivity"].astype(np.float32)
+        if reflectivity.size > 0:
+            reflectivity -= reflectivity.min()
+            if reflectivity.max() > 0:
+                reflectivity /= reflectivity.max()
+
+        colors = np.empty((projected_cloud.shape[0], 3), dtype=np.uint8)
+        colors[:, 0] = (reflectivity * 255).astype(np.uint8)
+        colors[:, 1] = 70
+        colors[:, 2] = 150
+        draw_points(cv_image, projected_cloud["u"], projected_cloud["v"], colors, 2)
+        return cv_image
+
+    def render(self, overlay: Sequence[str] = OVERLAYS, alpha: float = 0.8) -> np.ndarray:
+        """camera image with the overlays drawn on it, without displaying it. The layers are drawn in the order
+        lidar, radar, annotations, so annotations are on top.
+
+        Unlike `draw_annotations`, each track id has the same color in all the frames, e.g. for videos.
+
+        Args:
+            overlay (Sequence[str], optional): any of "annotations", "radar" and "lidar". Defaults to all of them.
+            alpha (float, optional): weight of the annotations when blending them with the image. Defaults to 0.8.
+
+        Returns:
+            np.ndarray: rendered image.
+        """
+        import cv2
+
+        for layer in overlay:
+            assert layer in OVERLAYS, f"unknown overlay {layer}, must be one of {OVERLAYS}"
+        cv_image = self.camera_image.copy()
+        if "lidar" in overlay:
+            self._draw_lidar_points(cv_image)
+        if "radar" in overlay:
+            self._draw_radar_points(cv_image)
+        if "annotations" in overlay and len(self.detections) > 0:
+            annotated = self._draw_objects(cv_image.copy(), TRACK_COLORS)
+            if alpha < 1.0:
+                annotated = cv2.addWeighted(annotated, alpha, cv_image, 1.0 - alpha, 0, dst=annotated)
+            cv_image = annotated
+        return cv_image
+
+    def draw_annotations(self, display=False, alpha: float = 0.8) -> np.array:
+        """draws image annotaions on camera image.
+
+        Args:
+            display (bool, optional): Whether to display the annotated image. If True, displays the image along side of returning it.
+                        Defaults to False.
+            alpha (float, optional): weight of the drawn annotations when blending them with the camera image. Defaults to 0.8.
+                        With 1.0, the annotations are drawn opaque and the blending is skipped.
+
+        Returns:
+            np.array: camera image with annotaions drawn. (2D bbox, class, 3D radar points, and track id info.)
+        """
+        import cv2
+
+        assert self.objects
+
+        # random colors for drawing the bounding boxes and the 3D radar points.
+        cv_image = self._draw_objects(self.camera_image.copy(), _object_colors(random))
+        if alpha < 1.0:
+            cv_image = cv2.addWeighted(cv_image, alpha, self.camera_image, 1.0 - alpha, 0, dst=cv_image)
         if display:
+            from .visualization import show_image
 
-            cv2.namedWindow("Ground Truth Annotations", cv2.WINDOW_KEEPRATIO)
-            cv2.imshow("Ground Truth Annotations", cv_image)
-            while cv2.getWindowProperty('Ground Truth Annotations', cv2.WND_PROP_VISIBLE) >= 1 : #cv2.WND_PROP_VISIBLE
-                keyCode = cv2.waitKey(500)
-            
-                if (keyCode & 0xFF) == ord("q"):
-                    cv2.destroyAllWindows()
-                    break
+            show_image("Ground Truth Annotations", cv_image)
                     
         return cv_image
 
+    def _read_camera_image(self) -> np.ndarray:
+        # opencv is imported when the first image is read, loading point clouds and annotations does not need it.
+        import cv2
+
+        return cv2.imread(str(self.image_path))
+
     def _read_radar_pcd(self) -> np.recarray:
         radar_cloud = self._read_pcd(self.radar_pcd_path, "radar")
         return radar_cloud
@@ -458,28 +662,13 @@ class Frame:
             cloud = self.project_cloud_to_camera(mode=mode, cloud=cloud)
             cloud = self._clip_point_cloud_to_camera_fov(cloud)
 
-        locs = cloud[["x", "y", "z"]]
+        locs = cloud[["x", "y", "z"]].copy()
         if mode == "lidar":
             locs["z"] = locs["z"] - 3.5
 
-        fig = plt.figure(figsize=(10, 7))
-        ax = fig.add_subplot(111, projection="3d")
-        scatter = ax.scatter3D(locs["x"], locs["y"], locs["z"], color="red", marker=".")
-        ax.set_xlabel("X (metres)")
-        ax.set_ylabel("Y (metres)")
-        ax.set_zlabel("Z (metres)")
+        from .visualization import scatter_3D
 
-        # ax.set_facecolor("black")
-        ax.grid(True, color="white", linestyle="dotted")
-
-        fig.canvas.mpl_connect(
-            "pick_event",
-            lambda event: print(
-                f"Point3D(X={locs['x'][event.ind[0]]},Y={locs['x'][event.ind[0]]},Z={locs['x'][event.ind[0]]})"
-            ),
-        )
-        scatter.set_picker(True)
-        plt.show()
+        scatter_3D(locs)
 
     def visualise_3D_radar_point_cloud(self, camera_fov_align=False) -> None:
         """spawns a matlab 3D interactive scatter plot for visualizing 3D radar point cloud.
@@ -493,96 +682,95 @@ class Frame:
     def visualise_3D_lidar_point_cloud(self, camera_fov_align=False):
         raise NotImplementedError
 
-    def project_cloud_to_camera(self, mode: str, cloud: np.recarray) -> np.recarray:
-        """calculate u,v positions of each point within cloud.
-        Note that this function does not remove the points which do not fall on image plane. 
+    def project_points_to_camera(
+        self, mode: str, cloud: np.ndarray, dtype: np.dtype = np.float64
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """calculate u,v pixel positions and depth of each point within cloud.
 
         Args:
             mode (str): radar and lidar
-            cloud (np.recarray): sensor point cloud. Must contain [index,x,y,z] fields.
+            cloud (np.ndarray): sensor point cloud. Must contain [x,y,z] fields.
+            dtype (np.dtype, optional): floating point type used for the projection. Defaults to np.float64.
+                        np.float32 is faster for large clouds (lidar), at the cost of precision.
 
         Returns:
-            np.recarray : projected cloud. Original point cloud with each points having two extra fields (columns) : u,v.
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: u, v, and depth (distance along the camera axis) of each point.
         """
 
         assert mode.lower() in ["radar", "lidar"]
 
-        camera_instrinsics = self.calibration.camera_intrinsics
-        if mode == "lidar":
-            extrinsics = self.calibration.lidar_to_camera
-        else:
-            extrinsics = self.calibration.radar_to_camera
-
-        # need (n,4) dimensions, 4th col values = 1
-        cloud_xyz = cloud[["x", "y", "z", "index"]].copy()  # (n,4)
-        cloud_xyz["index"] = 1  # (n,4)-[x,y,z,index(dummy)]
-        # index array to keep track of points
-        index = cloud["index"]
-        # projection matrix
-        p = np.matmul(camera_instrinsics, extrinsics)  # (3,3)*(3,4) -> (3,4)
-        # multiply points in 3d sensor dim to projection matrix to get u,v,w
-        projected_points = np.matmul(
-            p, rfn.structured_to_unstructured(cloud_xyz).transpose()
-        )  # (3,4)*(4,n) -> (3,n)
-        w = projected_points[2, :]
-        # camera has only 2d, but each point in projected_points is 3 dimensional(u,v,w)
-        # normalise each point by third dim (w) to get the actual pixel coord of point
-        projected_points = np.array(
-            [
-                projected_points[0, :] / projected_points[2, :],  # u = x/w
-                projected_points[1, :] / projected_points[2, :],  # v = y/w
-            ]
-        )  # (2,n)
-        projected_points = np.transpose(projected_points)  # (n,2) - (u,v)
+        # need contiguous (n,3) array
+        cloud_xyz = np.empty((cloud.shape[0], 3), dtype=dtype)
+        cloud_xyz[:, 0] = cloud["x"]
+        cloud_xyz[:, 1] = cloud["y"]
+        cloud_xyz[:, 2] = cloud["z"]
 
-        projected_points = np.column_stack((index, projected_points))
+        # the projection matrix is computed once per scene by the calibration.
+        return self.calibration.project_points(cloud_xyz, mode.lower())
 
-        dtype = np.dtype(
-            {
-                "names": ["index", "u", "v"],
-                "formats": [np.uint32, np.float32, np.float32],
-            }
-        )
+    def project_cloud_to_camera(
+        self, mode: str, cloud: np.recarray, dtype: np.dtype = np.float64
+    ) -> np.recarray:
+        """calculate u,v positions of each point within cloud.
+        Note that this function does not remove the points which do not fall on image plane. 
+
+        Args:
+            mode (str): radar and lidar
+            cloud (np.recarray): sensor point cloud. Must contain [x,y,z] fields.
+            dtype (np.dtype, optional): floating point type used for the projection. see `project_points_to_camera`.
 
-        projected_points = rfn.unstructured_to_structured(projected_points, dtype=dtype)
+        Returns:
+            np.recarray : projected cloud. Original point cloud with each points having two extra fields (columns) : u,v.
+        """
 
-        if projected_points.size == 0:
+        if cloud.shape[0] == 0:
             return None
 
-        indices = [
-            idx
-            for idx, _ in enumerate(cloud["index"])
-            if _ in projected_points["index"]
-        ]
-        raw_points_on_image = cloud[indices]
+        u, v, _ = self.project_points_to_camera(mode, cloud, dtype)
 
-        points_with_uv = rfn.merge_arrays(
-            (raw_points_on_image, projected_points[["u", "v"]]),
-            flatten=True,
-            asrecarray=True,
+        # original fields and u,v are written into one new array.
+        points_with_uv = np.empty(
+            cloud.shape[0],
+            dtype=[(name, cloud.dtype.fields[name][0]) for name in cloud.dtype.names]
+            + [("u", np.float32), ("v", np.float32)],
         )
+        for name in cloud.dtype.names:
+            points_with_uv[name] = cloud[name]
+        points_with_uv["u"] = u
+        points_with_uv["v"] = v
 
-        return points_with_uv
+        return points_with_uv.view(np.recarray)
 
-    def _clip_point_cloud_to_camera_fov(self, point_cloud: np.recarray) -> np.recarray:
-        """clips the input point cloud to the cmaera field of view.
+    def _camera_fov_mask(self, point_cloud: np.recarray) -> np.ndarray:
+        """boolean mask of the points which fall within the camera field of view.
 
         Args:
             point_cloud (np.recarray): input point cloud. The cloud must have "u", and "v" fields.
 
         Returns:
-            np.recarray : clipped cloud
+            np.ndarray : boolean mask, True for points inside the camera image.
         """
-        cv_image = self.camera_image.copy()
-        (rows, cols, channels) = cv_image.shape
+        (rows, cols) = self.image_shape
 
-        point_cloud = point_cloud[
-            (point_cloud["u"] > 0)
-            & (point_cloud["v"] > 0)
-            & (point_cloud["u"] < cols)
-            & (point_cloud["v"] < rows)
-        ]
-        return point_cloud
+        u, v = point_cloud["u"], point_cloud["v"]
+        return (u > 0) & (v > 0) & (u < cols) & (v < rows)
+
+    def _clip_point_cloud_to_camera_fov(
+        self, point_cloud: np.recarray, return_indices: bool = False
+    ) -> Union[np.recarray, Tuple[np.recarray, np.ndarray]]:
+        """clips the input point cloud to the cmaera field of view.
+
+        Args:
+            point_cloud (np.recarray): input point cloud. The cloud must have "u", and "v" fields.
+            return_indices (bool, optional): If True, also returns the positions of the kept points in the input cloud. Defaults to False.
+
+        Returns:
+            np.recarray : clipped cloud, and positions of the kept points if `return_indices` is True.
+        """
+        mask = self._camera_fov_mask(point_cloud)
+        if return_indices:
+            return point_cloud[mask], np.flatnonzero(mask)
+        return point_cloud[mask]
 
     def visualise_radar_cloud_on_camera(self, display=False) -> np.array:
         """project radar point cloud on camera image.
@@ -591,32 +779,12 @@ class Frame:
             np.array: projected image.
         """
 
-        radar_cloud = self.radar_point_cloud
-        projected_cloud = self.project_cloud_to_camera(mode="radar", cloud=radar_cloud)
-
-        cv_image = self.camera_image.copy()
-        projected_cloud = self._clip_point_cloud_to_camera_fov(projected_cloud)
-
-        for point in projected_cloud:
-            u, v = point["u"], point["v"]
-            range_rate = point["range_rate"]
-            if range_rate >= 0.1:
-                cv_image = cv2.circle(cv_image, (int(u), int(v)), 5, (255, 0, 0), -1)
-            elif range_rate <= -0.1:
-                cv_image = cv2.circle(cv_image, (int(u), int(v)), 5, (0, 0, 255), -1)
-            else:
-                cv_image = cv2.circle(cv_image, (int(u), int(v)), 4, (0, 255, 0), -1)
+        cv_image = self._draw_radar_points(self.camera_image.copy())
 
         if display:
-            cv2.namedWindow("Radar Projected on Image", cv2.WINDOW_KEEPRATIO)
-            cv2.imshow("Radar Projected on Image", cv_image)
+            from .visualization import show_image
 
-            while cv2.getWindowProperty('Radar Projected on Image', cv2.WND_PROP_VISIBLE) >= 1 : #cv2.WND_PROP_VISIBLE
-                keyCode = cv2.waitKey(500)
-            
-                if (keyCode & 0xFF) == ord("q"):
-                    cv2.destroyAllWindows()
-                    break
+            show_image("Radar Projected on Image", cv_image)
 
         return cv_image
 
@@ -627,36 +795,12 @@ class Frame:
             np.array: projected image.
         """
 
-        lidar_cloud = self.lidar_point_cloud
-        projected_cloud = self.project_cloud_to_camera(mode="lidar", cloud=lidar_cloud)
-
-        cv_image = self.camera_image.copy()
-        projected_cloud = self._clip_point_cloud_to_camera_fov(projected_cloud)
-        reflectivity = projected_cloud["reflectivity"]
-        projected_cloud["reflectivity"] = (reflectivity - np.min(reflectivity)) / (
-            np.max(reflectivity) - np.min(reflectivity)
-        )
-
-        for point in projected_cloud:
-            u, v = point["u"], point["v"]
-
-            cv_image = cv2.circle(
-                cv_image,
-                (int(u), int(v)),
-                2,
-                (int(point["reflectivity"] * 255), 70, 150),
-                -1,
-            )
+        cv_image = self._draw_lidar_points(self.camera_image.copy())
 
         if display:
-            cv2.namedWindow("Lidar projected on Image", cv2.WINDOW_KEEPRATIO)
-            cv2.imshow("Lidar projected on Image", cv_image)
-            while cv2.getWindowProperty('Lidar projected on Image', cv2.WND_PROP_VISIBLE) >= 1 : #cv2.WND_PROP_VISIBLE
-                keyCode = cv2.waitKey(500)
-            
-                if (keyCode & 0xFF) == ord("q"):
-                    cv2.destroyAllWindows()
-                    break
+            from .visualization import show_image
+
+            show_image("Lidar projected on Image", cv_image)
 
         return cv_image
 
@@ -0,0 +1,300 @@
+#! /usr/bin/env python3
+"""
+Script Name: loader.py
+
+Description:
+This script provides a batched data loader for training, with NumPy arrays only, so it can be used with any
+framework (e.g. torch.from_numpy on the arrays of a batch). A BatchSampler shuffles the frame indices with a
+permutation which only depends on the seed and the epoch, shards them across ranks, and splits them into batches.
+The FrameLoader decodes and collates the batches in a pool of workers, one batch per call, at most `depth`
+batches ahead of the training loop. Collation stacks the camera images, packs the ragged radar and lidar clouds into
+one flat array with offsets or into a padded array, and concatenates the detections of the frames.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, Sequence, Union
+import numpy as np
+from .frame import Frame
+from .detections import DetectionTable
+from .prefetch import map_ordered
+from .rasterize import VOXEL_FIELDS
+
+# Frame properties which can be collated.
+LOADER_FIELDS = ("camera_image", "radar_point_cloud", "lidar_point_cloud", "detections")
+# layouts of the collated point clouds.
+CLOUD_LAYOUTS = ("flat", "padded")
+# sensor of each point cloud field.
+CLOUD_SENSORS = {"radar_point_cloud": "radar", "lidar_point_cloud": "lidar"}
+
+
+@dataclass
+class Batch:
+    """collated frames.
+
+    clouds holds the points of each sensor ("radar", "lidar") as float32 arrays with the columns of cloud_fields:
+    (points, fields) with the frames one after the other for the flat layout, or (frames, max_points, fields)
+    padded with zeros for the padded layout. num_points holds the (frames,) number of points of each frame.
+    The frame column of the detections is the position of the frame in the batch.
+    """
+
+    indices: np.ndarray
+    image_ids: np.ndarray
+    camera_image: np.ndarray = None  # (frames, rows, cols, 3) uint8
+    clouds: Dict[str, np.ndarray] = field(default_factory=dict)
+    num_points: Dict[str, np.ndarray] = field(default_factory=dict)
+    cloud_fields: Dict[str, Sequence[str]] = field(default_factory=dict)
+    detections: DetectionTable = None
+
+    def offsets(self, sensor: str) -> np.ndarray:
+        """(frames + 1,) for the flat layout, the points of frame i are clouds[sensor][offsets[i]:offsets[i + 1]]."""
+        return np.concatenate(([0], np.cumsum(self.num_points[sensor]))).astype(np.int64)
+
+    def mask(self, sensor: str) -> np.ndarray:
+        """(frames, max_points) for the padded layout, True for the points and False for the padding."""
+        return np.arange(self.clouds[sensor].shape[1]) < self.num_points[sensor][:, None]
+
+    def __len__(self):
+        return self.indices.shape[0]
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"num_frames={len(self)}, "
+        s += ", ".join(f"{sensor}={cloud.shape}" for sensor, cloud in self.clouds.items())
+        s += f", num_objs={0 if self.detections is None else len(self.detections)})"
+        return s
+
+    __repr__ = __str__
+
+
+def _pack_clouds(clouds: Sequence[np.ndarray], fields: Sequence[str], layout: str, max_points: int = None):
+    """float32 points of the clouds in the flat or padded layout, and the number of points of each cloud."""
+    num_points = np.array([cloud.shape[0] for cloud in clouds], dtype=np.int64)
+    if layout == "padded":
+        if max_points is not None:
+            num_points = np.minimum(num_points, max_points)
+        packed = np.zeros((len(clouds), int(num_points.max(initial=0)), len(fields)), dtype=np.float32)
+        for cloud, n, out in zip(clouds, num_points, packed):
+            for col, name in enumerate(fields):
+                out[:n, col] = cloud[name][:n]
+        return packed, num_points
+
+    offsets = np.concatenate(([0], np.cumsum(num_points)))
+    packed = np.empty((offsets[-1], len(fields)), dtype=np.float32)
+    for cloud, start, stop in zip(clouds, offsets[:-1], offsets[1:]):
+        for col, name in enumerate(fields):
+            packed[start:stop, col] = cloud[name]
+    return packed, num_points
+
+
+def collate(
+    frames: Sequence[Frame],
+    indices: Sequence[int] = None,
+    fields: Sequence[str] = LOADER_FIELDS,
+    layout: str = "flat",
+    max_points: Union[int, Dict[str, int]] = None,
+    cloud_fields: Dict[str, Sequence[str]] = None,
+) -> Batch:
+    """decodes the fields of the frames and collates them into one Batch.
+
+    Args:
+        frames (Sequence[Frame]): frames of the batch.
+        indices (Sequence[int], optional): dataset indices of the frames, stored in the batch. Defaults to None, which is 0..frames-1.
+        fields (Sequence[str], optional): Frame properties to collate, see LOADER_FIELDS. Defaults to all of them.
+        layout (str, optional): "flat" or "padded" point clouds. Defaults to "flat".
+        max_points (Union[int, Dict[str, int]], optional): for the padded layout, maximum number of points per frame,
+                    or per sensor e.g. {"lidar": 65536}. The first points of larger clouds are kept. Defaults to None,
+                    which pads to the largest cloud of the batch.
+        cloud_fields (Dict[str, Sequence[str]], optional): columns of the clouds per sensor. Defaults to None, in
+                    which case rasterize.VOXEL_FIELDS are used.
+
+    Returns:
+        Batch
+    """
+    for name in fields:
+        assert name in LOADER_FIELDS, f"{name} can not be collated, must be one of {LOADER_FIELDS}"
+    assert layout in CLOUD_LAYOUTS, f"unknown layout {layout}, must be one of {CLOUD_LAYOUTS}"
+    cloud_fields = dict(VOXEL_FIELDS, **(cloud_fields or {}))
+    indices = np.arange(len(frames)) if indices is None else indices
+
+    batch = Batch(
+        indices=np.asarray(indices, dtype=np.int64),
+        image_ids=np.array([frame.image_id for frame in frames], dtype=np.int64),
+    )
+    if "camera_image" in fields:
+        batch.camera_image = np.stack([frame.camera_image for frame in frames])
+    for name, sensor in CLOUD_SENSORS.items():
+        if name not in fields:
+            continue
+        sensor_max_points = max_points.get(sensor) if isinstance(max_points, dict) else max_points
+        batch.cloud_fields[sensor] = tuple(cloud_fields[sensor])
+        batch.clouds[sensor], batch.num_points[sensor] = _pack_clouds(
+            [getattr(frame, name) for frame in frames], batch.cloud_fields[sensor], layout, sensor_max_points
+        )
+    if "detections" in fields:
+        batch.detections = DetectionTable.concatenate([frame.detections for frame in frames], frames=range(len(frames)))
+    return batch
+
+
+class BatchSampler:
+    def __init__(
+        self,
+        indices: Union[int, Sequence[int]],
+        batch_size: int,
+        shuffle: bool = False,
+        seed: int = 0,
+        drop_last: bool = False,
+        rank: int = 0,
+        world_size: int = 1,
+    ) -> None:
+        """splits frame indices into batches, with deterministic shuffling and sharding across ranks.
+
+        The permutation of an epoch only depends on `seed` and the epoch (see `set_epoch`), so all the ranks shuffle
+        the same way and each rank takes every world_size-th index of it. Unless `drop_last` is set, the permutation
+        is padded with its first indices to a multiple of world_size, so all the ranks get the same number of batches.
+
+        Args:
+            indices (Union[int, Sequence[int]]): number of frames, or the frame indices to sample, e.g. from Infra3DRCDataset.filter.
+            batch_size (int): number of frames per batch.
+            shuffle (bool, optional): If True, the indices are shuffled in every epoch. Defaults to False.
+            seed (int, optional): seed of the shuffling. Defaults to 0.
+            drop_last (bool, optional): If True, the last incomplete batch, and the indices which do not divide evenly
+                    across the ranks, are dropped. Defaults to False.
+            rank (int, optional): rank of this process. Defaults to 0.
+            world_size (int, optional): number of ranks. Defaults to 1.
+        """
+        assert batch_size >= 1, f"batch size must be at least 1, not {batch_size}"
+        assert 0 <= rank < world_size, f"rank must be in range 0-{world_size - 1}, not {rank}"
+        self.indices = np.arange(indices) if isinstance(indices, (int, np.integer)) else np.asarray(indices, dtype=np.int64)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.drop_last = drop_last
+        self.rank = rank
+        self.world_size = world_size
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        """sets the epoch, which selects the permutation of the shuffling."""
+        self.epoch = epoch
+
+    def _rank_indices(self) -> np.ndarray:
+        """indices of this rank in the current epoch."""
+        indices = self.indices
+        if self.shuffle:
+            indices = indices[np.random.default_rng([self.seed, self.epoch]).permutation(indices.shape[0])]
+        if self.drop_last:
+            indices = indices[: indices.shape[0] - indices.shape[0] % self.world_size]
+        elif indices.shape[0] % self.world_size:
+            indices = np.resize(indices, indices.shape[0] + self.world_size - indices.shape[0] % self.world_size)
+        return indices[self.rank :: self.world_size]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        indices = self._rank_indices()
+        stop = indices.shape[0] - indices.shape[0] % self.batch_size if self.drop_last else indices.shape[0]
+        for start in range(0, stop, self.batch_size):
+            yield indices[start : start + self.batch_size]
+
+    def __len__(self):
+        num_indices = self._rank_indices().shape[0]
+        if self.drop_last:
+            return num_indices // self.batch_size
+        return -(-num_indices // self.batch_size)
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"num_indices={self.indices.shape[0]}, "
+        s += f"batch_size={self.batch_size}, "
+        s += f"shuffle={self.shuffle}, "
+        s += f"rank={self.rank}/{self.world_size}, "
+        s += f"epoch={self.epoch})"
+        return s
+
+    __repr__ = __str__
+
+
+class FrameLoader:
+    def __init__(
+        self,
+        dataset,
+        batch_size: int = 8,
+        shuffle: bool = False,
+        seed: int = 0,
+        drop_last: bool = False,
+        rank: int = 0,
+        world_size: int = 1,
+        indices: Iterable[int] = None,
+        fields: Sequence[str] = LOADER_FIELDS,
+        layout: str = "flat",
+        max_points: Union[int, Dict[str, int]] = None,
+        cloud_fields: Dict[str, Sequence[str]] = None,
+        workers: int = 4,
+        backend: str = "thread",
+        depth: int = None,
+    ) -> None:
+        """iterates over collated batches of the frames of a scene or of the dataset.
+
+        Each batch is decoded and collated by one worker, and at most `depth` batches are loaded ahead.
+        Call `set_epoch` before each epoch to shuffle differently.
+
+        Args:
+            dataset (Union[Infra3DRC, Infra3DRCDataset]): frames, indexed by int.
+            batch_size (int, optional): number of frames per batch. Defaults to 8.
+            shuffle (bool, optional): see BatchSampler. Defaults to False.
+            seed (int, optional): see BatchSampler. Defaults to 0.
+            drop_last (bool, optional): see BatchSampler. Defaults to False.
+            rank (int, optional): see BatchSampler. Defaults to 0.
+            world_size (int, optional): see BatchSampler. Defaults to 1.
+            indices (Iterable[int], optional): frame indices to load, e.g. from Infra3DRCDataset.filter. Defaults to None, which is all the frames.
+            fields (Sequence[str], optional): see collate. Defaults to LOADER_FIELDS.
+            layout (str, optional): see collate. Defaults to "flat".
+            max_points (Union[int, Dict[str, int]], optional): see collate. Defaults to None.
+            cloud_fields (Dict[str, Sequence[str]], optional): see collate. Defaults to None.
+            workers (int, optional): number of threads or processes. Defaults to 4.
+            backend (str, optional): "thread" or "process". Defaults to "thread".
+            depth (int, optional): maximum number of batches loaded ahead. Defaults to None, which is 2 * workers.
+        """
+        for name in fields:
+            assert name in LOADER_FIELDS, f"{name} can not be collated, must be one of {LOADER_FIELDS}"
+        assert layout in CLOUD_LAYOUTS, f"unknown layout {layout}, must be one of {CLOUD_LAYOUTS}"
+        self.dataset = dataset
+        self.sampler = BatchSampler(
+            len(dataset) if indices is None else list(indices), batch_size, shuffle, seed, drop_last, rank, world_size
+        )
+        self.collate_args = (tuple(fields), layout, max_points, cloud_fields)
+        self.workers = workers
+        self.backend = backend
+        self.depth = depth
+
+    def set_epoch(self, epoch: int) -> None:
+        """sets the epoch of the sampler, which selects the permutation of the shuffling."""
+        self.sampler.set_epoch(epoch)
+
+    def __iter__(self) -> Iterator[Batch]:
+        # the frames are created lazily, when the call of their batch is submitted.
+        return map_ordered(
+            collate,
+            (
+                ([self.dataset[int(idx)] for idx in batch_indices], batch_indices) + self.collate_args
+                for batch_indices in self.sampler
+            ),
+            self.workers,
+            self.backend,
+            self.depth,
+        )
+
+    def __len__(self):
+        return len(self.sampler)
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"num_batches={len(self)}, "
+        s += f"sampler={self.sampler}, "
+        s += f"workers={self.workers})"
+        return s
+
+    __repr__ = __str__
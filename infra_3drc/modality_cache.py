@@ -0,0 +1,146 @@
+#! /usr/bin/env python3
+"""
+Script Name: modality_cache.py
+
+Description:
+This script provides a bounded least recently used cache for the decoded modalities of frames
+(camera image, radar and lidar point clouds, objects). Each modality has its own budget in bytes, and the least
+recently used entries of a modality are evicted when its budget is exceeded.
+Frames of a scene with a modality cache do not keep the decoded data themselves, so the memory used by a scene
+is bounded no matter how many frames are accessed.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Union
+import threading
+import numpy as np
+from .detections import DetectionTable
+
+# modalities kept in the cache, named as the Frame properties. "objects" holds the DetectionTable of each frame,
+# keyed by its camera annotation json, and the Detection list of each frame, keyed by its camera image.
+MODALITIES = ("camera_image", "radar_point_cloud", "lidar_point_cloud", "objects")
+# estimated size in bytes of one Detection without its points.
+DETECTION_NBYTES = 256
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    nbytes: int = 0
+
+
+def _nbytes(value: Any) -> int:
+    """estimated memory of a decoded modality in bytes."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, DetectionTable):
+        columns = (getattr(value, name) for name in DetectionTable.COLUMNS)
+        return sum(column.nbytes for column in columns) + value.points.nbytes
+    if isinstance(value, list):
+        # list of Detection objects.
+        return sum(DETECTION_NBYTES + (0 if obj.points is None else obj.points.nbytes) for obj in value)
+    return 0
+
+
+class ModalityCache:
+    def __init__(self, max_bytes: Union[int, Dict[str, int]]) -> None:
+        """least recently used cache of decoded frame modalities, bounded in bytes per modality. It is thread safe.
+
+        Args:
+            max_bytes (Union[int, Dict[str, int]]): budget of each modality in bytes, the same one for all the modalities
+                    if int. Modalities missing from the dict are not handled by the cache, frames keep them as without cache.
+        """
+        if isinstance(max_bytes, dict):
+            for modality in max_bytes:
+                assert modality in MODALITIES, f"unknown modality: {modality}, must be one of {MODALITIES}"
+            self.max_bytes = {modality: max_bytes.get(modality, 0) for modality in MODALITIES}
+        else:
+            self.max_bytes = {modality: max_bytes for modality in MODALITIES}
+        self._entries = {modality: OrderedDict() for modality in MODALITIES}
+        self._stats = {modality: CacheStats() for modality in MODALITIES}
+        self._lock = threading.Lock()
+
+    def handles(self, modality: str) -> bool:
+        """True if the modality has a budget in this cache."""
+        return self.max_bytes.get(modality, 0) > 0
+
+    def get_or_load(self, modality: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """cached value of the modality for key. On a miss, the value is loaded, and stored if it fits into the budget.
+
+        Args:
+            modality (str): one of MODALITIES.
+            key (Hashable): key of the frame, e.g. the camera image path.
+            loader (Callable[[], Any]): decodes the value on a miss. It is called without holding the lock,
+                    so threads loading different frames do not wait for each other.
+
+        Returns:
+            Any: the value.
+        """
+        entries, stats = self._entries[modality], self._stats[modality]
+        with self._lock:
+            if key in entries:
+                entries.move_to_end(key)
+                stats.hits += 1
+                return entries[key][0]
+            stats.misses += 1
+
+        value = loader()
+        nbytes = _nbytes(value)
+        max_bytes = self.max_bytes[modality]
+        if nbytes > max_bytes:
+            return value
+
+        with self._lock:
+            if key in entries:
+                # loaded by another thread meanwhile.
+                stats.nbytes -= entries.pop(key)[1]
+                stats.entries -= 1
+            entries[key] = (value, nbytes)
+            stats.nbytes += nbytes
+            stats.entries += 1
+            while stats.nbytes > max_bytes:
+                _, (_, evicted_nbytes) = entries.popitem(last=False)
+                stats.nbytes -= evicted_nbytes
+                stats.entries -= 1
+                stats.evictions += 1
+        return value
+
+    def stats(self) -> Dict[str, CacheStats]:
+        """copy of the hit, miss and eviction counters, number of entries and bytes of each modality."""
+        with self._lock:
+            return {modality: CacheStats(**vars(stats)) for modality, stats in self._stats.items()}
+
+    def clear(self) -> None:
+        """removes all the entries. The counters are kept."""
+        with self._lock:
+            for modality in MODALITIES:
+                self._entries[modality].clear()
+                self._stats[modality].entries = 0
+                self._stats[modality].nbytes = 0
+
+    def __getstate__(self) -> dict:
+        # in other processes (e.g. prefetch workers), the cache starts empty with the same budgets.
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["max_bytes"])
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += ", ".join(
+            f"{modality}={stats.nbytes / 2**20:.1f}/{self.max_bytes[modality] / 2**20:.1f} MiB"
+            for modality, stats in self.stats().items()
+        )
+        s += ")"
+        return s
+
+    __repr__ = __str__
@@ -0,0 +1,320 @@
+#! /usr/bin/env python3
+"""
+Script Name: pcd.py
+
+Description:
+This script provides vectorized decoding of point cloud data (.pcd) files into numpy structured arrays.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+from pathlib import Path
+from typing import Union, BinaryIO
+from collections import OrderedDict
+import re
+import struct
+import warnings
+import numpy as np
+
+# field names used by the sensors for padding bytes. these are not part of the decoded cloud.
+PAD_FIELDS = ("PAD", "_")
+
+# pcd TYPE letter to numpy kind.
+_PCD_TYPE_TO_KIND = {"F": "f", "U": "u", "I": "i"}
+
+
+def _pcd_metadata_template() -> OrderedDict:
+    """pcd header template for reading the pcd"""
+
+    metadata = OrderedDict(
+        (
+            ("VERSION", 0.7),
+            ("FIELDS", []),
+            ("SIZE", []),
+            ("TYPE", []),
+            ("COUNT", []),
+            ("WIDTH", 0),
+            ("HEIGHT", 0),
+            ("VIEWPOINT", [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0]),
+            ("POINTS", 0),
+            ("DATA", "binary"),
+        )
+    )
+
+    return metadata
+
+
+def read_pcd_header(pcd_file: BinaryIO) -> OrderedDict:
+    """reads the pcd header. The file is left positioned at the first byte of the point data.
+
+    Args:
+        pcd_file (BinaryIO): pcd file opened in binary mode.
+
+    Returns:
+        OrderedDict: pcd metadata
+    """
+    # ordered dict for reading metadata information from pcd file.
+    metadata = _pcd_metadata_template()
+
+    for line in pcd_file:
+        ln = line.strip().decode("utf-8")
+        # first line, or any line with  unimortant content.
+        if ln.startswith("#") or len(ln) < 2:
+            continue
+        # Regular expression matching with the data of the pcd header.
+        match = re.match(r"(\w+)\s+([\w\s\.]+)", ln)
+        # no match detected, meaning the header is faulty
+        if not match:
+            warnings.warn(f"can't understand pcd header line: {ln}")
+            continue
+        # header key, and values - all are strings
+        key, value = match.group(1), match.group(2)
+
+        # viewpoint format -  translation (tx ty tz) + quaternion (qw qx qy qz)
+        if key == "VIEWPOINT":
+            metadata[key] = list(map(float, value.split()))
+        # these fields should be converted into int data type - only one entry
+        if key in ["POINTS", "HEIGHT", "WIDTH"]:
+            metadata[key] = int(value)
+        # these fields belong to int, but list of entries
+        if key in ["SIZE", "COUNT"]:
+            metadata[key] = list(map(int, value.split()))
+        # convert to list of strings
+        if key in ["TYPE", "FIELDS"]:
+            metadata[key] = value.split()
+        if key == "DATA":
+            metadata[key] = value.strip()
+
+        # here begins the actual point data
+        if ln.startswith("DATA"):
+            break
+
+    # COUNT is optional in the pcd format and defaults to 1 for every field.
+    if not metadata["COUNT"]:
+        metadata["COUNT"] = [1] * len(metadata["FIELDS"])
+
+    return metadata
+
+
+def _dtype_from_header(metadata: OrderedDict) -> np.dtype:
+    """numpy dtype of one point as described by the FIELDS, SIZE, TYPE and COUNT entries of the header."""
+
+    names, formats, offsets = [], [], []
+    offset = 0
+    for field, size, typ, count in zip(
+        metadata["FIELDS"], metadata["SIZE"], metadata["TYPE"], metadata["COUNT"]
+    ):
+        if field not in PAD_FIELDS:
+            fmt = np.dtype(f"<{_PCD_TYPE_TO_KIND[typ]}{size}")
+            names.append(field)
+            formats.append(fmt if count == 1 else (fmt, (count,)))
+            offsets.append(offset)
+        offset += size * count
+
+    return np.dtype(
+        {"names": names, "formats": formats, "offsets": offsets, "itemsize": offset}
+    )
+
+
+def _dtype_from_type_str(metadata: OrderedDict, type_str: str) -> np.dtype:
+    """numpy dtype of one point from a struct type string, e.g. "<fff4xf".
+
+    Every item of the type string corresponds to one entry of FIELDS. Padding items ("4x") belong to the
+    PAD fields and are kept only as offsets, so the dtype has the exact binary layout of one point.
+    """
+
+    byte_order, items = type_str[0], re.findall(r"(\d*)([a-zA-Z?])", type_str[1:])
+
+    names, formats, offsets = [], [], []
+    offset = 0
+    fields = iter(metadata["FIELDS"])
+    for repeat, char in items:
+        if char == "x":
+            next(fields)
+            offset += int(repeat or 1)
+            continue
+        for _ in range(int(repeat or 1)):
+            fmt = np.dtype(byte_order + char)
+            names.append(next(fields))
+            formats.append(fmt)
+            offsets.append(offset)
+            offset += struct.calcsize(byte_order + char)
+
+    assert offset == struct.calcsize(type_str)
+    return np.dtype(
+        {"names": names, "formats": formats, "offsets": offsets, "itemsize": offset}
+    )
+
+
+def pcd_dtype(metadata: OrderedDict, type_str: str = None) -> np.dtype:
+    """builds the numpy structured dtype of one point of the pcd.
+
+    Args:
+        metadata (OrderedDict): pcd header.
+        type_str (str, optional): struct type string describing one point, including sensor specific padding bytes.
+                    Defaults to None. If None, the dtype is derived from the header.
+
+    Returns:
+        np.dtype: dtype with the binary layout of one point. Padding bytes are not part of the field names.
+    """
+    if type_str is None:
+        np_dtype = _dtype_from_header(metadata)
+    else:
+        np_dtype = _dtype_from_type_str(metadata, type_str)
+
+    # list of byte sizes for each of the pointfields. the binary layout of the header and the dtype must agree.
+    point_size = sum(
+        size * count for size, count in zip(metadata["SIZE"], metadata["COUNT"])
+    )
+    if point_size != np_dtype.itemsize:
+        raise ValueError(
+            f"pcd header describes {point_size} bytes per point, but the dtype has {np_dtype.itemsize} bytes."
+        )
+    return np_dtype
+
+
+def packed_dtype(np_dtype: np.dtype) -> np.dtype:
+    """same fields as `np_dtype`, without padding bytes in between."""
+    return np.dtype([(name, np_dtype.fields[name][0]) for name in np_dtype.names])
+
+
+def _lzf_decompress(data: bytes, expected_size: int) -> bytes:
+    """decompress LZF compressed data (used by the binary_compressed pcd format)."""
+    try:
+        import lzf
+    except ImportError:
+        lzf = None
+
+    if lzf is not None:
+        return lzf.decompress(bytes(data), expected_size)
+
+    out = bytearray()
+    i, n = 0, len(data)
+    while i < n:
+        ctrl = data[i]
+        i += 1
+        if ctrl < 32:
+            # literal run of ctrl + 1 bytes.
+            out += data[i : i + ctrl + 1]
+            i += ctrl + 1
+            continue
+        # back reference.
+        length = ctrl >> 5
+        if length == 7:
+            length += data[i]
+            i += 1
+        ref = len(out) - ((ctrl & 0x1F) << 8) - data[i] - 1
+        i += 1
+        length += 2
+        if ref < 0:
+            raise ValueError("invalid LZF data.")
+        if ref + length <= len(out):
+            out += out[ref : ref + length]
+        else:
+            # overlapping reference, copy byte by byte.
+            for k in range(length):
+                out.append(out[ref + k])
+
+    if len(out) != expected_size:
+        raise ValueError(f"LZF data decompressed to {len(out)} bytes, expected {expected_size}.")
+    return bytes(out)
+
+
+def _decode_ascii(body: bytes, metadata: OrderedDict, np_dtype: np.dtype) -> np.ndarray:
+    num_points = metadata["POINTS"]
+    num_columns = sum(metadata["COUNT"])
+    values = np.array(body.split(), dtype=np.float64)[: num_points * num_columns]
+    values = values.reshape(num_points, num_columns)
+
+    cloud = np.empty(num_points, dtype=packed_dtype(np_dtype))
+    column = 0
+    for field, count in zip(metadata["FIELDS"], metadata["COUNT"]):
+        if field in cloud.dtype.names:
+            cloud[field] = values[:, column] if count == 1 else values[:, column : column + count]
+        column += count
+    return cloud
+
+
+def _decode_binary_compressed(body: bytes, metadata: OrderedDict, np_dtype: np.dtype) -> np.ndarray:
+    num_points = metadata["POINTS"]
+    compressed_size, uncompressed_size = struct.unpack("<II", body[:8])
+    data = _lzf_decompress(body[8 : 8 + compressed_size], uncompressed_size)
+
+    # binary_compressed stores the fields column wise: all values of the first field, then the second, ...
+    cloud = np.empty(num_points, dtype=packed_dtype(np_dtype))
+    start = 0
+    for field, size, count in zip(metadata["FIELDS"], metadata["SIZE"], metadata["COUNT"]):
+        end = start + num_points * size * count
+        if field in cloud.dtype.names:
+            field_dtype = cloud.dtype.fields[field][0]
+            cloud[field] = np.frombuffer(data, dtype=field_dtype, count=num_points, offset=start)
+        start = end
+    return cloud
+
+
+def read_pcd(pcd_path: Union[Path, str], type_str: str = None, mmap: bool = False) -> np.ndarray:
+    """reads the pcd file into a numpy structured array.
+
+    Args:
+        pcd_path (Union[Path, str]): path to pcd file.
+        type_str (str, optional): struct type string of one point. see `pcd_dtype`. Defaults to None.
+        mmap (bool, optional): If True, DATA binary pcds are memory mapped instead of read. Defaults to False.
+
+    Returns:
+        np.ndarray: point cloud. For DATA binary, this is a view of the file content with the binary point
+                    layout (a read-only np.memmap if `mmap` is True), for ascii and binary_compressed, a packed
+                    array without padding bytes.
+    """
+
+    with open(str(pcd_path), "rb") as pcd_file:
+        metadata = read_pcd_header(pcd_file)
+        np_dtype = pcd_dtype(metadata, type_str)
+        data_type = metadata["DATA"]
+
+        if mmap and data_type == "binary":
+            # only the pages of the points which are accessed are read, and they are shared between processes.
+            if metadata["POINTS"] == 0:
+                return np.empty(0, dtype=np_dtype)
+            return np.memmap(
+                pcd_file,
+                dtype=np_dtype,
+                mode="r",
+                offset=pcd_file.tell(),
+                shape=(metadata["POINTS"],),
+            )
+        # actual point data
+        body = pcd_file.read()
+
+    if data_type == "binary":
+        return np.frombuffer(body, dtype=np_dtype, count=metadata["POINTS"])
+    if data_type == "ascii":
+        return _decode_ascii(body, metadata, np_dtype)
+    if data_type == "binary_compressed":
+        return _decode_binary_compressed(body, metadata, np_dtype)
+    raise ValueError(f"unsupported pcd DATA type: {data_type}")
+
+
+def add_index_field(cloud: np.ndarray, index: np.ndarray = None) -> np.recarray:
+    """copies the cloud into a packed record array with an extra "index" field as first column, to keep track of point index.
+
+    Args:
+        cloud (np.ndarray): structured point cloud.
+        index (np.ndarray, optional): index of each point. Defaults to None. If None, points are numbered from 0.
+
+    Returns:
+        np.recarray: [index, *cloud fields]
+    """
+
+    np_dtype = np.dtype(
+        [("index", np.uint32)]
+        + [(name, cloud.dtype.fields[name][0]) for name in cloud.dtype.names]
+    )
+    cloud_np = np.empty(cloud.shape[0], dtype=np_dtype)
+    cloud_np["index"] = np.arange(cloud.shape[0], dtype=np.uint32) if index is None else index
+    for name in cloud.dtype.names:
+        cloud_np[name] = cloud[name]
+
+    return cloud_np.view(np.recarray)
@@ -0,0 +1,133 @@
+#! /usr/bin/env python3
+"""
+Script Name: prefetch.py
+
+Description:
+This script provides parallel prefetching of frames. The requested modalities of the next frames
+(camera image, point clouds, objects) are decoded by a pool of threads or processes while the current
+frame is consumed. The frames are returned in order, and at most `depth` frames are loaded ahead.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+from collections import deque
+from itertools import islice
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Sequence
+from .frame import Frame
+
+# Frame properties which can be prefetched.
+PREFETCH_FIELDS = (
+    "camera_image",
+    "radar_point_cloud",
+    "lidar_point_cloud",
+    "objects",
+    "radar_background_cloud",
+)
+DEFAULT_FIELDS = ("camera_image", "radar_point_cloud", "lidar_point_cloud", "objects")
+
+
+def _load_frame(frame: Frame, fields: Sequence[str], pin: bool = False) -> Frame:
+    """accesses the fields of the frame, so they are decoded (into its modality cache, if it has one).
+
+    If `pin` is True, the decoded fields are always kept in the frame, e.g. to be pickled back from a worker process.
+    """
+    for field in fields:
+        value = getattr(frame, field)
+        if pin:
+            setattr(frame, f"_{field}", value)
+    return frame
+
+
+def _make_executor(backend: str, workers: int) -> Executor:
+    if backend == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    if backend == "process":
+        # multiprocessing is only imported when processes are used.
+        from concurrent.futures import ProcessPoolExecutor
+
+        return ProcessPoolExecutor(max_workers=workers)
+    raise ValueError(f"backend must be thread or process, not {backend}")
+
+
+def map_ordered(
+    func: Callable,
+    args: Iterable[tuple],
+    workers: int = 4,
+    backend: str = "thread",
+    depth: int = None,
+) -> Iterator:
+    """yields func(*a) for each a of `args` in order, computed by a pool of workers, with at most `depth` calls ahead
+    of the consumer. The next arguments are only taken from `args` when a result is yielded.
+
+    Leaving the loop early (break, exception) cancels the calls which are not running yet, and waits for
+    the running ones before the workers are shut down.
+
+    Args:
+        func (Callable): function to call. It must be picklable for the process backend.
+        args (Iterable[tuple]): arguments of the calls.
+        workers (int, optional): number of threads or processes. Defaults to 4.
+        backend (str, optional): "thread" or "process". Defaults to "thread".
+        depth (int, optional): maximum number of calls ahead of the consumer. Defaults to None, which is 2 * workers.
+
+    Yields:
+        results of the calls, in the order of `args`.
+    """
+    assert workers >= 1, f"workers must be at least 1, not {workers}"
+    depth = 2 * workers if depth is None else depth
+    assert depth >= 1, f"depth must be at least 1, not {depth}"
+
+    args = iter(args)
+    executor = _make_executor(backend, workers)
+    pending = deque()
+    try:
+        for call_args in islice(args, depth):
+            pending.append(executor.submit(func, *call_args))
+        while pending:
+            result = pending.popleft().result()
+            # keep the queue full, one new call for each yielded result.
+            for call_args in islice(args, 1):
+                pending.append(executor.submit(func, *call_args))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def prefetch_frames(
+    get_frame: Callable[[int], Frame],
+    indices: Iterable[int],
+    workers: int = 4,
+    backend: str = "thread",
+    fields: Sequence[str] = DEFAULT_FIELDS,
+    depth: int = None,
+) -> Iterator[Frame]:
+    """yields the frames of `indices` in order, with their fields decoded ahead by a pool of workers.
+
+    With the process backend, the frames are pickled to the workers and back together with the decoded fields,
+    which are then kept in the frames even if the scene has a modality cache.
+    Leaving the loop early (break, exception) cancels the frames which are not being loaded yet, and waits for
+    the running ones before the workers are shut down.
+
+    Args:
+        get_frame (Callable[[int], Frame]): creates the frame of an index, e.g. Infra3DRC._get_frame.
+        indices (Iterable[int]): indices of the frames, in the order they are yielded.
+        workers (int, optional): number of threads or processes. Defaults to 4.
+        backend (str, optional): "thread" or "process". Defaults to "thread".
+                    cv2.imread and the pcd decoding mostly release the GIL, so threads are enough in most cases.
+        fields (Sequence[str], optional): Frame properties to decode, see PREFETCH_FIELDS. Defaults to DEFAULT_FIELDS.
+        depth (int, optional): maximum number of frames loaded ahead of the consumer. Defaults to None, which is 2 * workers.
+
+    Yields:
+        Frame: frames with the fields already decoded.
+    """
+    for field in fields:
+        assert field in PREFETCH_FIELDS, f"{field} can not be prefetched, must be one of {PREFETCH_FIELDS}"
+    fields = tuple(fields)
+    pin = backend == "process"
+    # the frames are created lazily, when their call is submitted.
+    return map_ordered(_load_frame, ((get_frame(idx), fields, pin) for idx in indices), workers, backend, depth)
@@ -0,0 +1,280 @@
+#! /usr/bin/env python3
+"""
+Script Name: rasterize.py
+
+Description:
+This script converts radar and lidar point clouds into model-ready arrays: sparse voxels with the padded points of
+each voxel (Voxelizer), and dense bird's-eye-view grids with per-cell aggregate features (BEVRasterizer).
+Both work on the structured point clouds of Frame, optionally transformed to the ground frame with the calibration,
+and process a batch of clouds in one call, all the points of the batch are binned at once.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+from dataclasses import dataclass
+from typing import Sequence, Tuple, Union
+import numpy as np
+from .utils import Calibration
+from .frame import RADAR_MAX_X
+
+# ((x_min, x_max), (y_min, y_max), (z_min, z_max)) in meters, x up to the clipping range of the radar clouds.
+POINT_RANGE = ((0.0, RADAR_MAX_X), (-60.0, 60.0), (-10.0, 10.0))
+# default point features of the voxels, per sensor.
+VOXEL_FIELDS = {
+    "radar": ("x", "y", "z", "rcs", "range_rate"),
+    "lidar": ("x", "y", "z", "intensity", "reflectivity"),
+}
+# default features of the BEV cells, per sensor. "count", or "<mean|max|min>_<field of the cloud>".
+BEV_FEATURES = {
+    "radar": ("count", "max_z", "mean_rcs", "mean_range_rate"),
+    "lidar": ("count", "max_z", "mean_reflectivity"),
+}
+
+Clouds = Union[np.ndarray, Sequence[np.ndarray]]
+
+
+@dataclass
+class Voxels:
+    """non-empty voxels of a batch of point clouds.
+
+    The points of voxel i are voxels[i, :num_points[i]], the rest is zero padding.
+    coords[i] is [batch index, z, y, x] index of voxel i in the grid of shape `grid_shape` (z, y, x).
+    """
+
+    voxels: np.ndarray  # (num_voxels, max_points, num_fields) float32
+    num_points: np.ndarray  # (num_voxels,) int32
+    coords: np.ndarray  # (num_voxels, 4) int32
+    grid_shape: Tuple[int, int, int]
+    fields: Tuple[str, ...]
+
+
+def _grid_shape(point_range, voxel_size) -> np.ndarray:
+    """(nx, ny, nz) number of voxels along x, y, z."""
+    extent = np.array([upper - lower for lower, upper in point_range], dtype=np.float64)
+    return np.round(extent / np.asarray(voxel_size, dtype=np.float64)).astype(np.int64)
+
+
+class _PointBinner:
+    def __init__(
+        self,
+        point_range=POINT_RANGE,
+        voxel_size: Union[float, Sequence[float]] = 0.5,
+        ground: bool = False,
+    ) -> None:
+        self.point_range = tuple(tuple(float(bound) for bound in axis_range) for axis_range in point_range)
+        self.voxel_size = np.broadcast_to(np.asarray(voxel_size, dtype=np.float64), (3,)).copy()
+        self.ground = ground
+        self.shape = _grid_shape(self.point_range, self.voxel_size)
+        assert np.all(self.shape > 0), f"empty grid for point range {point_range} and voxel size {voxel_size}"
+
+    def _bin(self, clouds: Clouds, sensor: str, calibration: Calibration):
+        """x, y, z (in the ground frame if `ground`) of the points within the point range, the cloud of each of them,
+        their x, y, z voxel index, the clouds and the mask of the points within the point range."""
+        assert sensor.lower() in ["radar", "lidar"]
+        if isinstance(clouds, np.ndarray):
+            clouds = [clouds]
+        assert len(clouds) > 0, "no point clouds given."
+        batch = np.repeat(np.arange(len(clouds), dtype=np.int64), [cloud.shape[0] for cloud in clouds])
+
+        # only the used fields of the clouds are copied, not the whole records. each axis is binned as contiguous array.
+        xyz = [self._concat_field(clouds, name).astype(np.float32) for name in ("x", "y", "z")]
+        if self.ground:
+            assert calibration is not None, "the calibration is needed to rasterize in the ground frame."
+            ground_xyz = calibration.transform_points(np.stack(xyz, axis=-1), sensor.lower(), "ground")
+            xyz = [np.ascontiguousarray(ground_xyz[:, axis]) for axis in range(3)]
+
+        cells = []
+        inside = np.ones(batch.shape[0], dtype=bool)
+        for axis in range(3):
+            axis_cells = np.floor(
+                (xyz[axis] - np.float32(self.point_range[axis][0])) / np.float32(self.voxel_size[axis])
+            ).astype(np.int64)
+            inside &= (axis_cells >= 0) & (axis_cells < self.shape[axis])
+            cells.append(axis_cells)
+        return [values[inside] for values in xyz], batch[inside], [axis_cells[inside] for axis_cells in cells], clouds, inside
+
+    @staticmethod
+    def _concat_field(clouds: Sequence[np.ndarray], field: str) -> np.ndarray:
+        for cloud in clouds:
+            assert field in cloud.dtype.names, f"the cloud has no field {field}, fields: {cloud.dtype.names}"
+        return np.concatenate([cloud[field] for cloud in clouds]) if len(clouds) != 1 else clouds[0][field]
+
+    def _values(self, field: str, xyz: Sequence[np.ndarray], clouds: Sequence[np.ndarray], inside: np.ndarray) -> np.ndarray:
+        """values of a field for the points within the point range. x, y and z are taken from the (transformed) positions."""
+        if field in ("x", "y", "z"):
+            return xyz["xyz".index(field)]
+        return self._concat_field(clouds, field)[inside]
+
+
+class Voxelizer(_PointBinner):
+    def __init__(
+        self,
+        point_range=POINT_RANGE,
+        voxel_size: Union[float, Sequence[float]] = 0.5,
+        max_points: int = 32,
+        max_voxels: int = 20000,
+        fields: Sequence[str] = None,
+        ground: bool = False,
+    ) -> None:
+        """groups the points of point clouds by voxel.
+
+        Args:
+            point_range (optional): ((x_min, x_max), (y_min, y_max), (z_min, z_max)) in meters. Defaults to POINT_RANGE.
+            voxel_size (Union[float, Sequence[float]], optional): edge length, or (x, y, z) edge lengths of the voxels. Defaults to 0.5.
+            max_points (int, optional): points kept per voxel, further points are dropped. Defaults to 32.
+            max_voxels (int, optional): voxels kept per cloud, in order of the voxel coordinates. Defaults to 20000.
+            fields (Sequence[str], optional): point features of the voxels. Defaults to None, in which case
+                        VOXEL_FIELDS of the sensor are used.
+            ground (bool, optional): If True, the points are voxelized in the ground frame. Defaults to False.
+        """
+        super().__init__(point_range, voxel_size, ground)
+        self.max_points = max_points
+        self.max_voxels = max_voxels
+        self.fields = None if fields is None else tuple(fields)
+
+    def __call__(self, clouds: Clouds, sensor: str = "radar", calibration: Calibration = None) -> Voxels:
+        """voxelizes one point cloud, or a batch of point clouds.
+
+        Args:
+            clouds (Clouds): point cloud of Frame, e.g. frame.radar_point_cloud, or a sequence of them.
+            sensor (str, optional): radar or lidar. Defaults to "radar".
+            calibration (Calibration, optional): calibration of the scene, needed if `ground` is True. Defaults to None.
+
+        Returns:
+            Voxels: voxels of all the clouds, the first column of coords is the position of the cloud in the batch.
+        """
+        fields = self.fields if self.fields is not None else VOXEL_FIELDS[sensor.lower()]
+        xyz, batch, cells, cloud_list, inside = self._bin(clouds, sensor, calibration)
+        nx, ny, nz = self.shape
+        keys = ((batch * nz + cells[2]) * ny + cells[1]) * nx + cells[0]
+
+        # points sorted by voxel, each voxel is a contiguous range.
+        order = np.argsort(keys, kind="stable")
+        voxel_keys, voxel_starts, voxel_counts = np.unique(keys[order], return_index=True, return_counts=True)
+
+        # the first max_voxels voxels of each cloud, and the first max_points points of each voxel are kept.
+        voxel_batch = voxel_keys // (nz * ny * nx)
+        voxel_rank = np.arange(voxel_keys.shape[0]) - np.searchsorted(voxel_batch, voxel_batch)
+        keep_voxel = voxel_rank < self.max_voxels
+        point_voxel = np.repeat(np.arange(voxel_keys.shape[0]), voxel_counts)
+        point_slot = np.arange(order.shape[0]) - voxel_starts[point_voxel]
+        keep_point = keep_voxel[point_voxel] & (point_slot < self.max_points)
+        new_voxel_ids = np.cumsum(keep_voxel) - 1
+
+        features = np.stack([self._values(field, xyz, cloud_list, inside) for field in fields], axis=-1).astype(np.float32)
+        voxels = np.zeros((int(keep_voxel.sum()), self.max_points, len(fields)), dtype=np.float32)
+        voxels[new_voxel_ids[point_voxel[keep_point]], point_slot[keep_point]] = features[order[keep_point]]
+
+        voxel_keys = voxel_keys[keep_voxel]
+        coords = np.stack(
+            [
+                voxel_batch[keep_voxel],
+                voxel_keys // (ny * nx) % nz,
+                voxel_keys // nx % ny,
+                voxel_keys % nx,
+            ],
+            axis=-1,
+        ).astype(np.int32)
+        return Voxels(
+            voxels=voxels,
+            num_points=np.minimum(voxel_counts[keep_voxel], self.max_points).astype(np.int32),
+            coords=coords,
+            grid_shape=(int(nz), int(ny), int(nx)),
+            fields=tuple(fields),
+        )
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"point_range={self.point_range}, "
+        s += f"voxel_size={self.voxel_size.tolist()}, "
+        s += f"max_points={self.max_points}, "
+        s += f"max_voxels={self.max_voxels}, "
+        s += f"ground={self.ground})"
+        return s
+
+    __repr__ = __str__
+
+
+class BEVRasterizer(_PointBinner):
+    def __init__(
+        self,
+        point_range=POINT_RANGE,
+        resolution: float = 0.5,
+        features: Sequence[str] = None,
+        ground: bool = False,
+    ) -> None:
+        """rasterizes point clouds into bird's-eye-view grids.
+
+        Args:
+            point_range (optional): ((x_min, x_max), (y_min, y_max), (z_min, z_max)) in meters, points outside are dropped.
+                        Defaults to POINT_RANGE.
+            resolution (float, optional): edge length of the grid cells in meters. Defaults to 0.5.
+            features (Sequence[str], optional): features of the cells, "count" or "<mean|max|min>_<field>",
+                        e.g. "max_z" or "mean_range_rate". Defaults to None, in which case BEV_FEATURES of the sensor are used.
+            ground (bool, optional): If True, the points are rasterized in the ground frame. Defaults to False.
+        """
+        z_range = point_range[2]
+        # all the points in the z range fall into one voxel along z.
+        super().__init__(point_range, (resolution, resolution, z_range[1] - z_range[0]), ground)
+        self.resolution = resolution
+        self.features = None if features is None else tuple(features)
+        for feature in self.features or ():
+            assert feature == "count" or feature.split("_")[0] in ("mean", "max", "min"), f"unknown feature: {feature}"
+
+    def __call__(self, clouds: Clouds, sensor: str = "radar", calibration: Calibration = None) -> np.ndarray:
+        """rasterizes one point cloud, or a batch of point clouds.
+
+        Args:
+            clouds (Clouds): point cloud of Frame, e.g. frame.radar_point_cloud, or a sequence of them.
+            sensor (str, optional): radar or lidar. Defaults to "radar".
+            calibration (Calibration, optional): calibration of the scene, needed if `ground` is True. Defaults to None.
+
+        Returns:
+            np.ndarray: float32 (features, ny, nx) grid of a single cloud, or (clouds, features, ny, nx) grids of a sequence.
+                        Row i and column j is the cell of y in [y_min + i * resolution, ...) and x in [x_min + j * resolution, ...).
+                        Empty cells are 0.
+        """
+        features = self.features if self.features is not None else BEV_FEATURES[sensor.lower()]
+        xyz, batch, cells, cloud_list, inside = self._bin(clouds, sensor, calibration)
+        num_clouds = 1 if isinstance(clouds, np.ndarray) else len(clouds)
+        nx, ny, _ = self.shape
+        num_cells = num_clouds * ny * nx
+        cell = (batch * ny + cells[1]) * nx + cells[0]
+
+        # features are aggregated over the occupied cells only, and then written into the zero grids.
+        count = np.bincount(cell, minlength=num_cells)
+        occupied = np.flatnonzero(count)
+        occupied_count = count[occupied]
+        occupied_cell = np.searchsorted(occupied, cell)
+        # (clouds, features, ny * nx) grids, the occupied cells are split into cloud and cell of the cloud.
+        grids = np.zeros((num_clouds, len(features), ny * nx), dtype=np.float32)
+        occupied_cloud, occupied_cloud_cell = np.divmod(occupied, ny * nx)
+        for channel, feature in enumerate(features):
+            if feature == "count":
+                grids[occupied_cloud, channel, occupied_cloud_cell] = occupied_count
+                continue
+            aggregate, field = feature.split("_", 1)
+            values = self._values(field, xyz, cloud_list, inside).astype(np.float64)
+            if aggregate == "mean":
+                sums = np.bincount(occupied_cell, weights=values, minlength=occupied.shape[0])
+                grids[occupied_cloud, channel, occupied_cloud_cell] = sums / occupied_count
+            else:
+                reduced = np.full(occupied.shape[0], -np.inf if aggregate == "max" else np.inf)
+                getattr(np, "maximum" if aggregate == "max" else "minimum").at(reduced, occupied_cell, values)
+                grids[occupied_cloud, channel, occupied_cloud_cell] = reduced
+
+        grids = grids.reshape(num_clouds, len(features), ny, nx)
+        return grids[0] if isinstance(clouds, np.ndarray) else grids
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"point_range={self.point_range}, "
+        s += f"resolution={self.resolution}, "
+        s += f"features={self.features}, "
+        s += f"ground={self.ground})"
+        return s
+
+    __repr__ = __str__
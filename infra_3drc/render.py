@@ -0,0 +1,94 @@
+#! /usr/bin/env python3
+"""
+Script Name: render.py
+
+Description:
+This script provides vectorized drawing of projected point clouds on camera images.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+from typing import Union
+import numpy as np
+
+
+def _disk_offsets(radius: int):
+    """(dy, dx) pixel offsets of a filled disk, same pixels as cv2.circle(..., radius, color, -1)."""
+    d = np.arange(-radius, radius + 1)
+    dy, dx = np.meshgrid(d, d, indexing="ij")
+    inside = dy**2 + dx**2 <= radius**2
+    return dy[inside], dx[inside]
+
+
+def draw_points(
+    image: np.ndarray,
+    u: np.ndarray,
+    v: np.ndarray,
+    colors: np.ndarray,
+    radius: Union[int, np.ndarray],
+) -> np.ndarray:
+    """draws filled circles for all the points at once. The image is modified in place.
+
+    The points are drawn in the given order, so later points are drawn over earlier ones.
+
+    Args:
+        image (np.ndarray): (rows, cols, channels) image.
+        u (np.ndarray): (n,) column pixel position of each point. Positions are truncated to int.
+        v (np.ndarray): (n,) row pixel position of each point. Positions are truncated to int.
+        colors (np.ndarray): (n, channels) or (channels,) color of the points.
+        radius (Union[int, np.ndarray]): radius of all the points, or (n,) radius of each point.
+
+    Returns:
+        np.ndarray: image with the points drawn on it.
+    """
+    assert image.flags.c_contiguous, "image must be C contiguous to be drawn on in place."
+    rows, cols = image.shape[:2]
+    radius = np.broadcast_to(np.asarray(radius, dtype=np.int64), np.shape(u))
+    colors = np.broadcast_to(np.asarray(colors, dtype=image.dtype), (len(u), image.shape[2]))
+
+    # points which can not touch the image are skipped.
+    max_radius = int(radius.max(initial=0))
+    visible = (
+        np.isfinite(u)
+        & np.isfinite(v)
+        & (u > -max_radius - 1)
+        & (v > -max_radius - 1)
+        & (u < cols + max_radius)
+        & (v < rows + max_radius)
+    )
+    if not visible.any():
+        return image
+    u = u[visible].astype(np.int64)
+    v = v[visible].astype(np.int64)
+    radius = radius[visible]
+    colors = colors[visible]
+
+    # offsets of the largest disk, and for each point, which of them belong to its own disk.
+    dy, dx = _disk_offsets(max_radius)
+    in_disk = (dy**2 + dx**2)[None, :] <= (radius**2)[:, None]  # (n, k)
+
+    # (n, k) pixel positions, row major, so the drawing order of the points is kept.
+    pixel_v = v[:, None] + dy[None, :]
+    pixel_u = u[:, None] + dx[None, :]
+    mask = in_disk & (pixel_u >= 0) & (pixel_v >= 0) & (pixel_u < cols) & (pixel_v < rows)
+    point_idx = np.broadcast_to(np.arange(len(u), dtype=np.int32)[:, None], mask.shape)[mask]
+    pixels = (pixel_v * cols + pixel_u)[mask]
+
+    # where points overlap, the last drawn point wins. numpy does not guarantee the order of repeated
+    # assignments, so the winning point of each pixel is found first. The last occurrence of a pixel is its first
+    # one in reversed order, and np.unique sorts stably with return_index. Only the touched pixels are sorted,
+    # no buffer of the image size is needed.
+    pixels, last = np.unique(pixels[::-1], return_index=True)
+    point_idx = point_idx[::-1][last]
+
+    # channel wise assignment into the flat image is much faster than assigning (m, channels) rows.
+    channels = image.shape[2]
+    flat_image = image.reshape(-1)
+    pixels *= channels
+    point_colors = colors[point_idx]
+    for channel in range(channels):
+        flat_image[pixels + channel] = point_colors[:, channel]
+    return image
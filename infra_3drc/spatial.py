@@ -0,0 +1,203 @@
+#! /usr/bin/env python3
+"""
+Script Name: spatial.py
+
+Description:
+This script provides a voxel hash over the points of a point cloud for vectorized neighborhood queries,
+e.g. gathering the lidar points around each radar point or object. The points are sorted by voxel, so the points
+of a voxel are one contiguous range, and the voxels are found by binary search over the sorted voxel keys.
+Radius queries return the neighbors of all the query points as one flat array with offsets, and kNN queries
+return (queries, k) arrays.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+from typing import Tuple
+import numpy as np
+
+# default edge length of the voxels in meters, per sensor. radar clouds are much sparser than lidar clouds.
+DEFAULT_VOXEL_SIZES = {"lidar": 0.5, "radar": 2.0}
+
+
+def cloud_xyz(cloud: np.ndarray) -> np.ndarray:
+    """(n, 3) float64 x, y, z of a structured point cloud."""
+    return np.stack([cloud["x"], cloud["y"], cloud["z"]], axis=-1).astype(np.float64)
+
+
+def _expand_ranges(starts: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """all the indices of the ranges [start, start + count), and the position of the range of each index."""
+    owner = np.repeat(np.arange(counts.shape[0]), counts)
+    range_offsets = np.cumsum(counts) - counts
+    return np.arange(owner.shape[0]) - range_offsets[owner] + starts[owner], owner
+
+
+class VoxelIndex:
+    def __init__(self, points: np.ndarray, voxel_size: float) -> None:
+        """voxel hash over (n, 3) points.
+
+        Args:
+            points (np.ndarray): (n, 3) x, y, z of the points, see `cloud_xyz`.
+            voxel_size (float): edge length of the voxels. Queries are fastest when the radius is about the voxel size.
+        """
+        assert voxel_size > 0, f"voxel size must be positive, not {voxel_size}"
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.voxel_size = float(voxel_size)
+        self.num_points = points.shape[0]
+        self.origin = points.min(axis=0) if self.num_points else np.zeros(3)
+        upper = points.max(axis=0) if self.num_points else np.zeros(3)
+
+        # voxel coordinates are linearized into int64 keys. one voxel of margin on each side, so that the neighbor
+        # voxels of the queries never wrap into another row.
+        cells = self._cells(points)
+        self._shape = np.floor((upper - self.origin) / self.voxel_size).astype(np.int64) + 3
+        keys = self._keys(cells)
+
+        # points sorted by voxel. `order` maps back to the index in the cloud.
+        self.order = np.argsort(keys, kind="stable")
+        self.points = points[self.order]
+        self.voxel_keys, self.voxel_starts, self.voxel_counts = np.unique(
+            keys[self.order], return_index=True, return_counts=True
+        )
+        self._upper = upper
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        """integer voxel coordinates of the points, shifted by the margin voxel."""
+        return np.floor((points - self.origin) / self.voxel_size).astype(np.int64) + 1
+
+    def _keys(self, cells: np.ndarray) -> np.ndarray:
+        return (cells[..., 0] * self._shape[1] + cells[..., 1]) * self._shape[2] + cells[..., 2]
+
+    def _candidates(self, queries: np.ndarray, reach: int) -> Tuple[np.ndarray, np.ndarray]:
+        """indices into `points` of the points in the voxels within `reach` voxels of each query, and the query of each of them."""
+        d = np.arange(-reach, reach + 1)
+        neighbor_offsets = np.stack(np.meshgrid(d, d, d, indexing="ij"), axis=-1).reshape(-1, 3)
+        # voxels outside the grid do not exist, they are clipped to the margin voxels, which are always empty.
+        cells = np.clip(self._cells(queries)[:, None, :] + neighbor_offsets, 0, self._shape - 1)
+        keys = self._keys(cells).ravel()
+
+        slots = np.searchsorted(self.voxel_keys, keys)
+        slots = np.minimum(slots, max(self.voxel_keys.shape[0] - 1, 0))
+        found = self.voxel_keys[slots] == keys if self.voxel_keys.shape[0] else np.zeros(keys.shape, dtype=bool)
+        voxel_query = np.repeat(np.arange(queries.shape[0]), neighbor_offsets.shape[0])[found]
+        candidates, owner = _expand_ranges(self.voxel_starts[slots[found]], self.voxel_counts[slots[found]])
+        return candidates, voxel_query[owner]
+
+    def query_radius(
+        self, queries: np.ndarray, radius: float, chunk_size: int = 4096
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """points within `radius` of each query point.
+
+        Args:
+            queries (np.ndarray): (m, 3) query points.
+            radius (float): search radius.
+            chunk_size (int, optional): number of queries processed at once for a radius of one voxel, bounds the memory.
+                        Defaults to 4096.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: indices into the indexed cloud, distances, and (m + 1,) offsets.
+                        The neighbors of query i are indices[offsets[i]:offsets[i + 1]], sorted by distance.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        reach = int(np.ceil(radius / self.voxel_size))
+        # chunk_size is the number of queries for a radius of one voxel, fewer queries are processed at once for larger radii.
+        chunk_size = max(1, chunk_size * 27 // (2 * reach + 1) ** 3)
+        all_indices, all_distances, counts = [], [], []
+        for start in range(0, queries.shape[0], chunk_size):
+            chunk = queries[start : start + chunk_size]
+            candidates, query = self._candidates(chunk, reach)
+            distances = np.sqrt(((self.points[candidates] - chunk[query]) ** 2).sum(axis=1))
+            inside = distances <= radius
+            candidates, query, distances = candidates[inside], query[inside], distances[inside]
+            # grouped by query, nearest first.
+            order = np.lexsort((distances, query))
+            all_indices.append(self.order[candidates[order]])
+            all_distances.append(distances[order])
+            counts.append(np.bincount(query, minlength=chunk.shape[0]))
+
+        offsets = np.zeros(queries.shape[0] + 1, dtype=np.int64)
+        if counts:
+            np.cumsum(np.concatenate(counts), out=offsets[1:])
+        return (
+            np.concatenate(all_indices) if all_indices else np.empty(0, dtype=np.int64),
+            np.concatenate(all_distances) if all_distances else np.empty(0),
+            offsets,
+        )
+
+    def query_knn(self, queries: np.ndarray, k: int, chunk_size: int = 4096) -> Tuple[np.ndarray, np.ndarray]:
+        """k nearest points of each query point.
+
+        The search radius starts at one voxel and is doubled for the queries with less than k neighbors, until all the
+        points are in reach. Queries far away from the cloud fall back to brute force.
+
+        Args:
+            queries (np.ndarray): (m, 3) query points.
+            k (int): number of neighbors.
+            chunk_size (int, optional): number of queries processed at once. Defaults to 4096.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (m, k) indices into the indexed cloud and distances, nearest first.
+                        If the cloud has less than k points, the missing neighbors have index -1 and distance inf.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        indices = np.full((queries.shape[0], k), -1, dtype=np.int64)
+        distances = np.full((queries.shape[0], k), np.inf)
+        if self.num_points == 0 or k == 0:
+            return indices, distances
+
+        # beyond this radius, all the points are neighbors of the query.
+        max_radius = np.sqrt(
+            (np.maximum(np.abs(queries - self.origin), np.abs(queries - self._upper)) ** 2).sum(axis=1)
+        )
+        pending = np.arange(queries.shape[0])
+        radius = self.voxel_size
+        while pending.shape[0]:
+            # looking up a voxel costs about as much as the distances to several points, so brute force is cheaper
+            # once the search cube has more than num_points / 8 voxels.
+            if 8 * (2 * np.ceil(radius / self.voxel_size) + 1) ** 3 > self.num_points:
+                self._knn_brute_force(queries, pending, k, indices, distances, chunk_size)
+                break
+            found, found_distances, offsets = self.query_radius(queries[pending], radius, chunk_size)
+            counts = np.diff(offsets)
+            done = (counts >= min(k, self.num_points)) | (max_radius[pending] <= radius)
+            rows = np.flatnonzero(done)
+            found_positions, owner = _expand_ranges(offsets[rows], np.minimum(counts[rows], k))
+            columns = found_positions - offsets[rows][owner]
+            indices[pending[rows][owner], columns] = found[found_positions]
+            distances[pending[rows][owner], columns] = found_distances[found_positions]
+            pending = pending[~done]
+            radius *= 2
+        return indices, distances
+
+    def _knn_brute_force(
+        self, queries: np.ndarray, pending: np.ndarray, k: int, indices: np.ndarray, distances: np.ndarray, chunk_size: int
+    ) -> None:
+        """k nearest points of the pending queries, by distances to all the points."""
+        num = min(k, self.num_points)
+        squared_norms = (self.points**2).sum(axis=1)
+        # chunks of about chunk_size * 256 distances.
+        rows = max(1, chunk_size * 256 // self.num_points)
+        for start in range(0, pending.shape[0], rows):
+            chunk = queries[pending[start : start + rows]]
+            # |q - p|^2 = |q|^2 + |p|^2 - 2 q.p, one matrix product for all the pairs.
+            squared_distances = (chunk**2).sum(axis=1)[:, None] + squared_norms[None, :] - 2 * chunk @ self.points.T
+            nearest = np.argpartition(squared_distances, num - 1, axis=1)[:, :num]
+            # the distances of the k nearest points are computed again exactly.
+            nearest_distances = np.sqrt(((self.points[nearest] - chunk[:, None, :]) ** 2).sum(axis=2))
+            order = np.argsort(nearest_distances, axis=1, kind="stable")
+            indices[pending[start : start + rows], :num] = self.order[np.take_along_axis(nearest, order, axis=1)]
+            distances[pending[start : start + rows], :num] = np.take_along_axis(nearest_distances, order, axis=1)
+
+    def __len__(self):
+        return self.num_points
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"num_points={self.num_points}, "
+        s += f"num_voxels={self.voxel_keys.shape[0]}, "
+        s += f"voxel_size={self.voxel_size})"
+        return s
+
+    __repr__ = __str__
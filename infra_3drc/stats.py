@@ -0,0 +1,277 @@
+#! /usr/bin/env python3
+"""
+Script Name: stats.py
+
+Description:
+This script computes the statistics of the annotations of the dataset: number of frames, camera and radar instances
+and labeled radar points per category, histograms of the points per object, of the range, rcs and range rate of
+the labeled points and of the bounding box sizes, and the mean bounding box size per category.
+The statistics of each scene are computed from its DetectionTable by a pool of workers, and stored in a json file
+together with the modification times of the scene files, like the manifest of Infra3DRCDataset. Only the scenes which
+are new or were modified since are computed again. The statistics of several scenes are added up, as all the
+histograms have the same bins.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+import json
+import os
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Union
+import numpy as np
+from .class_names import INFRA_ID_TO_CLASS
+from .prefetch import map_ordered
+from .dataset import Infra3DRCDataset, _scene_signature
+from .Infra3DRC import Infra3DRC
+
+# file name of the statistics, stored in the dataset root by default.
+STATS_NAME = "infra_3drc_stats.json"
+# increased whenever the statistics or the bins change.
+STATS_VERSION = 3
+# edges of the histograms. values outside the edges are counted in the first or last bin.
+STATS_BINS = {
+    # radar points per camera object, 0 for objects without radar points.
+    "num_points": np.array([0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 100], dtype=np.float64),
+    # of the labeled radar points, in m, dBsm and m/s.
+    "range": np.arange(0.0, 205.0, 5.0),
+    "rcs": np.arange(-40.0, 42.0, 2.0),
+    "range_rate": np.arange(-30.0, 31.0, 1.0),
+    # of the camera bounding boxes, in pixels.
+    "bbox_width": np.arange(0.0, 1952.0, 32.0),
+    "bbox_height": np.arange(0.0, 1248.0, 32.0),
+}
+
+
+def _histogram(values: np.ndarray, name: str) -> np.ndarray:
+    edges = STATS_BINS[name]
+    return np.histogram(np.clip(values, edges[0], edges[-1]), edges)[0]
+
+
+@dataclass
+class AnnotationStats:
+    """statistics of the annotations of one or several scenes.
+
+    The per category arrays are indexed by category id, see INFRA_ID_TO_CLASS. Radar objects are the camera objects
+    with at least one labeled radar point. histograms holds the counts of the bins in STATS_BINS.
+    """
+
+    scene_numbers: List[int] = field(default_factory=list)
+    num_frames: int = 0
+    category_objects: np.ndarray = field(default_factory=lambda: np.zeros(len(INFRA_ID_TO_CLASS), dtype=np.int64))
+    category_radar_objects: np.ndarray = field(default_factory=lambda: np.zeros(len(INFRA_ID_TO_CLASS), dtype=np.int64))
+    category_points: np.ndarray = field(default_factory=lambda: np.zeros(len(INFRA_ID_TO_CLASS), dtype=np.int64))
+    # (categories, 2) sum of the width and height of the bounding boxes.
+    category_bbox_size: np.ndarray = field(default_factory=lambda: np.zeros((len(INFRA_ID_TO_CLASS), 2), dtype=np.float64))
+    histograms: Dict[str, np.ndarray] = field(
+        default_factory=lambda: {name: np.zeros(len(edges) - 1, dtype=np.int64) for name, edges in STATS_BINS.items()}
+    )
+
+    COUNTS = ("category_objects", "category_radar_objects", "category_points", "category_bbox_size")
+
+    @classmethod
+    def from_scene(cls, scene) -> "AnnotationStats":
+        """statistics of a scene, from its DetectionTable (read from the scene cache if it has one).
+
+        Args:
+            scene (Infra3DRC): the scene.
+
+        Returns:
+            AnnotationStats
+        """
+        table = scene.detections
+        num_categories = len(INFRA_ID_TO_CLASS)
+        num_points = table.num_points
+        bbox_size = table.bbox[:, 2:].astype(np.float64)
+        return cls(
+            scene_numbers=[scene.scene_number],
+            num_frames=len(scene),
+            category_objects=np.bincount(table.category_id, minlength=num_categories),
+            category_radar_objects=np.bincount(table.category_id[num_points > 0], minlength=num_categories),
+            category_points=np.bincount(table.category_id, weights=num_points, minlength=num_categories).astype(np.int64),
+            category_bbox_size=np.stack(
+                [np.bincount(table.category_id, weights=bbox_size[:, axis], minlength=num_categories) for axis in range(2)],
+                axis=-1,
+            ),
+            histograms={
+                "num_points": _histogram(num_points, "num_points"),
+                "range": _histogram(table.points["range"], "range"),
+                "rcs": _histogram(table.points["rcs"], "rcs"),
+                "range_rate": _histogram(table.points["range_rate"], "range_rate"),
+                "bbox_width": _histogram(bbox_size[:, 0], "bbox_width"),
+                "bbox_height": _histogram(bbox_size[:, 1], "bbox_height"),
+            },
+        )
+
+    @classmethod
+    def merge(cls, stats: Iterable["AnnotationStats"]) -> "AnnotationStats":
+        """statistics of several scenes, the sum of their statistics."""
+        merged = cls()
+        for scene_stats in stats:
+            merged.scene_numbers = sorted(merged.scene_numbers + scene_stats.scene_numbers)
+            merged.num_frames += scene_stats.num_frames
+            for name in cls.COUNTS:
+                setattr(merged, name, getattr(merged, name) + getattr(scene_stats, name))
+            merged.histograms = {name: merged.histograms[name] + scene_stats.histograms[name] for name in STATS_BINS}
+        return merged
+
+    def to_dict(self) -> dict:
+        """json serializable statistics."""
+        d = {"scene_numbers": self.scene_numbers, "num_frames": self.num_frames}
+        d.update({name: getattr(self, name).tolist() for name in self.COUNTS})
+        d["histograms"] = {name: counts.tolist() for name, counts in self.histograms.items()}
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "AnnotationStats":
+        return cls(
+            scene_numbers=d["scene_numbers"],
+            num_frames=d["num_frames"],
+            histograms={name: np.array(counts, dtype=np.int64) for name, counts in d["histograms"].items()},
+            **{name: np.array(d[name], dtype=np.float64 if name == "category_bbox_size" else np.int64) for name in cls.COUNTS},
+        )
+
+    @property
+    def num_objects(self) -> int:
+        """number of camera instances."""
+        return int(self.category_objects.sum())
+
+    @property
+    def num_radar_objects(self) -> int:
+        """number of radar instances, the objects with at least one labeled radar point."""
+        return int(self.category_radar_objects.sum())
+
+    @property
+    def num_points(self) -> int:
+        """number of labeled radar points."""
+        return int(self.category_points.sum())
+
+    @property
+    def category_counts(self) -> Dict[str, int]:
+        """number of camera instances of each category with at least one instance, by class name."""
+        return {
+            INFRA_ID_TO_CLASS[str(category_id)]["name"]: int(count)
+            for category_id, count in enumerate(self.category_objects)
+            if count > 0
+        }
+
+    @property
+    def mean_points_per_object(self) -> np.ndarray:
+        """mean number of radar points of the radar objects of each category, nan for categories without radar objects."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.category_points / self.category_radar_objects
+
+    @property
+    def mean_bbox_size(self) -> np.ndarray:
+        """(categories, 2) mean width and height of the bounding boxes of each category, nan for categories without objects."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.category_bbox_size / self.category_objects[:, None]
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"num_scenes={len(self.scene_numbers)}, "
+        s += f"num_frames={self.num_frames}, "
+        s += f"num_objects={self.num_objects}, "
+        s += f"num_radar_objects={self.num_radar_objects}, "
+        s += f"num_points={self.num_points}, "
+        s += f"categories={self.category_counts})"
+        return s
+
+    __repr__ = __str__
+
+
+class DatasetStats:
+    def __init__(
+        self,
+        dataset: Infra3DRCDataset,
+        stats_path: Union[Path, str] = None,
+        rebuild: bool = False,
+        workers: int = 4,
+        backend: str = "process",
+    ) -> None:
+        """statistics of each scene of the dataset, and of the whole dataset.
+
+        The statistics are read from `stats_path` if it exists. Scenes which are new, or whose frame files
+        (including in-place edits), scene.json or calibration.json were modified since the statistics were written,
+        are read again from the scene directory and computed by a pool of workers, one scene each, and the file is updated.
+
+        Args:
+            dataset (Infra3DRCDataset): the dataset.
+            stats_path (Union[Path, str], optional): path of the json file. Defaults to None, which is STATS_NAME in the dataset root.
+            rebuild (bool, optional): If True, the statistics of all the scenes are computed again. Defaults to False.
+            workers (int, optional): number of worker processes (or threads). Defaults to 4.
+            backend (str, optional): "process" or "thread". Defaults to "process".
+        """
+        self.stats_path = Path(stats_path) if stats_path is not None else dataset.dataset_root.joinpath(STATS_NAME)
+        self.scenes: Dict[int, AnnotationStats] = {}
+        # number of scenes computed by this constructor, the others were read from the file.
+        self.num_computed = 0
+
+        stored = {"version": STATS_VERSION, "scenes": {}}
+        if not rebuild and self.stats_path.is_file():
+            with open(str(self.stats_path), "r") as f:
+                stored_stats = json.load(f)
+            if stored_stats.get("version") == STATS_VERSION:
+                stored = stored_stats
+
+        entries, outdated = {}, []
+        for scene_number in dataset.scene_numbers:
+            scene = dataset.scene(scene_number)
+            entry = stored["scenes"].get(str(scene_number))
+            # the signature is taken before reading the files, so modifications during the computation invalidate the entry.
+            signature = _scene_signature(scene.scene_path)
+            if entry is not None and entry["signature"] == signature:
+                entries[str(scene_number)] = entry
+                self.scenes[scene_number] = AnnotationStats.from_dict(entry["stats"])
+            else:
+                # the scene of the dataset may hold files lists or detections from before the modification,
+                # so the scene directory is read again.
+                outdated.append((Infra3DRC(scene.scene_path), signature))
+
+        scene_stats = map_ordered(AnnotationStats.from_scene, ((scene,) for scene, _ in outdated), workers, backend)
+        for (scene, signature), stats in zip(outdated, scene_stats):
+            entries[str(scene.scene_number)] = {"signature": signature, "stats": stats.to_dict()}
+            self.scenes[scene.scene_number] = stats
+            self.num_computed += 1
+
+        if outdated or set(entries) != set(stored["scenes"]):
+            self._write_stats({"version": STATS_VERSION, "scenes": entries})
+
+    def _write_stats(self, stats: dict) -> None:
+        """writes the statistics atomically. A read-only dataset root only produces a warning."""
+        tmp_path = self.stats_path.with_name(self.stats_path.name + ".tmp")
+        try:
+            with open(str(tmp_path), "w") as f:
+                json.dump(stats, f, separators=(",", ":"))
+            os.replace(str(tmp_path), str(self.stats_path))
+        except OSError as e:
+            warnings.warn(f"could not write the statistics to {self.stats_path}: {e}")
+
+    @property
+    def total(self) -> AnnotationStats:
+        """statistics of the whole dataset."""
+        return AnnotationStats.merge(self.scenes.values())
+
+    def select(self, scene_numbers: Sequence[int]) -> AnnotationStats:
+        """statistics of some scenes, e.g. of a train or validation split."""
+        missing = set(scene_numbers) - set(self.scenes)
+        assert not missing, f"scenes {sorted(missing)} not found"
+        return AnnotationStats.merge(self.scenes[scene_number] for scene_number in scene_numbers)
+
+    def __getitem__(self, scene_number: int) -> AnnotationStats:
+        return self.scenes[scene_number]
+
+    def __len__(self):
+        return len(self.scenes)
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"num_scenes={len(self)}, "
+        s += f"total={self.total})"
+        return s
+
+    __repr__ = __str__
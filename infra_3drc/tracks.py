@@ -0,0 +1,151 @@
+#! /usr/bin/env python3
+"""
+Script Name: tracks.py
+
+Description:
+This script provides an index of the object tracks of a scene. For each track_id, the detections of the track
+are stored sorted by frame, with bounding box, centroid of the radar points and mean range rate, so the time series
+of a track is one array slice, and frame windows of a track are found by binary search.
+The index is built from the DetectionTable of the scene and saved as .npz file.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+"""
+
+from pathlib import Path
+from typing import Dict, Tuple, Union
+import numpy as np
+from .detections import DetectionTable
+
+# increased whenever the content of the saved index changes.
+TRACKS_VERSION = 2
+# one detection of a track. centroid and range_rate are nan if the detection has no radar points.
+TRACK_DTYPE = np.dtype(
+    [
+        ("track_id", np.int64),
+        ("frame", np.int64),
+        ("det_id", np.int64),
+        ("bbox", np.float32, (4,)),
+        ("centroid", np.float32, (3,)),
+        ("range_rate", np.float32),
+    ]
+)
+
+
+def _range_means(values: np.ndarray, starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+    """mean of values[start:stop] for each range, nan for empty ranges."""
+    cumsum = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    counts = stops - starts
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, (cumsum[stops] - cumsum[starts]) / counts, np.nan)
+
+
+class TrackIndex:
+    def __init__(self, entries: np.ndarray, signature: Dict[str, int] = None, version: int = TRACKS_VERSION) -> None:
+        """detections of all the tracks of a scene.
+
+        Args:
+            entries (np.ndarray): TRACK_DTYPE records sorted by track_id and frame.
+            signature (Dict[str, int], optional): modification times of the annotations the index was built from.
+            version (int, optional): TRACKS_VERSION the index was saved with.
+        """
+        self.entries = entries.view(np.recarray)
+        self.signature = signature if signature is not None else {}
+        self.version = version
+        # start and stop of each track in entries.
+        track_starts = np.flatnonzero(np.diff(self.entries["track_id"], prepend=np.int64(-1)) != 0)
+        track_stops = np.append(track_starts[1:], len(entries))
+        self._slices: Dict[int, Tuple[int, int]] = {
+            int(track_id): (int(start), int(stop))
+            for track_id, start, stop in zip(self.entries["track_id"][track_starts], track_starts, track_stops)
+        }
+
+    @classmethod
+    def from_detections(cls, detections: DetectionTable, signature: Dict[str, int] = None) -> "TrackIndex":
+        """builds the index from the DetectionTable of a scene (with frame column). Objects without track_id are skipped.
+
+        Args:
+            detections (DetectionTable): objects of all the frames of the scene.
+            signature (Dict[str, int], optional): modification times of the annotations, see Infra3DRC.tracks.
+
+        Returns:
+            TrackIndex
+        """
+        assert detections.frame is not None, "the detections must have the frame column, e.g. Infra3DRC.detections."
+        detections = detections[detections.track_id != -1]
+        points = detections.points
+
+        entries = np.empty(len(detections), dtype=TRACK_DTYPE)
+        entries["track_id"] = detections.track_id
+        entries["frame"] = detections.frame
+        entries["det_id"] = detections.det_id
+        entries["bbox"] = detections.bbox
+        for axis, name in enumerate(("x", "y", "z")):
+            entries["centroid"][:, axis] = _range_means(points[name], detections.points_start, detections.points_stop)
+        entries["range_rate"] = _range_means(points["range_rate"], detections.points_start, detections.points_stop)
+
+        # sorted by track_id, then frame.
+        entries = entries[np.lexsort((entries["frame"], entries["track_id"]))]
+        return cls(entries, signature)
+
+    @classmethod
+    def load(cls, path: Union[Path, str]) -> "TrackIndex":
+        with np.load(str(path)) as npz:
+            signature = dict(zip(npz["signature_keys"].tolist(), npz["signature_values"].tolist()))
+            return cls(npz["entries"], signature, int(npz["version"]))
+
+    def save(self, path: Union[Path, str]) -> None:
+        # np.savez adds the .npz suffix to other file names, so the file is written through a file object.
+        with open(str(path), "wb") as f:
+            np.savez(
+                f,
+                version=TRACKS_VERSION,
+                entries=self.entries.view(np.ndarray),
+                signature_keys=np.array(list(self.signature.keys()), dtype=str),
+                signature_values=np.array(list(self.signature.values()), dtype=np.int64),
+            )
+
+    @property
+    def track_ids(self) -> np.ndarray:
+        """sorted track ids."""
+        return np.array(list(self._slices), dtype=np.int64)
+
+    def __getitem__(self, track_id: int) -> np.recarray:
+        """detections of the track, sorted by frame. e.g. tracks[3].centroid is the (n, 3) trajectory of track 3."""
+        start, stop = self._slices[int(track_id)]
+        return self.entries[start:stop]
+
+    def window(self, track_id: int, start_frame: int, stop_frame: int) -> np.recarray:
+        """detections of the track in frames [start_frame, stop_frame).
+
+        Args:
+            track_id (int): track id.
+            start_frame (int): first frame index of the window.
+            stop_frame (int): frame index after the window.
+
+        Returns:
+            np.recarray: detections of the track, sorted by frame.
+        """
+        track = self[track_id]
+        start, stop = np.searchsorted(track["frame"], [start_frame, stop_frame])
+        return track[start:stop]
+
+    def __contains__(self, track_id: int) -> bool:
+        return int(track_id) in self._slices
+
+    def __iter__(self):
+        for track_id in self._slices:
+            yield track_id
+
+    def __len__(self):
+        return len(self._slices)
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"num_tracks={len(self)}, "
+        s += f"num_detections={len(self.entries)})"
+        return s
+
+    __repr__ = __str__
@@ -1,7 +1,63 @@
 #! /usr/bin/env python3
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Sequence, Tuple, Union
+import os
+import struct
 import numpy as np
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def read_png_shape(png_path: Union[Path, str]) -> Tuple[int, int]:
+    """reads the image dimensions from the png header, without decoding the image.
+
+    Args:
+        png_path (Union[Path, str]): path to png image.
+
+    Returns:
+        Tuple[int, int]: (rows, cols) of the image.
+    """
+    with open(str(png_path), "rb") as f:
+        header = f.read(24)
+    # 8 bytes signature, then the IHDR chunk: 4 bytes length, 4 bytes type, 4 bytes width, 4 bytes height.
+    assert header[:8] == PNG_SIGNATURE and header[12:16] == b"IHDR", f"not a png image: {png_path}"
+    cols, rows = struct.unpack(">II", header[16:24])
+    return rows, cols
+
+
+def files_signature(paths: Sequence[Path], root: Path, stat_files: bool = True) -> Dict[str, int]:
+    """signature of files and directories, which changes when any of them is modified.
+
+    For a file, its modification time (ns) and size. For a directory, its own modification time, and the number,
+    latest modification time and total size of the files in it. A directory's own modification time only changes
+    when files are added, removed or renamed, not when a file is rewritten in place, so its files are stat'ed as well.
+
+    Args:
+        paths (Sequence[Path]): files and directories.
+        root (Path): directory the keys of the signature are relative to.
+        stat_files (bool, optional): If False, a directory only gives its own modification time, so its files are
+            not listed, and files rewritten in place do not change the signature. Defaults to True.
+
+    Returns:
+        Dict[str, int]: e.g. {"scene.json:mtime_ns": ..., "scene.json:size": ...}.
+    """
+    signature = {}
+    for path in paths:
+        name = path.relative_to(root).as_posix()
+        stat = path.stat()
+        signature[f"{name}:mtime_ns"] = stat.st_mtime_ns
+        if not path.is_dir():
+            signature[f"{name}:size"] = stat.st_size
+            continue
+        if not stat_files:
+            continue
+        file_stats = [entry.stat() for entry in os.scandir(str(path)) if entry.is_file()]
+        signature[f"{name}:num_files"] = len(file_stats)
+        signature[f"{name}:files_mtime_ns"] = max((s.st_mtime_ns for s in file_stats), default=0)
+        signature[f"{name}:files_size"] = sum(s.st_size for s in file_stats)
+    return signature
+
 
 @dataclass
 class Detection:
@@ -22,6 +78,120 @@ class Calibration:
     radar_to_lidar: np.array
     camera_intrinsics: np.array
     camera_distcoeffs: np.array
+    # composed transforms, computed once on first request. see `get_transform` and `get_projection`.
+    _transforms: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    # sensor frame names accepted by `get_transform`.
+    FRAMES = ("radar", "lidar", "camera", "ground")
+
+    @staticmethod
+    def _frame_name(name: str) -> str:
+        # "radar_01" -> "radar"
+        frame_name = name.lower().split("_")[0]
+        assert frame_name in Calibration.FRAMES, f"unknown sensor frame: {name}"
+        return frame_name
+
+    def _edges(self) -> dict:
+        """extrinsic calibrations as homogeneous (4,4) transforms, in both directions."""
+        edges = {}
+        for (source, target), matrix in (
+            (("lidar", "camera"), self.lidar_to_camera),
+            (("radar", "camera"), self.radar_to_camera),
+            (("lidar", "ground"), self.lidar_to_ground),
+            (("radar", "lidar"), self.radar_to_lidar),
+        ):
+            transform = np.eye(4)
+            transform[:3, :] = np.asarray(matrix, dtype=np.float64)[:3, :]
+            edges[(source, target)] = transform
+            edges[(target, source)] = np.linalg.inv(transform)
+        return edges
+
+    def _compose(self, source: str, target: str) -> np.ndarray:
+        """shortest chain of calibrations from source to target frame (breadth first search)."""
+        edges = self._edges()
+        chains = {source: np.eye(4)}
+        queue = [source]
+        while queue:
+            frame = queue.pop(0)
+            if frame == target:
+                return chains[frame]
+            for (edge_source, edge_target), transform in edges.items():
+                if edge_source == frame and edge_target not in chains:
+                    chains[edge_target] = transform @ chains[frame]
+                    queue.append(edge_target)
+        raise ValueError(f"no calibration chain from {source} to {target}.")
+
+    def get_transform(self, source: str, target: str, dtype: np.dtype = np.float64) -> np.ndarray:
+        """homogeneous transform from source to target sensor frame, e.g. ("radar", "ground").
+
+        Args:
+            source (str): one of radar, lidar, camera, ground.
+            target (str): one of radar, lidar, camera, ground.
+            dtype (np.dtype, optional): Defaults to np.float64.
+
+        Returns:
+            np.ndarray: read-only, contiguous (4,4) transform. It is computed once and cached.
+        """
+        source, target = self._frame_name(source), self._frame_name(target)
+        key = ("transform", source, target, np.dtype(dtype).str)
+        if key not in self._transforms:
+            transform = np.ascontiguousarray(self._compose(source, target), dtype=dtype)
+            transform.flags.writeable = False
+            self._transforms[key] = transform
+        return self._transforms[key]
+
+    def get_projection(self, source: str, dtype: np.dtype = np.float64) -> np.ndarray:
+        """projection matrix from source sensor frame to camera pixels (camera intrinsics * extrinsics).
+
+        Args:
+            source (str): one of radar, lidar, camera, ground.
+            dtype (np.dtype, optional): Defaults to np.float64.
+
+        Returns:
+            np.ndarray: read-only, contiguous (3,4) matrix. It is computed once and cached.
+        """
+        source = self._frame_name(source)
+        key = ("projection", source, np.dtype(dtype).str)
+        if key not in self._transforms:
+            projection = np.matmul(
+                self.camera_intrinsics, self.get_transform(source, "camera")[:3, :]
+            )  # (3,3)*(3,4) -> (3,4)
+            projection = np.ascontiguousarray(projection, dtype=dtype)
+            projection.flags.writeable = False
+            self._transforms[key] = projection
+        return self._transforms[key]
+
+    def transform_points(self, points: np.ndarray, source: str, target: str) -> np.ndarray:
+        """transforms (n,3) points from source to target sensor frame.
+
+        Args:
+            points (np.ndarray): (n,3) x,y,z points. float32 points are transformed in float32.
+            source (str): sensor frame of the points.
+            target (str): sensor frame to transform the points to.
+
+        Returns:
+            np.ndarray: (n,3) transformed points.
+        """
+        dtype = np.float32 if points.dtype == np.float32 else np.float64
+        transform = self.get_transform(source, target, dtype)
+        return np.matmul(points, transform[:3, :3].T) + transform[:3, 3]
+
+    def project_points(self, points: np.ndarray, source: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """projects (n,3) points from source sensor frame to camera pixels.
+
+        Args:
+            points (np.ndarray): (n,3) x,y,z points. float32 points are projected in float32.
+            source (str): sensor frame of the points.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: u, v, and depth (distance along the camera axis) of each point.
+        """
+        dtype = np.float32 if points.dtype == np.float32 else np.float64
+        projection = self.get_projection(source, dtype)
+        # multiply points in 3d sensor dim to projection matrix to get u,v,w
+        projected_points = np.matmul(points, projection[:, :3].T) + projection[:, 3]  # (n,3)
+        depth = projected_points[:, 2]
+        return projected_points[:, 0] / depth, projected_points[:, 1] / depth, depth
 
 
 @dataclass
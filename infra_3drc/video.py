@@ -0,0 +1,165 @@
+#! /usr/bin/env python3
+"""
+Script Name: video.py
+
+Description:
+This script exports the frames of a scene as video or as png image sequence, with annotations and point clouds
+drawn on the camera images. The frames are decoded and rendered by a pool of processes, at most `depth` frames
+ahead of the writer, and written in order, so the memory stays bounded for scenes of any length.
+The time spent in each stage (decode, render, encode, waiting for the workers) is returned as ExportStats.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+- opencv
+"""
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Sequence, Tuple, Union
+import numpy as np
+from .frame import Frame, OVERLAYS
+from .prefetch import map_ordered
+
+# fourcc codes of the video containers which can be written, by file suffix.
+VIDEO_CODECS = {".mp4": "mp4v", ".avi": "MJPG", ".mkv": "XVID"}
+
+
+@dataclass
+class ExportStats:
+    """summed time of each stage over all the frames, in seconds. decode and render run in the workers in parallel,
+    encode runs in the workers for png sequences and in the writer for videos. wait is the time the writer waited
+    for the next rendered frame, and total the wall time of the export."""
+
+    num_frames: int = 0
+    decode: float = 0.0
+    render: float = 0.0
+    encode: float = 0.0
+    wait: float = 0.0
+    total: float = 0.0
+
+    @property
+    def fps(self) -> float:
+        """exported frames per second."""
+        return self.num_frames / self.total if self.total > 0 else 0.0
+
+    def __str__(self):
+        s = self.__class__.__name__ + "("
+        s += f"num_frames={self.num_frames}, "
+        s += ", ".join(
+            f"{stage}={1000 * getattr(self, stage) / max(self.num_frames, 1):.1f} ms/frame"
+            for stage in ("decode", "render", "encode", "wait")
+        )
+        s += f", total={self.total:.2f} s, fps={self.fps:.1f})"
+        return s
+
+    __repr__ = __str__
+
+
+def _render_frame(frame: Frame, overlay: Tuple[str, ...], scale: float, png: bool) -> Tuple[Union[np.ndarray, bytes], float, float, float]:
+    """decodes and renders the frame in a worker. For png sequences, the image is also encoded in the worker.
+
+    Returns:
+        rendered image (or png bytes), and the decode, render and encode time.
+    """
+    import cv2
+
+    start = time.perf_counter()
+    frame.camera_image
+    if "annotations" in overlay:
+        frame.detections
+    if "radar" in overlay:
+        frame.radar_point_cloud
+    if "lidar" in overlay:
+        frame.lidar_point_cloud
+    decoded = time.perf_counter()
+
+    image = frame.render(overlay)
+    if scale != 1.0:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    rendered = time.perf_counter()
+
+    if png:
+        ok, encoded = cv2.imencode(".png", image)
+        assert ok, f"could not encode the frame {frame.image_path} as png."
+        image = encoded.tobytes()
+    return image, decoded - start, rendered - decoded, time.perf_counter() - rendered
+
+
+def export_frames(
+    get_frame: Callable[[int], Frame],
+    indices: Iterable[int],
+    path: Union[Path, str],
+    overlay: Sequence[str] = OVERLAYS,
+    workers: int = 4,
+    backend: str = "process",
+    fps: float = 10.0,
+    scale: float = 1.0,
+    depth: int = None,
+) -> ExportStats:
+    """renders the frames of `indices` and writes them in order to a video, or to a png sequence.
+
+    Args:
+        get_frame (Callable[[int], Frame]): creates the frame of an index, e.g. Infra3DRC._get_frame.
+        indices (Iterable[int]): indices of the frames, in the order they are written.
+        path (Union[Path, str]): video file with one of the suffixes of VIDEO_CODECS, or a directory (path without suffix)
+                    for a png sequence, with one file per frame named by its position, e.g. 000000.png.
+        overlay (Sequence[str], optional): layers drawn on the images, see Frame.render. Defaults to OVERLAYS.
+        workers (int, optional): number of worker processes (or threads). Defaults to 4.
+        backend (str, optional): "process" or "thread". Defaults to "process".
+        fps (float, optional): frame rate of the video. Defaults to 10.0.
+        scale (float, optional): scale factor of the images, e.g. 0.5 for half resolution. Defaults to 1.0.
+        depth (int, optional): maximum number of frames rendered ahead of the writer. Defaults to None, which is 2 * workers.
+
+    Returns:
+        ExportStats: time of each stage.
+    """
+    import cv2
+
+    for layer in overlay:
+        assert layer in OVERLAYS, f"unknown overlay {layer}, must be one of {OVERLAYS}"
+    path = Path(path)
+    png = path.suffix == ""
+    if png:
+        path.mkdir(parents=True, exist_ok=True)
+    else:
+        assert path.suffix.lower() in VIDEO_CODECS, f"unsupported video format {path.suffix}, must be one of {list(VIDEO_CODECS)}"
+    overlay = tuple(overlay)
+
+    stats = ExportStats()
+    start = time.perf_counter()
+    writer = None
+    rendered = map_ordered(
+        _render_frame, ((get_frame(idx), overlay, scale, png) for idx in indices), workers, backend, depth
+    )
+    try:
+        while True:
+            wait_start = time.perf_counter()
+            result = next(rendered, None)
+            stats.wait += time.perf_counter() - wait_start
+            if result is None:
+                break
+            image, decode_time, render_time, encode_time = result
+            stats.decode += decode_time
+            stats.render += render_time
+
+            encode_start = time.perf_counter()
+            if png:
+                with open(str(path.joinpath(f"{stats.num_frames:06d}.png")), "wb") as f:
+                    f.write(image)
+            else:
+                if writer is None:
+                    fourcc = cv2.VideoWriter_fourcc(*VIDEO_CODECS[path.suffix.lower()])
+                    writer = cv2.VideoWriter(str(path), fourcc, fps, (image.shape[1], image.shape[0]))
+                    assert writer.isOpened(), f"could not open a video writer for {path}"
+                writer.write(image)
+            stats.encode += encode_time + time.perf_counter() - encode_start
+            stats.num_frames += 1
+    finally:
+        rendered.close()
+        if writer is not None:
+            writer.release()
+    stats.total = time.perf_counter() - start
+    return stats
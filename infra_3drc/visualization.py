@@ -0,0 +1,83 @@
+#! /usr/bin/env python3
+"""
+Script Name: visualization.py
+
+Description:
+This script provides the interactive display of the SDK: OpenCV windows for the rendered camera images and
+matplotlib 3D scatter plots of the point clouds. It is imported by Frame only when something is displayed,
+so loading the dataset on headless machines does not need a display. matplotlib is only imported by the 3D plots,
+so showing the camera images in OpenCV windows does not import it or switch its backend.
+
+Authors: Shiva Agrawal, Savankumar Bhanderi.
+
+Requirements:
+- NumPy
+- opencv
+- matplotlib (optional, for the 3D plots. pip install infra-3drc[visualization])
+"""
+
+import numpy as np
+import cv2
+
+
+def _pyplot():
+    """matplotlib.pyplot with the TkAgg backend, imported on first use."""
+    try:
+        import matplotlib
+    except ImportError as e:
+        raise ImportError("matplotlib is needed for the 3D plots, install it with: pip install infra-3drc[visualization]") from e
+    try:
+        # this is a workaround for the qt "xcb" plugin error.
+        matplotlib.use("TkAgg")
+    except ImportError as e:
+        # matplotlib is installed, but e.g. tkinter is missing.
+        raise ImportError(f"matplotlib could not switch to the TkAgg backend for the 3D plots: {e}") from e
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D
+
+    return plt
+
+
+def show_image(window_name: str, cv_image: np.ndarray) -> None:
+    """shows the image in a window, until the window is closed or "q" is pressed.
+
+    Args:
+        window_name (str): title of the window.
+        cv_image (np.ndarray): BGR image.
+    """
+    cv2.namedWindow(window_name, cv2.WINDOW_KEEPRATIO)
+    cv2.imshow(window_name, cv_image)
+    while cv2.getWindowProperty(window_name, cv2.WND_PROP_VISIBLE) >= 1:  # cv2.WND_PROP_VISIBLE
+        keyCode = cv2.waitKey(500)
+
+        if (keyCode & 0xFF) == ord("q"):
+            cv2.destroyAllWindows()
+            break
+
+
+def scatter_3D(locs: np.ndarray) -> None:
+    """spawns a matplotlib 3D interactive scatter plot of the points.
+
+    Args:
+        locs (np.ndarray): structured array with x, y, z fields.
+    """
+    plt = _pyplot()
+
+    fig = plt.figure(figsize=(10, 7))
+    ax = fig.add_subplot(111, projection="3d")
+    scatter = ax.scatter3D(locs["x"], locs["y"], locs["z"], color="red", marker=".")
+    ax.set_xlabel("X (metres)")
+    ax.set_ylabel("Y (metres)")
+    ax.set_zlabel("Z (metres)")
+
+    # ax.set_facecolor("black")
+    ax.grid(True, color="white", linestyle="dotted")
+
+    fig.canvas.mpl_connect(
+        "pick_event",
+        lambda event: print(
+            f"Point3D(X={locs['x'][event.ind[0]]},Y={locs['x'][event.ind[0]]},Z={locs['x'][event.ind[0]]})"
+        ),
+    )
+    scatter.set_picker(True)
+    plt.show()
@@ -0,0 +1,203 @@
+"""
+Fixtures of the tests: a small synthetic INFRA-3DRC dataset with the directory layout, pcd formats and annotation
+jsons of the real one, written to a temporary directory for each test.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+RADAR_FIELDS = ["range", "azimuth_angle", "elevation_angle", "range_rate", "rcs", "x", "y", "z"]
+# binary layout of the lidar points, with the padding bytes of the sensor (see Frame.lidar_typ_str).
+LIDAR_FIELDS = "x y z PAD intensity t reflectivity ring PAD ambient PAD range PAD PAD PAD".split()
+LIDAR_SIZES = [4, 4, 4, 4, 4, 4, 2, 1, 1, 2, 2, 4, 4, 4, 4]
+LIDAR_TYPES = ["F", "F", "F", "U", "F", "U", "U", "U", "U", "U", "U", "U", "U", "U", "U"]
+LIDAR_DTYPE = np.dtype(
+    {
+        "names": ["x", "y", "z", "intensity", "t", "reflectivity", "ring", "ambient", "range"],
+        "formats": ["<f4", "<f4", "<f4", "<f4", "<u4", "<u2", "u1", "<u2", "<u4"],
+        "offsets": [0, 4, 8, 16, 20, 24, 26, 28, 32],
+        "itemsize": 48,
+    }
+)
+# sensor x forward, y left, z up -> camera x right, y down, z forward.
+SENSOR_TO_CAMERA = [[0.0, -1.0, 0.0, 0.1], [0.0, 0.0, -1.0, 0.2], [1.0, 0.0, 0.0, 0.4]]
+# the small test images (24 x 32) see most of the radar points and some of the lidar points.
+CAMERA_INTRINSICS = [[30.0, 0.0, 16.0], [0.0, 30.0, 12.0], [0.0, 0.0, 1.0]]
+SCENE_NUMBERS = (1, 2)
+NUM_FRAMES = 3
+
+
+def pcd_header(fields, sizes, types, num_points: int, data: str = "binary") -> bytes:
+    return (
+        "# .PCD v0.7 - Point Cloud Data file format\nVERSION 0.7\n"
+        f"FIELDS {' '.join(fields)}\nSIZE {' '.join(map(str, sizes))}\nTYPE {' '.join(types)}\n"
+        f"COUNT {' '.join(['1'] * len(fields))}\nWIDTH {num_points}\nHEIGHT 1\nVIEWPOINT 0 0 0 1 0 0 0\n"
+        f"POINTS {num_points}\nDATA {data}\n"
+    ).encode()
+
+
+def write_scene(dataset_root: Path, scene_number: int, num_frames: int, rng: np.random.Generator) -> Path:
+    scene_path = dataset_root.joinpath(f"INFRA-3DRC_scene-{str(scene_number).zfill(2)}")
+    data_dirs = {}
+    for name in ("camera_01__data", "camera_01__annotation", "radar_01__data", "radar_01__annotation", "lidar_01__data"):
+        data_dirs[name] = scene_path.joinpath(name.split("__")[0], name)
+        data_dirs[name].mkdir(parents=True)
+    with open(str(scene_path.joinpath("scene.json")), "w") as f:
+        json.dump(
+            {
+                "location": "Ingolstadt",
+                "weather": "Normal",
+                "day_light": ["day", "night"][scene_number % 2],
+                "description": f"scene {scene_number}",
+                "total_frames_count": num_frames,
+            },
+            f,
+        )
+    with open(str(scene_path.joinpath("calibration.json")), "w") as f:
+        json.dump(
+            {
+                "calibration": [
+                    {"calibration": "lidar_01_to_camera_01", "T": SENSOR_TO_CAMERA},
+                    {"calibration": "radar_01_to_camera_01", "T": SENSOR_TO_CAMERA},
+                    {"calibration": "lidar_01_to_ground", "T": [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 3.5]]},
+                    {"calibration": "radar_01_to_lidar_01", "T": [[1, 0, 0, 0.1], [0, 1, 0, 0], [0, 0, 1, -0.2]]},
+                    {"calibration": "camera_01", "k": CAMERA_INTRINSICS, "D": [0, 0, 0, 0, 0]},
+                ]
+            },
+            f,
+        )
+
+    for frame_idx in range(num_frames):
+        name = str(frame_idx).zfill(6)
+        image_id = 1000 * scene_number + frame_idx
+        image = rng.integers(0, 255, (24, 32, 3), dtype=np.uint8)
+        cv2.imwrite(str(data_dirs["camera_01__data"].joinpath(f"{name}.png")), image)
+
+        num_points = int(rng.integers(40, 80))
+        x = rng.uniform(1.0, 150.0, num_points)
+        y = rng.uniform(-0.3, 0.3, num_points) * x
+        z = rng.uniform(-0.1, 0.1, num_points) * x
+        radar_range = np.sqrt(x * x + y * y + z * z)
+        columns = [
+            radar_range,
+            np.arctan2(y, x),
+            np.arcsin(z / radar_range),
+            rng.uniform(-5, 5, num_points),
+            rng.uniform(-20, 20, num_points),
+            x,
+            y,
+            z,
+        ]
+        radar = np.stack(columns, axis=1).astype("<f4")
+        with open(str(data_dirs["radar_01__data"].joinpath(f"{name}.pcd")), "wb") as f:
+            f.write(pcd_header(RADAR_FIELDS, [4] * 8, ["F"] * 8, num_points))
+            f.write(radar.tobytes())
+
+        lidar = np.zeros(50, dtype=LIDAR_DTYPE)
+        for field in ("x", "y", "z", "intensity"):
+            lidar[field] = rng.uniform(-20, 20, lidar.shape[0])
+        lidar["x"] = np.abs(lidar["x"]) + 0.5
+        lidar["reflectivity"] = rng.integers(0, 2 ** 16, lidar.shape[0])
+        with open(str(data_dirs["lidar_01__data"].joinpath(f"{name}.pcd")), "wb") as f:
+            f.write(pcd_header(LIDAR_FIELDS, LIDAR_SIZES, LIDAR_TYPES, lidar.shape[0]))
+            f.write(lidar.tobytes())
+
+        # objects with a few radar points each. every third object has no radar points, objects are tracked over the frames.
+        inside = np.flatnonzero(x <= 120.0)
+        rng.shuffle(inside)
+        num_objects = int(rng.integers(2, 6))
+        camera_objects, radar_objects, labeled = [], [], set()
+        for det_id, object_points in enumerate(np.array_split(inside[: 4 * num_objects], num_objects)):
+            category_id = int(rng.integers(1, 9))
+            camera_objects.append(
+                {
+                    "det_id": det_id,
+                    "image_id": image_id,
+                    "category_id": category_id,
+                    "track_id": det_id + 1,
+                    "bbox": [float(rng.uniform(0, 1500)), float(rng.uniform(0, 900)), 80.5, 120.25],
+                }
+            )
+            if det_id % 3 != 2 and len(object_points):
+                points = [[int(i)] + [float(column[i]) for column in columns] for i in sorted(object_points)]
+                radar_objects.append({"det_id": det_id, "instance_id": det_id, "category_id": category_id, "points": points})
+                labeled.update(int(i) for i in object_points)
+        background = [[int(i)] + [float(column[i]) for column in columns] for i in inside if int(i) not in labeled]
+        with open(str(data_dirs["camera_01__annotation"].joinpath(f"{name}.json")), "w") as f:
+            json.dump({"image": {"id": image_id, "file_name": f"{name}.png"}, "annotations": camera_objects}, f)
+        with open(str(data_dirs["radar_01__annotation"].joinpath(f"{name}.json")), "w") as f:
+            json.dump(
+                {
+                    "image": {"id": image_id, "file_name": f"{name}.png"},
+                    "radar_pcd_metadata": {
+                        "fields": str(["index"] + RADAR_FIELDS),
+                        "dtypes": str(["uint16"] + ["float32"] * 8),
+                    },
+                    "objects": radar_objects,
+                    "background": background,
+                },
+                f,
+            )
+    return scene_path
+
+
+def rewrite_json(json_path: Path, edit) -> None:
+    """rewrites the json file in place with edit(content) applied.
+
+    The modification time is moved one second ahead, as coarse file system timestamps could otherwise give
+    the rewritten file the same modification time as before.
+    """
+    mtime_ns = json_path.stat().st_mtime_ns
+    with open(str(json_path), "r") as f:
+        content = json.load(f)
+    edit(content)
+    with open(str(json_path), "w") as f:
+        json.dump(content, f)
+    os.utime(str(json_path), ns=(mtime_ns + 10 ** 9, mtime_ns + 10 ** 9))
+
+
+def replace_json(json_path: Path, edit) -> None:
+    """replaces the json file with a copy with edit(content) applied, written next to it and renamed over it.
+
+    The modification time of the directory is moved one second ahead, like in rewrite_json.
+    """
+    mtime_ns = json_path.parent.stat().st_mtime_ns
+    with open(str(json_path), "r") as f:
+        content = json.load(f)
+    edit(content)
+    tmp_path = json_path.with_suffix(".tmp")
+    with open(str(tmp_path), "w") as f:
+        json.dump(content, f)
+    os.replace(str(tmp_path), str(json_path))
+    os.utime(str(json_path.parent), ns=(mtime_ns + 10 ** 9, mtime_ns + 10 ** 9))
+
+
+@pytest.fixture
+def dataset_root(tmp_path: Path) -> Path:
+    """root of a synthetic dataset with the scenes SCENE_NUMBERS, NUM_FRAMES frames each."""
+    rng = np.random.default_rng(0)
+    root = tmp_path.joinpath("dataset")
+    for scene_number in SCENE_NUMBERS:
+        write_scene(root, scene_number, NUM_FRAMES, rng)
+    return root
+
+
+@pytest.fixture
+def set_category():
+    """sets the category of all the camera objects of a frame, by rewriting its camera annotation json in place, or
+    by replacing it."""
+
+    def set_category(scene_path: Path, frame_idx: int, category_id: int, in_place: bool = True) -> None:
+        def edit(content):
+            for c_obj in content["annotations"]:
+                c_obj["category_id"] = category_id
+
+        json_path = scene_path.joinpath("camera_01", "camera_01__annotation", f"{str(frame_idx).zfill(6)}.json")
+        (rewrite_json if in_place else replace_json)(json_path, edit)
+
+    return set_category
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+import numpy as np
+
+from infra_3drc import Infra3DRC, Infra3DRCDataset
+from infra_3drc.aio import aiter_frames
+
+
+async def collect(frames, limit=None):
+    collected = []
+    async for frame in frames:
+        collected.append(frame)
+        if limit is not None and len(collected) == limit:
+            break
+    return collected
+
+
+def test_aiter_frames_in_order(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+    fields = ("radar_point_cloud", "objects")
+    frames = asyncio.run(collect(scene.aiter(workers=2, fields=fields)))
+    assert [frame.image_path for frame in frames] == [frame.image_path for frame in scene]
+    for frame, expected in zip(frames, scene):
+        assert frame._radar_point_cloud is not None
+        np.testing.assert_array_equal(frame.radar_point_cloud, expected.radar_point_cloud)
+        assert [obj.det_id for obj in frame.objects] == [obj.det_id for obj in expected.objects]
+
+
+def test_aiter_frames_early_exit(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+    requested = []
+
+    def get_frame(idx):
+        requested.append(idx)
+        return scene._get_frame(idx)
+
+    frames = aiter_frames(get_frame, [1, 2, 0, 1, 2], workers=1, fields=("radar_point_cloud",), depth=2)
+
+    async def first_frame():
+        frame = await frames.__anext__()
+        await frames.aclose()
+        return frame
+
+    assert asyncio.run(first_frame()).image_path == scene[1].image_path
+    # at most depth frames ahead of the consumer, and nothing is requested after the loop is left. frames which
+    # were not started when the loop was left are not requested at all.
+    assert requested in ([1], [1, 2], [1, 2, 0])
+
+
+def test_aiter_frames_get_frame_off_the_loop(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+    threads = []
+
+    def get_frame(idx):
+        threads.append(threading.get_ident())
+        return scene._get_frame(idx)
+
+    async def run():
+        frames = await collect(aiter_frames(get_frame, range(len(scene)), workers=2, fields=("objects",)))
+        return frames, threading.get_ident()
+
+    frames, loop_thread = asyncio.run(run())
+    assert len(frames) == len(threads) == len(scene)
+    assert loop_thread not in threads
+
+
+def test_dataset_aiter_indices(dataset_root):
+    dataset = Infra3DRCDataset(dataset_root)
+    frames = asyncio.run(collect(dataset.aiter([5, 0], workers=2, fields=("objects",))))
+    assert [frame.image_id for frame in frames] == [dataset[5].image_id, dataset[0].image_id]
+
+
+def test_awaitable_frame_properties(dataset_root):
+    frame = Infra3DRC(dataset_root, 2)[0]
+
+    async def load():
+        return await asyncio.gather(frame.acamera_image(), frame.alidar_point_cloud(), frame.aobjects())
+
+    image, lidar, objects = asyncio.run(load())
+    assert image is frame.camera_image
+    assert lidar is frame.lidar_point_cloud
+    assert objects is frame.objects
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC, ModalityCache
+
+
+def assert_cloud_equal(cloud, expected):
+    assert cloud.dtype.names == expected.dtype.names
+    for name in expected.dtype.names:
+        np.testing.assert_array_equal(cloud[name], expected[name])
+
+
+def assert_objects_equal(objects, expected):
+    assert len(objects) == len(expected)
+    for obj, expected_obj in zip(objects, expected):
+        for name in ("image_id", "det_id", "category_id", "track_id", "instance_id"):
+            assert getattr(obj, name) == getattr(expected_obj, name)
+        np.testing.assert_allclose(obj.bbox, expected_obj.bbox)
+        if expected_obj.points is None:
+            assert obj.points is None
+        else:
+            assert_cloud_equal(obj.points, expected_obj.points)
+
+
+@pytest.mark.parametrize("scene_number", [1, 2])
+def test_cached_frames_match_frames(dataset_root, tmp_path, scene_number):
+    scene = Infra3DRC(dataset_root, scene_number)
+    cache_path = tmp_path.joinpath("cache")
+    scene.build_cache(cache_path)
+    cached_scene = Infra3DRC.from_cache(cache_path)
+
+    assert len(cached_scene) == len(scene)
+    assert cached_scene.scene_number == scene.scene_number
+    for cached_frame, frame in zip(cached_scene, scene):
+        assert cached_frame.image_id == frame.image_id
+        assert cached_frame.image_path == frame.image_path
+        assert_cloud_equal(cached_frame.radar_point_cloud, frame.radar_point_cloud)
+        assert_cloud_equal(cached_frame.lidar_point_cloud, frame.lidar_point_cloud)
+        np.testing.assert_array_equal(cached_frame.lidar_point_index, frame.lidar_point_index)
+        assert_cloud_equal(cached_frame.radar_background_cloud, frame.radar_background_cloud)
+        assert_objects_equal(cached_frame.objects, frame.objects)
+        # the clouds are views into the memory mapped cache.
+        assert not cached_frame.radar_point_cloud.flags.writeable
+
+
+def test_cached_frames_without_annotation_files(dataset_root, tmp_path):
+    scene = Infra3DRC(dataset_root, 1)
+    expected = [frame.objects for frame in scene]
+    scene.build_cache(tmp_path)
+    # the cache does not read the annotation jsons again.
+    for json_path in scene.camera_annot_paths_list + scene.radar_annot_paths_list:
+        json_path.unlink()
+    cached_scene = Infra3DRC.from_cache(tmp_path)
+    for cached_frame, objects in zip(cached_scene, expected):
+        assert_objects_equal(cached_frame.objects, objects)
+
+
+def test_cached_scene_options(dataset_root, tmp_path):
+    scene = Infra3DRC(dataset_root, 1)
+    scene.build_cache(tmp_path)
+    cache = ModalityCache(2**20)
+    cached_scene = Infra3DRC.from_cache(tmp_path, mmap=True, modality_cache=cache)
+    assert cached_scene.mmap and cached_scene.modality_cache is cache
+    frame = cached_scene[0]
+    assert frame.mmap and frame.modality_cache is cache
+    # the decoded data is kept in the cache, shared by the frames of the scene.
+    assert cached_scene[0].radar_point_cloud is frame.radar_point_cloud
+    assert cached_scene[0].detections is frame.detections
+    assert frame._radar_point_cloud is None and frame._detections is None
+    assert cache.stats()["radar_point_cloud"].hits == 1
+    assert_cloud_equal(frame.radar_point_cloud, scene[0].radar_point_cloud)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC
+
+
+def homogeneous(matrix) -> np.ndarray:
+    transform = np.eye(4)
+    transform[:3, :] = np.asarray(matrix)[:3, :]
+    return transform
+
+
+def test_composed_transforms(dataset_root):
+    calibration = Infra3DRC(dataset_root, 1).calibration
+    radar_to_lidar = homogeneous(calibration.radar_to_lidar)
+    lidar_to_ground = homogeneous(calibration.lidar_to_ground)
+    radar_to_camera = homogeneous(calibration.radar_to_camera)
+    lidar_to_camera = homogeneous(calibration.lidar_to_camera)
+
+    np.testing.assert_allclose(calibration.get_transform("radar", "ground"), lidar_to_ground @ radar_to_lidar)
+    np.testing.assert_allclose(calibration.get_transform("camera", "radar"), np.linalg.inv(radar_to_camera))
+    np.testing.assert_allclose(
+        calibration.get_transform("ground", "camera"), lidar_to_camera @ np.linalg.inv(lidar_to_ground), atol=1e-12
+    )
+    np.testing.assert_allclose(calibration.get_transform("radar_01", "radar"), np.eye(4))
+    with pytest.raises(AssertionError):
+        calibration.get_transform("radar", "sonar")
+
+
+def test_transforms_are_cached(dataset_root):
+    calibration = Infra3DRC(dataset_root, 1).calibration
+    transform = calibration.get_transform("radar", "ground")
+    assert calibration.get_transform("radar", "ground") is transform
+    assert not transform.flags.writeable
+    assert calibration.get_transform("radar", "ground", np.float32).dtype == np.float32
+    projection = calibration.get_projection("lidar")
+    assert calibration.get_projection("lidar") is projection
+    np.testing.assert_allclose(projection, calibration.camera_intrinsics @ np.asarray(calibration.lidar_to_camera)[:3, :])
+
+
+def test_transform_and_project_points(dataset_root):
+    calibration = Infra3DRC(dataset_root, 1).calibration
+    points = np.random.default_rng(0).uniform(1, 50, (20, 3))
+    homogeneous_points = np.column_stack((points, np.ones(points.shape[0])))
+
+    expected = (calibration.get_transform("radar", "ground") @ homogeneous_points.T).T[:, :3]
+    np.testing.assert_allclose(calibration.transform_points(points, "radar", "ground"), expected)
+    assert calibration.transform_points(points.astype(np.float32), "radar", "ground").dtype == np.float32
+
+    projected = (calibration.get_projection("radar") @ homogeneous_points.T).T
+    u, v, depth = calibration.project_points(points, "radar")
+    np.testing.assert_allclose(np.stack((u, v, depth), axis=-1), np.column_stack((projected[:, :2] / projected[:, 2:], projected[:, 2])))
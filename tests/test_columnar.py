@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC, Infra3DRCDataset
+from infra_3drc.columnar import read_table, scene_tables
+
+
+def assert_records_equal(records, expected):
+    assert records.dtype.names == expected.dtype.names
+    for name in expected.dtype.names:
+        np.testing.assert_array_equal(records[name], expected[name])
+
+
+def test_scene_tables_match_objects(dataset_root):
+    scene = Infra3DRC(dataset_root, 2)
+    detections, points = scene_tables(scene)
+    rows, point_rows = [], []
+    for idx, frame in enumerate(scene):
+        for obj in frame.objects:
+            num_points = 0 if obj.points is None else obj.points.shape[0]
+            rows.append((idx, obj.det_id, obj.category_id, obj.track_id, -1 if obj.instance_id is None else obj.instance_id, num_points))
+            point_rows.extend((idx, obj.det_id, float(point.rcs)) for point in ([] if obj.points is None else obj.points))
+    assert np.all(detections["scene"] == 2)
+    assert list(zip(*(detections[name].tolist() for name in ("frame", "det_id", "category_id", "track_id", "instance_id", "num_points")))) == rows
+    assert list(zip(points["frame"].tolist(), points["det_id"].tolist(), points["rcs"].astype(np.float64).tolist())) == point_rows
+
+
+@pytest.mark.parametrize("fmt", ["npz", "parquet"])
+def test_columnar_round_trip(dataset_root, tmp_path, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    dataset = Infra3DRCDataset(dataset_root)
+    stats = dataset.export_columnar(tmp_path, fmt=fmt, workers=2, backend="thread")
+    expected = [scene_tables(dataset.scene(scene_number)) for scene_number in dataset.scene_numbers]
+    assert stats.num_shards == 4
+    assert stats.num_detections == sum(detections.shape[0] for detections, _ in expected)
+
+    assert_records_equal(read_table(tmp_path), np.concatenate([detections for detections, _ in expected]))
+    assert_records_equal(read_table(tmp_path, "radar_points"), np.concatenate([points for _, points in expected]))
+    # a subset of the scenes and columns.
+    selected = read_table(tmp_path, "detections", scene_numbers=[2], columns=["category_id", "bbox"])
+    assert selected.dtype.names == ("category_id", "bbox")
+    np.testing.assert_array_equal(selected.category_id, expected[1][0]["category_id"])
+    np.testing.assert_array_equal(selected.bbox, expected[1][0]["bbox"])
+    with pytest.raises(AssertionError):
+        read_table(tmp_path, "detections", scene_numbers=[3])
+
+
+def test_columnar_shards_are_replaced(dataset_root, tmp_path):
+    pytest.importorskip("pyarrow")
+    dataset = Infra3DRCDataset(dataset_root)
+    dataset.export_columnar(tmp_path, fmt="parquet", workers=1, backend="thread")
+    dataset.export_columnar(tmp_path, fmt="npz", scene_numbers=[1], workers=1, backend="thread")
+    assert sorted(path.name for path in tmp_path.joinpath("detections").iterdir()) == ["scene-01.npz", "scene-02.parquet"]
+    assert len(read_table(tmp_path)) == sum(len(dataset.scene(scene_number).detections) for scene_number in (1, 2))
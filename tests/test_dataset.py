@@ -0,0 +1,98 @@
+import numpy as np
+
+from infra_3drc import Infra3DRC, Infra3DRCDataset
+from infra_3drc.dataset import MANIFEST_NAME
+
+
+def indexed_scenes(monkeypatch):
+    """records the scene numbers indexed by Infra3DRCDataset._index_scene."""
+    indexed = []
+    index_scene = Infra3DRCDataset._index_scene
+
+    def record(self, scene_number):
+        indexed.append(scene_number)
+        return index_scene(self, scene_number)
+
+    monkeypatch.setattr(Infra3DRCDataset, "_index_scene", record)
+    return indexed
+
+
+def test_manifest_is_reused(dataset_root, monkeypatch):
+    Infra3DRCDataset(dataset_root)
+    assert dataset_root.joinpath(MANIFEST_NAME).is_file()
+    indexed = indexed_scenes(monkeypatch)
+    dataset = Infra3DRCDataset(dataset_root)
+    assert indexed == []
+    assert dataset.scene_numbers == [1, 2]
+
+
+def test_manifest_invalidated_by_replaced_annotation(dataset_root, monkeypatch, set_category):
+    Infra3DRCDataset(dataset_root)
+    scene_path = Infra3DRC(dataset_root, 1).scene_path
+    set_category(scene_path, 0, 2, in_place=False)
+
+    indexed = indexed_scenes(monkeypatch)
+    dataset = Infra3DRCDataset(dataset_root)
+    # only the modified scene is indexed again.
+    assert indexed == [1]
+    assert np.flatnonzero(dataset.category_mask[0]).tolist() == [2]
+    # frames of scene 1 with category 2, from the manifest and from the annotations.
+    expected = [idx for idx in range(3) if 2 in Infra3DRC(dataset_root, 1)[idx].detections.category_id]
+    assert dataset.filter(category=2, scene_numbers=[1]).tolist() == expected
+
+
+def test_manifest_in_place_annotation_edit_needs_rebuild(dataset_root, monkeypatch, set_category):
+    category_mask = Infra3DRCDataset(dataset_root).category_mask
+    set_category(Infra3DRC(dataset_root, 1).scene_path, 0, 2)
+
+    # only the directories are stat'ed, the manifest is reused.
+    indexed = indexed_scenes(monkeypatch)
+    assert np.array_equal(Infra3DRCDataset(dataset_root).category_mask, category_mask)
+    assert indexed == []
+    dataset = Infra3DRCDataset(dataset_root, rebuild=True)
+    assert indexed == [1, 2]
+    assert np.flatnonzero(dataset.category_mask[0]).tolist() == [2]
+
+
+def test_manifest_invalidated_by_added_frame(dataset_root, monkeypatch):
+    Infra3DRCDataset(dataset_root)
+    scene_path = Infra3DRC(dataset_root, 2).scene_path
+    image_dir = scene_path.joinpath("camera_01", "camera_01__data")
+    image_dir.joinpath("000003.png").write_bytes(image_dir.joinpath("000000.png").read_bytes())
+
+    indexed = indexed_scenes(monkeypatch)
+    Infra3DRCDataset(dataset_root)
+    assert indexed == [2]
+
+
+def test_global_indexing(dataset_root):
+    dataset = Infra3DRCDataset(dataset_root)
+    assert len(dataset) == 6
+    assert dataset.locate(4) == (2, 1)
+    assert dataset.locate(-1) == (2, 2)
+    assert dataset[4].image_id == Infra3DRC(dataset_root, 2)[1].image_id
+
+
+def test_manifest_frames_match_scenes(dataset_root):
+    Infra3DRCDataset(dataset_root)
+    # the second dataset is built from the manifest only.
+    dataset = Infra3DRCDataset(dataset_root)
+    for scene_number in dataset.scene_numbers:
+        scene = Infra3DRC(dataset_root, scene_number)
+        from_manifest = dataset.scene(scene_number)
+        assert len(from_manifest) == len(scene)
+        for frame, expected in zip(from_manifest, scene):
+            assert frame.image_path == expected.image_path
+            assert frame.lidar_pcd_path == expected.lidar_pcd_path
+            assert frame.image_id == expected.image_id
+            assert frame.radar_annot_dtype == expected.radar_annot_dtype
+            assert frame.image_shape == expected.image_shape
+
+
+def test_filter_by_category(dataset_root):
+    dataset = Infra3DRCDataset(dataset_root)
+    frame_categories = [{obj.category_id for obj in frame.objects} for frame in dataset]
+    for category in range(1, 9):
+        expected = [idx for idx, categories in enumerate(frame_categories) if category in categories]
+        assert dataset.filter(category=category).tolist() == expected
+    assert dataset.filter(scene_numbers=[2]).tolist() == [3, 4, 5]
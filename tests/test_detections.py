@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC, ModalityCache
+from infra_3drc.class_names import INFRA_ID_TO_CLASS
+
+SCALAR_COLUMNS = ("image_id", "det_id", "category_id", "track_id", "instance_id")
+
+
+def assert_tables_equal(table, expected):
+    assert len(table) == len(expected)
+    for name in SCALAR_COLUMNS + ("bbox",):
+        np.testing.assert_array_equal(getattr(table, name), getattr(expected, name))
+    np.testing.assert_array_equal(table.num_points, expected.num_points)
+    for start, stop, expected_start, expected_stop in zip(
+        table.points_start, table.points_stop, expected.points_start, expected.points_stop
+    ):
+        np.testing.assert_array_equal(table.points[start:stop], expected.points[expected_start:expected_stop])
+
+
+def test_frame_table_matches_objects(dataset_root):
+    for frame in Infra3DRC(dataset_root, 1):
+        table = frame.detections
+        objects = frame.objects
+        assert len(table) == len(objects) > 0
+        for idx, obj in enumerate(objects):
+            row = table[idx]
+            for name in SCALAR_COLUMNS:
+                assert getattr(row, name) == getattr(obj, name)
+            np.testing.assert_array_equal(row.bbox, obj.bbox)
+            if obj.points is None:
+                assert row.points is None and table.num_points[idx] == 0
+            else:
+                np.testing.assert_array_equal(row.points, obj.points)
+                assert table.num_points[idx] == obj.points.shape[0]
+        # objects without radar points have -1 ids in the table.
+        no_points = np.array([obj.instance_id is None for obj in objects])
+        np.testing.assert_array_equal(table.instance_id == -1, no_points)
+
+
+def test_table_filter(dataset_root):
+    table = Infra3DRC(dataset_root, 2)[0].detections
+    category_id = int(table.category_id[0])
+    name = INFRA_ID_TO_CLASS[str(category_id)]["name"]
+    selected = table.filter(name)
+    assert len(selected) == int(np.sum(table.category_id == category_id))
+    assert np.all(selected.category_names == name)
+    assert_tables_equal(table.filter([category_id]), selected)
+    with pytest.raises(AssertionError):
+        table.filter("spaceship")
+
+
+@pytest.mark.parametrize("from_cache", [False, True])
+def test_scene_table(dataset_root, tmp_path, from_cache):
+    scene = Infra3DRC(dataset_root, 1)
+    if from_cache:
+        scene.build_cache(tmp_path)
+        scene = Infra3DRC.from_cache(tmp_path)
+    frames = [Infra3DRC(dataset_root, 1)[idx] for idx in range(len(scene))]
+    detections = scene.detections
+    assert detections.frame.tolist() == [idx for idx, frame in enumerate(frames) for _ in range(len(frame.detections))]
+    for idx, frame in enumerate(frames):
+        assert_tables_equal(detections[detections.frame == idx], frame.detections)
+        assert_tables_equal(scene[idx].detections, frame.detections)
+
+
+def test_batch_tables_are_evicted(dataset_root):
+    expected = [frame.detections for frame in Infra3DRC(dataset_root, 1)]
+    # a budget for about one table, while the batch holds every frame.
+    budget = max(table.points.nbytes + table.bbox.nbytes + 64 * len(table) for table in expected) + 1
+    cache = ModalityCache({"objects": budget})
+    batch = Infra3DRC(dataset_root, 1, modality_cache=cache)[:]
+    for _ in range(2):
+        for frame, table in zip(batch, expected):
+            assert_tables_equal(frame.detections, table)
+            assert frame._detections is None and frame._camera_annot_dict is None
+    stats = cache.stats()["objects"]
+    assert stats.evictions > 0 and 0 < stats.entries < len(batch)
+    assert stats.nbytes <= budget
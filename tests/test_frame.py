@@ -0,0 +1,125 @@
+import json
+import sys
+
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC
+from conftest import RADAR_FIELDS, rewrite_json
+
+
+def read_json(json_path) -> dict:
+    with open(str(json_path), "r") as f:
+        return json.load(f)
+
+
+def test_frames_are_created_without_annotations(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+    scene.camera_annot_paths_list[1].unlink()
+    scene.radar_annot_paths_list[1].unlink()
+
+    # the annotation jsons are only read when the annotations are accessed.
+    frame = scene[1]
+    assert frame.radar_point_cloud.shape[0] > 0
+    with pytest.raises(AssertionError):
+        frame.objects
+
+
+def test_frame_annotations(dataset_root):
+    frame = Infra3DRC(dataset_root, 2)[1]
+    camera_annot = read_json(frame.image_json_path)
+    assert frame.camera_annot_dict == camera_annot
+    assert frame.radar_annot_dict == read_json(frame.radar_json_path)
+    assert frame.image_id == camera_annot["image"]["id"] == 2001
+    assert [obj.det_id for obj in frame.objects] == [c_obj["det_id"] for c_obj in camera_annot["annotations"]]
+    # parsed once.
+    assert frame.objects is frame.objects
+
+
+def assert_objects_match_annotations(frame) -> None:
+    """objects of the frame against a plain scan of the radar objects for each camera object."""
+    camera_objects = read_json(frame.image_json_path)["annotations"]
+    radar_objects = read_json(frame.radar_json_path)["objects"]
+    assert len(frame.objects) == len(camera_objects)
+    for obj, c_obj in zip(frame.objects, camera_objects):
+        assert (obj.image_id, obj.det_id, obj.category_id, obj.track_id) == (
+            c_obj["image_id"],
+            c_obj["det_id"],
+            c_obj["category_id"],
+            c_obj["track_id"],
+        )
+        np.testing.assert_allclose(obj.bbox, c_obj["bbox"])
+        r_objects = [r_obj for r_obj in radar_objects if r_obj["det_id"] == c_obj["det_id"]]
+        if not r_objects or not r_objects[0]["points"]:
+            assert obj.instance_id is None and obj.points is None
+            continue
+        assert obj.instance_id == r_objects[0]["instance_id"]
+        expected = np.array([tuple(point) for point in r_objects[0]["points"]], dtype=obj.points.dtype)
+        for name in expected.dtype.names:
+            np.testing.assert_array_equal(obj.points[name], expected[name])
+
+
+def test_objects_match_radar_objects_by_det_id(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+    for frame in scene:
+        assert_objects_match_annotations(frame)
+        assert any(obj.points is not None for obj in frame.objects)
+        assert any(obj.points is None for obj in frame.objects)
+
+
+def test_objects_match_unordered_radar_objects(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+    num_without_points = sum(obj.points is None for obj in scene[0].objects)
+
+    def shuffle_objects(content):
+        # radar objects in reverse order, and an object without points, which is not matched.
+        content["objects"] = content["objects"][::-1]
+        content["objects"][0]["points"] = []
+
+    rewrite_json(scene.radar_annot_paths_list[0], shuffle_objects)
+    frame = scene[0]
+    assert_objects_match_annotations(frame)
+    assert sum(obj.points is None for obj in frame.objects) == num_without_points + 1
+
+
+def test_radar_annot_dtype_is_parsed_once_per_scene(dataset_root, monkeypatch):
+    parsed = []
+    for module_name in ("infra_3drc.Infra3DRC", "infra_3drc.frame"):
+        module = sys.modules[module_name]
+        parse = module.parse_radar_annot_dtype
+        monkeypatch.setattr(module, "parse_radar_annot_dtype", lambda metadata, parse=parse: parsed.append(metadata) or parse(metadata))
+
+    frames = list(Infra3DRC(dataset_root, 1))
+    for frame in frames:
+        frame.objects
+    assert len(parsed) == 1
+    radar_annot_dtype = frames[0].radar_annot_dtype
+    assert radar_annot_dtype.names == ("index",) + tuple(RADAR_FIELDS)
+    assert all(frame.radar_annot_dtype is radar_annot_dtype for frame in frames)
+    assert all(obj.points.dtype == radar_annot_dtype for frame in frames for obj in frame if obj.points is not None)
+
+
+@pytest.mark.parametrize("image_shape", [None, (12, 16)])
+def test_radar_background_cloud(dataset_root, image_shape):
+    scene = Infra3DRC(dataset_root, 1)
+    # half of the background points are unlabeled.
+    rewrite_json(scene.radar_annot_paths_list[0], lambda content: content.update(background=content["background"][::2]))
+    frame = scene[0]
+    if image_shape is not None:
+        # a smaller image leaves some of the radar points outside the camera fov.
+        frame._image_shape = image_shape
+
+    raw_cloud = frame.project_cloud_to_camera("radar", frame.radar_point_cloud)
+    rows, cols = frame.image_shape
+    outside = ~((raw_cloud.u > 0) & (raw_cloud.v > 0) & (raw_cloud.u < cols) & (raw_cloud.v < rows))
+    labeled = np.isin(raw_cloud.index, [point[0] for point in read_json(frame.radar_json_path)["background"]])
+    expected = raw_cloud[labeled | outside]
+    assert 0 < expected.shape[0] < raw_cloud.shape[0]
+    if image_shape is not None:
+        assert np.any(outside & ~labeled)
+
+    background = frame.radar_background_cloud
+    assert background.dtype.names == raw_cloud.dtype.names
+    # in point index order, without duplicates.
+    assert np.all(np.diff(background.index.astype(np.int64)) > 0)
+    np.testing.assert_array_equal(background, expected)
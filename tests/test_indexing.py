@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC, Infra3DRCDataset
+from infra_3drc.batch import FrameBatch
+from conftest import NUM_FRAMES
+
+# Frame attributes, in the order of the sensor directories of a scene.
+PATH_ATTRIBUTES = ("image_path", "radar_pcd_path", "image_json_path", "radar_json_path", "lidar_pcd_path")
+SENSOR_DIRS = (
+    ("camera_01", "camera_01__data"),
+    ("radar_01", "radar_01__data"),
+    ("camera_01", "camera_01__annotation"),
+    ("radar_01", "radar_01__annotation"),
+    ("lidar_01", "lidar_01__data"),
+)
+
+
+def baseline_paths(scene_path):
+    """frame paths like the original Infra3DRC: the sorted files of each sensor directory, zipped."""
+    return list(zip(*(sorted(scene_path.joinpath(*sensor_dir).iterdir()) for sensor_dir in SENSOR_DIRS)))
+
+
+def frame_paths(frame):
+    return tuple(getattr(frame, name) for name in PATH_ATTRIBUTES)
+
+
+def test_scene_indexing_matches_baseline(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+    expected = baseline_paths(scene.scene_path)
+    assert len(scene) == len(expected) == NUM_FRAMES
+
+    for idx in range(-NUM_FRAMES, NUM_FRAMES):
+        assert frame_paths(scene[idx]) == expected[idx]
+        assert frame_paths(scene[np.int64(idx)]) == expected[idx]
+    assert [frame_paths(frame) for frame in scene] == expected
+    with pytest.raises(IndexError):
+        scene[NUM_FRAMES]
+
+    # the original returned a list of frames for a tuple of indices.
+    batch = scene[(2, 0)]
+    assert isinstance(batch, list) and isinstance(batch, FrameBatch)
+    assert [frame_paths(frame) for frame in batch] == [expected[2], expected[0]]
+
+
+@pytest.mark.parametrize(
+    "indices, expected_indices",
+    [
+        ((2, 0, -1), [2, 0, -1]),
+        ([1, 2], [1, 2]),
+        (np.array([2, 1]), [2, 1]),
+        (slice(None, None, -1), [2, 1, 0]),
+        (slice(1, None), [1, 2]),
+        (np.array([True, False, True]), [0, 2]),
+        ([], []),
+    ],
+)
+def test_scene_batch_indexing(dataset_root, indices, expected_indices):
+    scene = Infra3DRC(dataset_root, 1)
+    expected = baseline_paths(scene.scene_path)
+    batch = scene[indices]
+    assert isinstance(batch, FrameBatch)
+    assert [frame_paths(frame) for frame in batch] == [expected[idx] for idx in expected_indices]
+
+
+def test_batch_point_clouds_match_frames(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+    batch = scene[(2, 0)]
+    cloud, offsets = batch.radar_point_cloud, batch.radar_offsets
+    for position, idx in enumerate((2, 0)):
+        frame_cloud = scene[idx].radar_point_cloud
+        points = cloud[offsets[position] : offsets[position + 1]]
+        assert np.all(points.frame == position)
+        for name in frame_cloud.dtype.names:
+            np.testing.assert_array_equal(points[name], frame_cloud[name])
+
+
+def test_batch_camera_images_are_stacked_once(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+    batch = scene[(2, 0)]
+    images = batch.camera_image
+    assert images.shape == (2,) + scene[0].camera_image.shape
+    assert batch.camera_image is images
+    for position, idx in enumerate((2, 0)):
+        np.testing.assert_array_equal(images[position], scene[idx].camera_image)
+
+
+def test_dataset_indexing_matches_scenes(dataset_root):
+    dataset = Infra3DRCDataset(dataset_root)
+    expected = [paths for scene_number in dataset.scene_numbers for paths in baseline_paths(dataset.scene(scene_number).scene_path)]
+    assert len(dataset) == len(expected)
+    for idx in range(-len(expected), len(expected)):
+        assert frame_paths(dataset[idx]) == expected[idx]
+    assert [frame_paths(frame) for frame in dataset] == expected
+    assert [frame_paths(frame) for frame in dataset[::-2]] == expected[::-2]
+    with pytest.raises(IndexError):
+        dataset[len(expected)]
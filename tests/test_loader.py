@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC
+from infra_3drc.loader import BatchSampler, FrameLoader
+
+
+def rank_batches(num_indices, batch_size, world_size, epoch=0, **kwargs):
+    """batches of each rank."""
+    batches = []
+    for rank in range(world_size):
+        sampler = BatchSampler(num_indices, batch_size, rank=rank, world_size=world_size, **kwargs)
+        sampler.set_epoch(epoch)
+        batches.append([batch.tolist() for batch in sampler])
+        assert len(sampler) == len(batches[-1])
+    return batches
+
+
+@pytest.mark.parametrize("world_size", [1, 2, 3, 4])
+@pytest.mark.parametrize("num_indices", [1, 7, 10, 12])
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_sampler_covers_all_indices(world_size, num_indices, shuffle):
+    batches = rank_batches(num_indices, 3, world_size, shuffle=shuffle)
+    rank_indices = [[idx for batch in rank for idx in batch] for rank in batches]
+    # every rank gets the same number of batches and indices, and together they cover all the indices.
+    assert len({len(rank) for rank in batches}) == 1
+    assert len({len(indices) for indices in rank_indices}) == 1
+    assert sorted(set(idx for indices in rank_indices for idx in indices)) == list(range(num_indices))
+    # only the padding is sampled twice.
+    assert sum(map(len, rank_indices)) == num_indices + (-num_indices) % world_size
+    if not shuffle and world_size == 1:
+        assert rank_indices[0] == list(range(num_indices))
+
+
+@pytest.mark.parametrize("world_size", [1, 2, 3, 4])
+@pytest.mark.parametrize("num_indices", [1, 7, 10, 12])
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_sampler_drop_last(world_size, num_indices, shuffle):
+    batch_size = 2
+    batches = rank_batches(num_indices, batch_size, world_size, shuffle=shuffle, drop_last=True)
+    rank_indices = [[idx for batch in rank for idx in batch] for rank in batches]
+    # disjoint full batches, the same number on every rank.
+    assert all(len(batch) == batch_size for rank in batches for batch in rank)
+    assert len({len(rank) for rank in batches}) == 1
+    sampled = [idx for indices in rank_indices for idx in indices]
+    assert len(sampled) == len(set(sampled))
+    assert len(batches[0]) == num_indices // world_size // batch_size
+
+
+def test_sampler_shuffle_depends_on_seed_and_epoch():
+    indices = np.arange(100, 150)
+    orders = {}
+    for seed, epoch in [(0, 0), (0, 1), (1, 0)]:
+        samplers = [BatchSampler(indices, 4, shuffle=True, seed=seed, rank=rank, world_size=2) for rank in range(2)]
+        for sampler in samplers:
+            sampler.set_epoch(epoch)
+        orders[seed, epoch] = [np.concatenate(list(sampler)).tolist() for sampler in samplers]
+        again = BatchSampler(indices, 4, shuffle=True, seed=seed, rank=0, world_size=2)
+        again.set_epoch(epoch)
+        assert np.concatenate(list(again)).tolist() == orders[seed, epoch][0]
+        # the ranks take every other index of the same permutation.
+        assert sorted(orders[seed, epoch][0] + orders[seed, epoch][1]) == indices.tolist()
+    assert orders[0, 0] != orders[0, 1]
+    assert orders[0, 0] != orders[1, 0]
+
+
+def test_sampler_invalid_arguments():
+    with pytest.raises(AssertionError):
+        BatchSampler(10, 0)
+    with pytest.raises(AssertionError):
+        BatchSampler(10, 2, rank=2, world_size=2)
+
+
+def test_loader_batches_match_frames(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+    loader = FrameLoader(scene, batch_size=2, workers=1, fields=("radar_point_cloud",))
+    assert len(loader) == 2
+    frame_indices = []
+    for batch in loader:
+        frame_indices.extend(batch.indices.tolist())
+        offsets = batch.offsets("radar")
+        for position, idx in enumerate(batch.indices):
+            frame_cloud = scene[int(idx)].radar_point_cloud
+            points = batch.clouds["radar"][offsets[position] : offsets[position + 1]]
+            for col, name in enumerate(batch.cloud_fields["radar"]):
+                np.testing.assert_array_equal(points[:, col], frame_cloud[name].astype(np.float32))
+    assert frame_indices == list(range(len(scene)))
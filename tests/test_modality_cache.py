@@ -0,0 +1,96 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC, ModalityCache
+
+
+def test_lru_eviction_within_budget():
+    cache = ModalityCache({"camera_image": 250})
+    arrays = {key: np.full(100, ord(key), dtype=np.uint8) for key in "abc"}
+    loads = []
+
+    def get(key):
+        return cache.get_or_load("camera_image", key, lambda: loads.append(key) or arrays[key])
+
+    assert get("a") is arrays["a"] and get("b") is arrays["b"]
+    # "a" is used again, so "b" is the least recently used entry when "c" is added.
+    assert get("a") is arrays["a"]
+    assert get("c") is arrays["c"]
+    assert get("a") is arrays["a"]
+    get("b")
+    assert loads == ["a", "b", "c", "b"]
+    stats = cache.stats()["camera_image"]
+    assert (stats.hits, stats.misses, stats.evictions, stats.entries, stats.nbytes) == (2, 4, 2, 2, 200)
+
+
+def test_values_larger_than_budget_are_not_stored():
+    cache = ModalityCache(50)
+    value = np.zeros(100, dtype=np.uint8)
+    assert cache.get_or_load("lidar_point_cloud", "a", lambda: value) is value
+    assert cache.stats()["lidar_point_cloud"].entries == 0
+
+
+def test_modality_budgets():
+    cache = ModalityCache({"radar_point_cloud": 1000})
+    assert cache.handles("radar_point_cloud")
+    assert not cache.handles("camera_image")
+    with pytest.raises(AssertionError):
+        ModalityCache({"sonar": 1000})
+    # a pickled cache starts empty, with the same budgets.
+    cache.get_or_load("radar_point_cloud", "a", lambda: np.zeros(10))
+    unpickled = pickle.loads(pickle.dumps(cache))
+    assert unpickled.max_bytes == cache.max_bytes
+    assert unpickled.stats()["radar_point_cloud"].entries == 0
+
+
+def test_frames_share_the_cache(dataset_root):
+    cache = ModalityCache(2**20)
+    scene = Infra3DRC(dataset_root, 1, modality_cache=cache)
+    cloud = scene[0].radar_point_cloud
+    # a new frame object of the same frame gets the cached cloud.
+    frame = scene[0]
+    assert frame.radar_point_cloud is cloud
+    # the frames do not keep the data themselves.
+    assert frame._radar_point_cloud is None
+    image = frame.camera_image
+    assert frame._camera_image is None and scene[0].camera_image is image
+    objects = frame.objects
+    assert scene[0].objects is objects
+    stats = cache.stats()
+    assert stats["radar_point_cloud"].hits == 1 and stats["camera_image"].hits == 1 and stats["objects"].hits == 1
+
+
+def test_frames_evicted_from_the_cache(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+    clouds = [frame.lidar_point_cloud for frame in scene]
+    # room for the lidar cloud of a single frame.
+    cache = ModalityCache({"lidar_point_cloud": clouds[0].nbytes})
+    scene = Infra3DRC(dataset_root, 1, modality_cache=cache)
+    frames = list(scene)
+    for frame, cloud in zip(frames, clouds):
+        np.testing.assert_array_equal(frame.lidar_point_cloud, cloud)
+    stats = cache.stats()["lidar_point_cloud"]
+    assert (stats.entries, stats.evictions) == (1, len(frames) - 1)
+    # the frames are not kept alive by the cache, the evicted clouds are decoded again.
+    np.testing.assert_array_equal(frames[0].lidar_point_cloud, clouds[0])
+    assert cache.stats()["lidar_point_cloud"].misses == len(frames) + 1
+
+
+def test_frames_keep_no_annotations_with_a_cache(dataset_root):
+    cache = ModalityCache({"objects": 2**20})
+    scene = Infra3DRC(dataset_root, 1, modality_cache=cache)
+    frame = scene[0]
+    detections, objects = frame.detections, frame.objects
+    # the table and the objects are kept in the cache only, the parsed jsons are released.
+    assert frame._detections is None and frame._objects is None
+    assert frame._camera_annot_dict is None and frame._radar_annot_dict is None
+    assert scene[0].detections is detections and scene[0].objects is objects
+    stats = cache.stats()["objects"]
+    assert stats.entries == 2 and stats.misses == 2
+    assert stats.nbytes >= detections.points.nbytes + detections.bbox.nbytes
+
+    # without a cache, the frame keeps them.
+    frame = Infra3DRC(dataset_root, 1)[0]
+    assert frame.detections is frame._detections and frame.objects is frame._objects
@@ -0,0 +1,171 @@
+import struct
+import sys
+
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC
+from infra_3drc.pcd import read_pcd, _lzf_decompress
+from conftest import RADAR_FIELDS, pcd_header
+
+# fields of the test clouds. PAD bytes are skipped by the decoder.
+FIELDS = ["x", "y", "z", "PAD", "intensity", "ring"]
+SIZES = [4, 4, 4, 4, 4, 1]
+TYPES = ["F", "F", "F", "U", "F", "U"]
+CLOUD_DTYPE = np.dtype([("x", "<f4"), ("y", "<f4"), ("z", "<f4"), ("intensity", "<f4"), ("ring", "u1")])
+
+
+def lzf_compress(data: bytes) -> bytes:
+    """greedy LZF compressor, with literal runs and (possibly overlapping) back references of 3 to 264 bytes."""
+    out, literal, last_position, i = bytearray(), bytearray(), {}, 0
+
+    def flush_literal():
+        for start in range(0, len(literal), 32):
+            chunk = literal[start : start + 32]
+            out.append(len(chunk) - 1)
+            out.extend(chunk)
+        literal.clear()
+
+    while i < len(data):
+        key = data[i : i + 3]
+        ref = last_position.get(key) if len(key) == 3 else None
+        if len(key) == 3:
+            last_position[key] = i
+        if ref is None or i - ref > 8192:
+            literal.append(data[i])
+            i += 1
+            continue
+        length = 3
+        while i + length < len(data) and length < 264 and data[ref + length] == data[i + length]:
+            length += 1
+        flush_literal()
+        offset, length_code = i - ref - 1, length - 2
+        if length_code < 7:
+            out.extend([(length_code << 5) | (offset >> 8), offset & 0xFF])
+        else:
+            out.extend([(7 << 5) | (offset >> 8), length_code - 7, offset & 0xFF])
+        i += length
+    flush_literal()
+    return bytes(out)
+
+
+def random_cloud(num_points: int) -> np.ndarray:
+    rng = np.random.default_rng(num_points)
+    cloud = np.empty(num_points, dtype=CLOUD_DTYPE)
+    for name in ("x", "y", "z", "intensity"):
+        # rounded values, so the ascii cloud is exact, and repeated values, so the compressed cloud has back references.
+        cloud[name] = np.round(rng.choice(rng.uniform(-50, 50, 8), num_points), 3)
+    cloud["ring"] = rng.integers(0, 64, num_points)
+    return cloud
+
+
+def write_pcd(path, cloud: np.ndarray, data: str) -> None:
+    columns = [cloud["x"], cloud["y"], cloud["z"], np.zeros(cloud.shape[0], "<u4"), cloud["intensity"], cloud["ring"]]
+    with open(str(path), "wb") as f:
+        f.write(pcd_header(FIELDS, SIZES, TYPES, cloud.shape[0], data))
+        if data == "ascii":
+            for row in zip(*columns):
+                f.write((" ".join(str(value) for value in row) + "\n").encode())
+        elif data == "binary":
+            points = np.empty(cloud.shape[0], dtype=[(f"f{i}", column.dtype) for i, column in enumerate(columns)])
+            for i, column in enumerate(columns):
+                points[f"f{i}"] = column
+            f.write(points.tobytes())
+        else:
+            # binary_compressed stores the fields column wise.
+            uncompressed = b"".join(column.tobytes() for column in columns)
+            compressed = lzf_compress(uncompressed)
+            f.write(struct.pack("<II", len(compressed), len(uncompressed)) + compressed)
+
+
+def assert_cloud_equal(decoded: np.ndarray, cloud: np.ndarray) -> None:
+    assert decoded.dtype.names == CLOUD_DTYPE.names
+    for name in CLOUD_DTYPE.names:
+        np.testing.assert_array_equal(decoded[name], cloud[name])
+
+
+@pytest.mark.parametrize("data", ["ascii", "binary", "binary_compressed"])
+@pytest.mark.parametrize("num_points", [0, 1, 1000])
+def test_pcd_round_trip(tmp_path, monkeypatch, data, num_points):
+    # the python LZF decoder is used even if the lzf package is installed.
+    monkeypatch.setitem(sys.modules, "lzf", None)
+    cloud = random_cloud(num_points)
+    pcd_path = tmp_path.joinpath(f"{data}.pcd")
+    write_pcd(pcd_path, cloud, data)
+    assert_cloud_equal(read_pcd(pcd_path), cloud)
+    if data == "binary":
+        assert_cloud_equal(read_pcd(pcd_path, mmap=True), cloud)
+
+
+def test_pcd_unknown_header_line_warns(tmp_path):
+    cloud = random_cloud(10)
+    pcd_path = tmp_path.joinpath("binary.pcd")
+    write_pcd(pcd_path, cloud, "binary")
+    content = pcd_path.read_bytes()
+    pcd_path.write_bytes(content.replace(b"VERSION 0.7\n", b"VERSION 0.7\n?? unknown\n", 1))
+    with pytest.warns(UserWarning, match="can't understand pcd header line: \\?\\? unknown"):
+        decoded = read_pcd(pcd_path)
+    assert_cloud_equal(decoded, cloud)
+
+
+def test_pcd_type_string(tmp_path):
+    cloud = random_cloud(10)
+    pcd_path = tmp_path.joinpath("binary.pcd")
+    write_pcd(pcd_path, cloud, "binary")
+    assert_cloud_equal(read_pcd(pcd_path, "<fff4xfB"), cloud)
+
+
+def test_lzf_back_references(monkeypatch):
+    monkeypatch.setitem(sys.modules, "lzf", None)
+    # long runs give overlapping references and references longer than 8 bytes.
+    data = b"abc" * 200 + bytes(range(256)) + b"\x00" * 1000 + b"abcabd" * 50
+    compressed = lzf_compress(data)
+    assert len(compressed) < len(data)
+    assert _lzf_decompress(compressed, len(data)) == data
+    with pytest.raises(ValueError):
+        _lzf_decompress(compressed, len(data) + 1)
+
+
+def struct_decode(pcd_path, type_str: str, num_fields: int) -> list:
+    """points of a binary pcd decoded one by one with struct.unpack, like the original Frame._read_pcd."""
+    with open(str(pcd_path), "rb") as f:
+        content = f.read()
+    body = content[content.index(b"DATA binary\n") + len(b"DATA binary\n") :]
+    point_size = struct.calcsize(type_str)
+    return [struct.unpack(type_str, body[start : start + point_size]) for start in range(0, len(body), point_size)]
+
+
+def test_frame_clouds_match_struct_decoder(dataset_root):
+    frame = Infra3DRC(dataset_root, 1)[0]
+
+    points = struct_decode(frame.radar_pcd_path, frame.radar_typ_str, 8)
+    # radar points beyond 120 m in x are clipped, the index is the position in the pcd.
+    expected = [(index,) + point for index, point in enumerate(points) if point[5] <= 120]
+    radar = frame.radar_point_cloud
+    assert radar.dtype.names == ("index",) + tuple(RADAR_FIELDS)
+    np.testing.assert_array_equal(np.array(radar.tolist()), np.array(expected, dtype=np.float32))
+
+    points = struct_decode(frame.lidar_pcd_path, frame.lidar_typ_str, 9)
+    lidar = frame.lidar_point_cloud
+    assert lidar.dtype.names == ("index", "x", "y", "z", "intensity", "t", "reflectivity", "ring", "ambient", "range")
+    assert lidar["index"].tolist() == list(range(len(points)))
+    for col, name in enumerate(lidar.dtype.names[1:]):
+        np.testing.assert_array_equal(lidar[name], np.array([point[col] for point in points], dtype=lidar.dtype[name]))
+
+
+def test_frame_mmap_clouds(dataset_root):
+    frame = Infra3DRC(dataset_root, 1)[0]
+    mapped = Infra3DRC(dataset_root, 1, mmap=True)[0]
+
+    # the lidar cloud is a read-only view of the file, its index is kept as side array.
+    lidar = mapped.lidar_point_cloud
+    assert not lidar.flags.writeable
+    assert "index" not in lidar.dtype.names
+    np.testing.assert_array_equal(mapped.lidar_point_index, frame.lidar_point_cloud["index"])
+    for name in lidar.dtype.names:
+        np.testing.assert_array_equal(lidar[name], frame.lidar_point_cloud[name])
+
+    # the radar cloud is copied by the clipping, it keeps its index field.
+    assert mapped.radar_point_cloud.dtype.names == frame.radar_point_cloud.dtype.names
+    for name in frame.radar_point_cloud.dtype.names:
+        np.testing.assert_array_equal(mapped.radar_point_cloud[name], frame.radar_point_cloud[name])
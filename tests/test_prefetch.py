@@ -0,0 +1,95 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC, Infra3DRCDataset
+from infra_3drc.prefetch import map_ordered, prefetch_frames
+
+
+def recording_get_frame(scene, requested):
+    def get_frame(idx):
+        requested.append(idx)
+        return scene._get_frame(idx)
+
+    return get_frame
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_prefetch_frames_in_order(dataset_root, backend):
+    scene = Infra3DRC(dataset_root, 1)
+    fields = ("radar_point_cloud", "lidar_point_cloud", "objects")
+    frames = list(scene.iter_prefetch(workers=2, backend=backend, fields=fields))
+    assert [frame.image_path for frame in frames] == [frame.image_path for frame in scene]
+    for frame, expected in zip(frames, scene):
+        # the fields are decoded by the workers and kept in the frame.
+        assert frame._radar_point_cloud is not None and frame._lidar_point_cloud is not None
+        np.testing.assert_array_equal(frame.radar_point_cloud, expected.radar_point_cloud)
+        assert [obj.det_id for obj in frame.objects] == [obj.det_id for obj in expected.objects]
+
+
+def test_prefetch_depth_and_early_exit(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+    requested = []
+    frames = prefetch_frames(recording_get_frame(scene, requested), [2, 0, 1, 2, 0, 1], workers=1, depth=2)
+    assert next(frames).image_path == scene[2].image_path
+    # at most depth frames ahead of the consumer.
+    assert requested == [2, 0, 1]
+    frames.close()
+    assert requested == [2, 0, 1]
+
+
+def test_prefetch_errors_are_raised(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+
+    def get_frame(idx):
+        frame = scene._get_frame(idx)
+        if idx == 1:
+            frame.radar_pcd_path = Path(str(frame.radar_pcd_path) + ".missing")
+        return frame
+
+    frames = prefetch_frames(get_frame, range(3), workers=2, fields=("radar_point_cloud",))
+    assert next(frames).image_path == scene[0].image_path
+    with pytest.raises(AssertionError, match="No pcd found"):
+        next(frames)
+
+
+def test_dataset_prefetch_indices(dataset_root):
+    dataset = Infra3DRCDataset(dataset_root)
+    frames = list(dataset.iter_prefetch([4, 1], workers=2, fields=("objects",)))
+    assert [frame.image_id for frame in frames] == [dataset[4].image_id, dataset[1].image_id]
+
+
+def slow_square(value, delay):
+    time.sleep(delay)
+    return value * value
+
+
+def test_map_ordered_keeps_order():
+    # later calls finish first.
+    delays = [0.05, 0.03, 0.0, 0.02, 0.0]
+    results = list(map_ordered(slow_square, ((value, delay) for value, delay in enumerate(delays)), workers=3))
+    assert results == [value * value for value in range(len(delays))]
+
+
+def test_map_ordered_cancels_on_exit():
+    taken = []
+
+    def args():
+        for value in range(100):
+            taken.append(value)
+            yield value, 0.0
+
+    results = map_ordered(slow_square, args(), workers=1, depth=3)
+    assert next(results) == 0
+    results.close()
+    # the arguments are only taken when a result is yielded, and not after the loop is left.
+    assert taken == [0, 1, 2, 3]
+
+
+def test_map_ordered_raises_errors():
+    results = map_ordered(slow_square, [(1, 0.0), ("a", 0.0), (3, 0.0)], workers=2)
+    assert next(results) == 1
+    with pytest.raises(TypeError):
+        next(results)
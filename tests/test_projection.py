@@ -0,0 +1,64 @@
+import cv2
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC
+from infra_3drc.utils import read_png_shape
+from conftest import CAMERA_INTRINSICS, SENSOR_TO_CAMERA
+
+
+def reference_uv(cloud) -> np.ndarray:
+    """(n, 2) pixel position of each point, projected one by one."""
+    projection = np.array(CAMERA_INTRINSICS) @ np.array(SENSOR_TO_CAMERA)
+    uv = []
+    for point in cloud:
+        u, v, w = projection @ np.array([point["x"], point["y"], point["z"], 1.0], dtype=np.float64)
+        uv.append((u / w, v / w))
+    return np.array(uv)
+
+
+@pytest.mark.parametrize("mode", ["radar", "lidar"])
+@pytest.mark.parametrize("mmap", [False, True])
+def test_project_cloud_to_camera(dataset_root, mode, mmap):
+    frame = Infra3DRC(dataset_root, 1, mmap=mmap)[0]
+    cloud = frame.radar_point_cloud if mode == "radar" else frame.lidar_point_cloud
+    projected = frame.project_cloud_to_camera(mode, cloud)
+
+    # all the points are kept, with u and v as extra fields.
+    assert projected.dtype.names == cloud.dtype.names + ("u", "v")
+    for name in cloud.dtype.names:
+        np.testing.assert_array_equal(projected[name], cloud[name])
+    expected = reference_uv(cloud)
+    np.testing.assert_allclose(projected["u"], expected[:, 0], rtol=1e-5)
+    np.testing.assert_allclose(projected["v"], expected[:, 1], rtol=1e-5)
+
+    projected_32 = frame.project_cloud_to_camera(mode, cloud, dtype=np.float32)
+    np.testing.assert_allclose(projected_32["u"], expected[:, 0], rtol=1e-4)
+    assert frame.project_cloud_to_camera(mode, cloud[:0]) is None
+
+
+def test_png_shape_matches_decoded_image(dataset_root, tmp_path):
+    frame = Infra3DRC(dataset_root, 1)[0]
+    assert read_png_shape(frame.image_path) == cv2.imread(str(frame.image_path)).shape[:2]
+    not_png = tmp_path.joinpath("image.png")
+    not_png.write_bytes(b"\x00" * 32)
+    with pytest.raises(AssertionError):
+        read_png_shape(not_png)
+
+
+@pytest.mark.parametrize("mode", ["radar", "lidar"])
+def test_clip_point_cloud_to_camera_fov(dataset_root, mode):
+    frame = Infra3DRC(dataset_root, 1)[0]
+    cloud = frame.radar_point_cloud if mode == "radar" else frame.lidar_point_cloud
+    projected = frame.project_cloud_to_camera(mode, cloud)
+    clipped, kept = frame._clip_point_cloud_to_camera_fov(projected, return_indices=True)
+    # the image is not decoded to clip the cloud.
+    assert frame._camera_image is None
+
+    rows, cols = cv2.imread(str(frame.image_path)).shape[:2]
+    u, v = projected["u"], projected["v"]
+    expected = np.flatnonzero((u > 0) & (v > 0) & (u < cols) & (v < rows))
+    assert 0 < expected.shape[0] <= projected.shape[0]
+    np.testing.assert_array_equal(kept, expected)
+    np.testing.assert_array_equal(clipped, projected[expected])
+    np.testing.assert_array_equal(frame._clip_point_cloud_to_camera_fov(projected), clipped)
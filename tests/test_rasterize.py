@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC
+from infra_3drc.rasterize import POINT_RANGE, BEVRasterizer, Voxelizer
+
+
+def reference_cells(cloud, point_range, voxel_size):
+    """(n, 3) x, y, z voxel index of each point, and the mask of the points within the point range."""
+    cells = np.stack(
+        [
+            np.floor((cloud[name].astype(np.float32) - np.float32(lower)) / np.float32(size)).astype(np.int64)
+            for name, (lower, _), size in zip(("x", "y", "z"), point_range, voxel_size)
+        ],
+        axis=-1,
+    )
+    shape = np.round([(upper - lower) / size for (lower, upper), size in zip(point_range, voxel_size)]).astype(np.int64)
+    return cells, np.all((cells >= 0) & (cells < shape), axis=1)
+
+
+@pytest.fixture
+def radar_clouds(dataset_root):
+    return [frame.radar_point_cloud for frame in Infra3DRC(dataset_root, 1)]
+
+
+def test_voxelizer_matches_unique_voxels(radar_clouds):
+    voxel_size = (8.0, 4.0, 5.0)
+    voxelizer = Voxelizer(voxel_size=voxel_size, max_points=64)
+    voxels = voxelizer(radar_clouds, "radar")
+    assert voxels.fields == ("x", "y", "z", "rcs", "range_rate")
+    assert voxels.grid_shape == (4, 30, 15)
+
+    expected_coords, expected_counts = [], []
+    for position, cloud in enumerate(radar_clouds):
+        cells, inside = reference_cells(cloud, POINT_RANGE, voxel_size)
+        unique_cells, counts = np.unique(cells[inside][:, ::-1], axis=0, return_counts=True)
+        expected_coords.append(np.column_stack([np.full(len(counts), position), unique_cells]))
+        expected_counts.append(counts)
+        # the points of each voxel, in cloud order.
+        for (z, y, x), count in zip(unique_cells, counts):
+            voxel = np.flatnonzero(np.all(voxels.coords == [position, z, y, x], axis=1))
+            points = cloud[inside & np.all(cells == [x, y, z], axis=1)]
+            assert voxels.num_points[voxel[0]] == count
+            features = voxels.voxels[voxel[0], :count]
+            np.testing.assert_array_equal(features, np.stack([points[name] for name in voxels.fields], axis=-1))
+            assert not voxels.voxels[voxel[0], count:].any()
+    np.testing.assert_array_equal(voxels.coords, np.concatenate(expected_coords))
+    np.testing.assert_array_equal(voxels.num_points, np.concatenate(expected_counts))
+
+
+def test_voxelizer_limits(radar_clouds):
+    voxels = Voxelizer(voxel_size=(40.0, 40.0, 20.0), max_points=2, max_voxels=1)(radar_clouds, "radar")
+    assert voxels.coords[:, 0].tolist() == list(range(len(radar_clouds)))
+    assert np.all(voxels.num_points <= 2)
+    assert voxels.voxels.shape == (len(radar_clouds), 2, 5)
+
+
+def test_bev_matches_histogram(radar_clouds):
+    rasterizer = BEVRasterizer(resolution=4.0, features=("count", "mean_rcs", "max_z", "min_range_rate"))
+    grids = rasterizer(radar_clouds, "radar")
+    ny, nx = 30, 30
+    assert grids.shape == (len(radar_clouds), 4, ny, nx)
+
+    for cloud, grid in zip(radar_clouds, grids):
+        single = rasterizer(cloud, "radar")
+        np.testing.assert_array_equal(single, grid)
+        cells, inside = reference_cells(cloud, POINT_RANGE, (4.0, 4.0, 20.0))
+        cells, points = cells[inside], cloud[inside]
+        count, _, _ = np.histogram2d(cells[:, 1], cells[:, 0], bins=(ny, nx), range=((0, ny), (0, nx)))
+        np.testing.assert_array_equal(grid[0], count)
+        assert grid[0].sum() == inside.sum() > 0
+        for row, col in zip(*np.nonzero(count)):
+            cell_points = points[(cells[:, 1] == row) & (cells[:, 0] == col)]
+            np.testing.assert_allclose(grid[1, row, col], cell_points.rcs.astype(np.float64).mean(), rtol=1e-6)
+            assert grid[2, row, col] == cell_points.z.max()
+            assert grid[3, row, col] == cell_points.range_rate.min()
+        # empty cells are 0.
+        assert not grid[:, count == 0].any()
+
+
+def test_ground_frame_needs_calibration(dataset_root):
+    frame = Infra3DRC(dataset_root, 1)[0]
+    rasterizer = BEVRasterizer(ground=True)
+    with pytest.raises(AssertionError):
+        rasterizer(frame.lidar_point_cloud, "lidar")
+    grid = rasterizer(frame.lidar_point_cloud, "lidar", frame.calibration)
+    assert grid.shape == (3, 240, 240)
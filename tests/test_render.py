@@ -0,0 +1,87 @@
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC
+from infra_3drc.render import draw_points
+
+
+def reference_image(image, u, v, colors, radius):
+    """points drawn one by one with cv2.circle, like the original visualisation."""
+    image = image.copy()
+    for i in range(len(u)):
+        cv2.circle(image, (int(u[i]), int(v[i])), int(radius[i]), tuple(int(c) for c in colors[i]), -1)
+    return image
+
+
+def random_points(num_points, rows, cols, seed):
+    rng = np.random.default_rng(seed)
+    # some of the points are partially or fully outside of the image.
+    u = rng.uniform(-10, cols + 10, num_points)
+    v = rng.uniform(-10, rows + 10, num_points)
+    colors = rng.integers(0, 256, (num_points, 3), dtype=np.uint8)
+    return u, v, colors
+
+
+@pytest.mark.parametrize("radius", [2, 4, 5, 7])
+def test_draw_points_matches_cv2_circle(radius):
+    rows, cols = 40, 60
+    image = np.random.default_rng(radius).integers(0, 256, (rows, cols, 3), dtype=np.uint8)
+    # many overlapping points, the last drawn point wins.
+    u, v, colors = random_points(200, rows, cols, radius)
+    expected = reference_image(image, u, v, colors, np.full(len(u), radius))
+    drawn = draw_points(image.copy(), u, v, colors, radius)
+    np.testing.assert_array_equal(drawn, expected)
+
+
+def test_draw_points_per_point_radius_and_single_color():
+    rows, cols = 40, 60
+    image = np.zeros((rows, cols, 3), dtype=np.uint8)
+    u, v, colors = random_points(100, rows, cols, 0)
+    radius = np.random.default_rng(1).integers(0, 8, len(u))
+    np.testing.assert_array_equal(draw_points(image.copy(), u, v, colors, radius), reference_image(image, u, v, colors, radius))
+
+    color = np.array([10, 20, 30], dtype=np.uint8)
+    expected = reference_image(image, u, v, np.broadcast_to(color, colors.shape), radius)
+    np.testing.assert_array_equal(draw_points(image.copy(), u, v, color, radius), expected)
+
+
+def test_draw_points_outside_image():
+    image = np.zeros((10, 10, 3), dtype=np.uint8)
+    u = np.array([-20.0, 50.0, np.nan])
+    v = np.array([5.0, 5.0, 5.0])
+    drawn = draw_points(image, u, v, np.full((3, 3), 255, dtype=np.uint8), 3)
+    assert drawn is image
+    assert not drawn.any()
+    assert draw_points(image, u[:0], v[:0], np.zeros((0, 3), dtype=np.uint8), 3) is image
+
+
+@pytest.mark.parametrize("mode", ["radar", "lidar"])
+def test_visualise_cloud_on_camera_draws_points(dataset_root, mode):
+    frame = Infra3DRC(dataset_root, 1)[0]
+    image = getattr(frame, f"visualise_{mode}_cloud_on_camera")()
+    assert image.shape == frame.camera_image.shape
+    # the points are drawn on a copy of the camera image.
+    assert np.any(image != frame.camera_image)
+
+
+def test_objects_are_drawn_in_one_call(dataset_root, monkeypatch):
+    frame = Infra3DRC(dataset_root, 2)[0]
+    drawn = frame.render(("annotations",), alpha=1.0)
+    num_points = sum(obj.points.shape[0] for obj in frame.objects if obj.points is not None)
+    assert num_points > 0
+
+    calls = []
+
+    def reference_draw_points(image, u, v, colors, radius):
+        calls.append(len(u))
+        colors = np.broadcast_to(np.asarray(colors, dtype=np.uint8), (len(u), 3))
+        image[:] = reference_image(image, u, v, colors, np.broadcast_to(radius, len(u)))
+        return image
+
+    monkeypatch.setattr(sys.modules["infra_3drc.frame"], "draw_points", reference_draw_points)
+    # the points of all the objects are drawn with one call, with the same pixels as cv2.circle.
+    np.testing.assert_array_equal(frame.render(("annotations",), alpha=1.0), drawn)
+    assert calls == [num_points]
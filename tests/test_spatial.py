@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC
+from infra_3drc.spatial import VoxelIndex, cloud_xyz
+
+
+def random_points(num_points, seed):
+    rng = np.random.default_rng(seed)
+    # clustered points, so that the voxels hold different numbers of points.
+    centers = rng.uniform(-20, 20, (8, 3))
+    return centers[rng.integers(0, 8, num_points)] + rng.normal(0, 2, (num_points, 3))
+
+
+def brute_force_distances(points, queries):
+    return np.sqrt(((queries[:, None, :] - points[None, :, :]) ** 2).sum(axis=2))
+
+
+@pytest.mark.parametrize("voxel_size", [0.5, 2.0, 10.0])
+@pytest.mark.parametrize("radius", [0.5, 3.0, 7.5])
+def test_query_radius_matches_brute_force(voxel_size, radius):
+    points, queries = random_points(500, 0), random_points(60, 1)
+    # some queries far away from all the points.
+    queries[:5] += 100
+    indices, distances, offsets = VoxelIndex(points, voxel_size).query_radius(queries, radius, chunk_size=16)
+    all_distances = brute_force_distances(points, queries)
+    assert offsets.shape == (queries.shape[0] + 1,)
+    for i in range(queries.shape[0]):
+        found = indices[offsets[i] : offsets[i + 1]]
+        expected = np.flatnonzero(all_distances[i] <= radius)
+        assert sorted(found.tolist()) == expected.tolist()
+        np.testing.assert_allclose(distances[offsets[i] : offsets[i + 1]], all_distances[i, found])
+        # nearest first.
+        assert np.all(np.diff(distances[offsets[i] : offsets[i + 1]]) >= 0)
+
+
+@pytest.mark.parametrize("voxel_size", [0.5, 2.0, 10.0])
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_query_knn_matches_brute_force(voxel_size, k):
+    points, queries = random_points(400, 2), random_points(50, 3)
+    queries[:5] -= 200
+    indices, distances = VoxelIndex(points, voxel_size).query_knn(queries, k)
+    all_distances = brute_force_distances(points, queries)
+    expected = np.sort(all_distances, axis=1)[:, :k]
+    np.testing.assert_allclose(distances, expected)
+    np.testing.assert_allclose(np.take_along_axis(all_distances, indices, axis=1), distances)
+
+
+def test_queries_on_small_clouds():
+    queries = random_points(10, 4)
+    empty = VoxelIndex(np.empty((0, 3)), 1.0)
+    indices, distances, offsets = empty.query_radius(queries, 5.0)
+    assert indices.shape == distances.shape == (0,)
+    assert np.all(offsets == 0)
+    indices, distances = empty.query_knn(queries, 3)
+    assert np.all(indices == -1) and np.all(np.isinf(distances))
+
+    # less points than k: the missing neighbors have index -1 and distance inf.
+    points = random_points(3, 5)
+    indices, distances = VoxelIndex(points, 1.0).query_knn(queries, 5)
+    assert np.all(indices[:, 3:] == -1) and np.all(np.isinf(distances[:, 3:]))
+    assert np.all(np.sort(indices[:, :3], axis=1) == [0, 1, 2])
+    with pytest.raises(AssertionError):
+        VoxelIndex(points, 0.0)
+
+
+def test_frame_spatial_index(dataset_root):
+    frame = Infra3DRC(dataset_root, 1)[0]
+    index = frame.spatial_index("lidar", voxel_size=1.0)
+    assert frame.spatial_index("lidar", voxel_size=1.0) is index
+    assert len(index) == frame.lidar_point_cloud.shape[0]
+
+    radar_xyz = cloud_xyz(frame.radar_point_cloud)
+    indices, distances = index.query_knn(radar_xyz, 2)
+    lidar_xyz = cloud_xyz(frame.lidar_point_cloud)
+    np.testing.assert_allclose(distances, np.sort(brute_force_distances(lidar_xyz, radar_xyz), axis=1)[:, :2])
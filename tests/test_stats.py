@@ -0,0 +1,58 @@
+import numpy as np
+
+from infra_3drc import Infra3DRC, Infra3DRCDataset
+
+
+def test_stats_match_objects(dataset_root, tmp_path):
+    stats = Infra3DRCDataset(dataset_root).stats(tmp_path.joinpath("stats.json"), backend="thread")
+    assert stats.num_computed == 2
+
+    num_frames = num_objects = num_radar_objects = num_points = 0
+    for scene_number in (1, 2):
+        for frame in Infra3DRC(dataset_root, scene_number):
+            num_frames += 1
+            for obj in frame.objects:
+                num_objects += 1
+                if obj.points is not None:
+                    num_radar_objects += 1
+                    num_points += obj.points.shape[0]
+    total = stats.total
+    assert (total.num_frames, total.num_objects, total.num_radar_objects, total.num_points) == (
+        num_frames,
+        num_objects,
+        num_radar_objects,
+        num_points,
+    )
+    assert total.histograms["range"].sum() == num_points
+    assert total.histograms["num_points"].sum() == num_objects
+    assert stats.select([1, 2]).to_dict() == total.to_dict()
+
+
+def test_stats_invalidated_by_replaced_annotation(dataset_root, tmp_path, set_category):
+    stats_path = tmp_path.joinpath("stats.json")
+    dataset = Infra3DRCDataset(dataset_root)
+    stats = dataset.stats(stats_path, backend="thread")
+    scene_2 = stats[2].to_dict()
+    assert dataset.stats(stats_path, backend="thread").num_computed == 0
+
+    set_category(dataset.scene(1).scene_path, 0, 2, in_place=False)
+    stats = dataset.stats(stats_path, backend="thread")
+    # only the modified scene is computed again.
+    assert stats.num_computed == 1
+    assert stats[2].to_dict() == scene_2
+    fresh = Infra3DRCDataset(dataset_root).stats(tmp_path.joinpath("fresh.json"), backend="thread")
+    assert stats.total.category_counts == fresh.total.category_counts
+    assert np.array_equal(stats[1].category_objects, fresh[1].category_objects)
+
+
+def test_stats_are_reused(dataset_root, tmp_path):
+    stats_path = tmp_path.joinpath("stats.json")
+    dataset = Infra3DRCDataset(dataset_root)
+    expected = dataset.stats(stats_path, backend="thread").total.to_dict()
+    stats = Infra3DRCDataset(dataset_root).stats(stats_path, backend="thread")
+    assert stats.num_computed == 0
+    assert stats.total.to_dict() == expected
+    category_objects = np.bincount(
+        [obj.category_id for frame in dataset for obj in frame.objects], minlength=len(stats.total.category_objects)
+    )
+    assert stats.total.category_objects.tolist() == category_objects.tolist()
@@ -0,0 +1,87 @@
+import numpy as np
+
+from infra_3drc import Infra3DRC
+from infra_3drc.tracks import TrackIndex
+from conftest import rewrite_json
+
+
+def built_indices(monkeypatch):
+    """records the number of track indices built by TrackIndex.from_detections."""
+    built = []
+    from_detections = TrackIndex.from_detections.__func__
+
+    def record(cls, detections, signature=None):
+        built.append(len(detections))
+        return from_detections(cls, detections, signature)
+
+    monkeypatch.setattr(TrackIndex, "from_detections", classmethod(record))
+    return built
+
+
+def test_tracks_are_sorted_by_frame(dataset_root):
+    scene = Infra3DRC(dataset_root, 1)
+    tracks = scene.tracks()
+    detections = scene.detections
+    assert tracks.track_ids.tolist() == np.unique(detections.track_id).tolist()
+    for track_id in tracks:
+        track = tracks[track_id]
+        assert np.all(np.diff(track.frame) > 0)
+        assert track.det_id.tolist() == detections.det_id[detections.track_id == track_id].tolist()
+    assert tracks.window(1, 1, 2).frame.tolist() == [1]
+
+
+def test_tracks_reloaded_until_in_place_annotation_edit(dataset_root, tmp_path, monkeypatch):
+    tracks_path = tmp_path.joinpath("tracks.npz")
+    expected = Infra3DRC(dataset_root, 1).tracks(tracks_path).track_ids.tolist()
+
+    built = built_indices(monkeypatch)
+    assert Infra3DRC(dataset_root, 1).tracks(tracks_path).track_ids.tolist() == expected
+    assert built == []
+
+    def set_track_id(content):
+        content["annotations"][0]["track_id"] = 50
+
+    scene_path = Infra3DRC(dataset_root, 1).scene_path
+    rewrite_json(scene_path.joinpath("camera_01", "camera_01__annotation", "000000.json"), set_track_id)
+    tracks = Infra3DRC(dataset_root, 1).tracks(tracks_path)
+    assert len(built) == 1
+    assert 50 in tracks
+
+
+def test_tracks_cache_path_is_respected(dataset_root, tmp_path):
+    scene = Infra3DRC(dataset_root, 1)
+    first = scene.tracks(tmp_path.joinpath("first.npz"))
+    assert scene.tracks(tmp_path.joinpath("first.npz")) is first
+    second = scene.tracks(tmp_path.joinpath("second.npz"))
+    assert tmp_path.joinpath("second.npz").is_file()
+    assert second.track_ids.tolist() == first.track_ids.tolist()
+
+
+def test_track_centroids(dataset_root):
+    scene = Infra3DRC(dataset_root, 2)
+    tracks = scene.tracks()
+    for idx, frame in enumerate(scene):
+        for obj in frame.objects:
+            entry = tracks.window(obj.track_id, idx, idx + 1)
+            assert entry.det_id.tolist() == [obj.det_id]
+            np.testing.assert_allclose(entry.bbox[0], obj.bbox)
+            if obj.points is None:
+                assert np.all(np.isnan(entry.centroid[0])) and np.isnan(entry.range_rate[0])
+            else:
+                centroid = [obj.points[name].astype(np.float64).mean() for name in ("x", "y", "z")]
+                np.testing.assert_allclose(entry.centroid[0], centroid, rtol=1e-5)
+                np.testing.assert_allclose(entry.range_rate[0], obj.points.range_rate.astype(np.float64).mean(), rtol=1e-5)
+
+
+def test_tracks_are_reloaded(dataset_root, tmp_path, monkeypatch):
+    tracks_path = tmp_path.joinpath("tracks.npz")
+    expected = Infra3DRC(dataset_root, 1).tracks(tracks_path)
+    assert tracks_path.is_file()
+
+    built = built_indices(monkeypatch)
+    tracks = Infra3DRC(dataset_root, 1).tracks(tracks_path)
+    assert built == []
+    for name in tracks.entries.dtype.names:
+        np.testing.assert_array_equal(tracks.entries[name], expected.entries[name])
+    Infra3DRC(dataset_root, 1).tracks(tracks_path, rebuild=True)
+    assert len(built) == 1
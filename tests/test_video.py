@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+import pytest
+
+from infra_3drc import Infra3DRC
+
+
+@pytest.mark.parametrize("overlay", [("annotations", "radar", "lidar"), ("radar",), ()])
+def test_export_png_sequence(dataset_root, tmp_path, overlay):
+    scene = Infra3DRC(dataset_root, 1)
+    png_dir = tmp_path.joinpath("frames")
+    stats = scene.export_video(png_dir, overlay=overlay, workers=2, backend="thread")
+    assert stats.num_frames == len(scene)
+    assert sorted(path.name for path in png_dir.iterdir()) == [f"{idx:06d}.png" for idx in range(len(scene))]
+    # png is lossless, the files are the rendered frames.
+    for idx, frame in enumerate(scene):
+        exported = cv2.imread(str(png_dir.joinpath(f"{idx:06d}.png")))
+        np.testing.assert_array_equal(exported, frame.render(overlay))
+    if not overlay:
+        np.testing.assert_array_equal(exported, scene[len(scene) - 1].camera_image)
+
+
+def test_export_scaled(dataset_root, tmp_path):
+    scene = Infra3DRC(dataset_root, 2)
+    scene.export_video(tmp_path.joinpath("frames"), workers=1, backend="thread", scale=0.5)
+    rows, cols = scene[0].image_shape
+    assert cv2.imread(str(tmp_path.joinpath("frames", "000000.png"))).shape == (rows // 2, cols // 2, 3)
+
+
+def test_export_video_file(dataset_root, tmp_path):
+    scene = Infra3DRC(dataset_root, 1)
+    video_path = tmp_path.joinpath("scene.avi")
+    stats = scene.export_video(video_path, workers=2, backend="process")
+    assert stats.num_frames == len(scene) and stats.fps > 0
+    capture = cv2.VideoCapture(str(video_path))
+    assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == len(scene)
+    capture.release()
+    with pytest.raises(AssertionError):
+        scene.export_video(tmp_path.joinpath("scene.gif"))
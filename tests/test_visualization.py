@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+import pytest
+
+from infra_3drc import visualization
+
+
+def test_show_image_module_does_not_import_matplotlib():
+    code = "import sys, infra_3drc.visualization; print('matplotlib' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_loading_does_not_import_matplotlib_or_opencv(dataset_root):
+    code = (
+        "import sys\n"
+        "from infra_3drc import Infra3DRC\n"
+        f"frame = Infra3DRC({str(dataset_root)!r}, 1)[0]\n"
+        "frame.radar_point_cloud, frame.lidar_point_cloud, frame.objects, frame.image_shape\n"
+        "print('matplotlib' in sys.modules, 'cv2' in sys.modules)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False False"
+
+
+def test_backend_error_is_reported(monkeypatch):
+    matplotlib = pytest.importorskip("matplotlib")
+
+    def use(backend):
+        raise ImportError(f"Cannot load backend {backend!r} which requires the 'tk' interactive framework")
+
+    monkeypatch.setattr(matplotlib, "use", use)
+    with pytest.raises(ImportError, match="TkAgg") as error:
+        visualization._pyplot()
+    assert "pip install" not in str(error.value)